@@ -0,0 +1,58 @@
+"""
+Spawn latency benchmark: shell=True vs direct argv exec (vfork and posix_spawn).
+
+Launches a trivial program many times from several threads at once (to
+mimic busy workers) and reports per-launch latency for each path.
+
+    python benchmarks/bench_spawn.py --iterations 500 --concurrency 8
+"""
+import argparse
+import shlex
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import spawn  # noqa: E402
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(label, launch, iterations, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        wall_start = time.perf_counter()
+        samples = sorted(pool.map(lambda _: _timed(launch), range(iterations)))
+        wall = time.perf_counter() - wall_start
+
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{label:<8} mean {statistics.mean(samples):7.2f} ms   "
+        f"p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms   "
+        f"throughput {iterations / wall:8.1f} spawns/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300, help="Launches per mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent launching threads")
+    parser.add_argument("--argv", nargs="+", default=["true"], help="Program to launch")
+    args = parser.parse_args()
+
+    command = shlex.join(args.argv)
+    print(f"Launching {command!r} {args.iterations}x per mode with {args.concurrency} threads")
+    print("shell = /bin/sh -c, argv = direct exec (vfork), spawn = direct exec via posix_spawn\n")
+    bench("shell", lambda: spawn.run_shell(command, timeout=30), args.iterations, args.concurrency)
+    bench("argv", lambda: spawn.run_argv(args.argv, timeout=30), args.iterations, args.concurrency)
+    bench("spawn", lambda: spawn.run_argv(args.argv, timeout=30, use_posix_spawn=True), args.iterations, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
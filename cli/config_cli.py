@@ -1,3 +1,4 @@
+import json
 import typer
 from core.config import ConfigManager
 
@@ -16,6 +17,9 @@ def set(key: str, value: str):
             value = int(value)
         elif value.lower() in ["true", "false"]:
             value = value.lower() == "true"
+        elif value.strip().startswith(("{", "[")):
+            # Structured settings such as rate_limits are passed as JSON.
+            value = json.loads(value)
 
         config.set(key, value)
         typer.echo(f"Configuration updated: {key} = {value}")
@@ -1,33 +1,50 @@
+import json
+import sys
+from itertools import chain
+from typing import Optional
+
 import typer
 from core.storage import Database
+from core.timeutil import parse_duration
 
 app = typer.Typer(help="Manage Dead Letter Queue (DLQ) jobs")
 db = Database()
 
+DLQ_COLUMNS = ("id", "command", "attempts", "max_retries", "created_at", "updated_at", "status")
+
 
 # ----------------------------------------------------------------------
 # LIST
 # ----------------------------------------------------------------------
 @app.command("list")
-def list_dlq():
+def list_dlq(
+    search: Optional[str] = typer.Option(
+        None, "--search", "-q", help="Only jobs whose command contains this text (full-text index)"
+    ),
+):
     """List all jobs currently in the Dead Letter Queue."""
     try:
-        jobs = db.list_job_bystatus("dead")
-        if not jobs:
-            typer.echo(typer.style("DLQ is empty. No failed jobs found.", fg=typer.colors.YELLOW))
+        if search:
+            jobs = db.iter_search_jobs(search, status="dead", columns=DLQ_COLUMNS)
+        else:
+            jobs = db.iter_jobs("dead", columns=DLQ_COLUMNS)
+        first = next(jobs, None)
+        if first is None:
+            message = f"No DLQ jobs match '{search}'." if search else "DLQ is empty. No failed jobs found."
+            typer.echo(typer.style(message, fg=typer.colors.YELLOW))
             raise typer.Exit(code=0)
 
         typer.echo(typer.style("Dead Letter Queue Jobs", fg=typer.colors.CYAN, bold=True))
         typer.echo("-" * 65)
 
-        for job in jobs:
+        for job in chain((first,), jobs):
             typer.echo(
-                f"ID         : {job['id']}\n"
-                f"Command    : {job['command']}\n"
-                f"Attempts   : {job['attempts']}/{job['max_retries']}\n"
-                f"Created At : {job['created_at']}\n"
-                f"Updated At : {job['updated_at']}\n"
-                f"Status     : {job['status']}\n"
+                f"ID         : {job.id}\n"
+                f"Command    : {job.command}\n"
+                f"Attempts   : {job.attempts}/{job.max_retries}\n"
+                f"Created At : {job.created_at}\n"
+                f"Updated At : {job.updated_at}\n"
+                f"Status     : {job.status}\n"
                 + "-" * 65
             )
 
@@ -36,12 +53,75 @@ def list_dlq():
         raise typer.Exit(code=1)
 
 
+# ----------------------------------------------------------------------
+# FILTERS
+# ----------------------------------------------------------------------
+def _build_filters(command, older_than, min_attempts, exit_code):
+    """Translate CLI filter options into Database._dead_filter keyword arguments."""
+    filters = {}
+    if command:
+        filters["command"] = command
+    if older_than:
+        try:
+            filters["older_than"] = parse_duration(older_than)
+        except ValueError as e:
+            typer.echo(typer.style(f"Error: {e}", fg=typer.colors.RED))
+            raise typer.Exit(code=1)
+    if min_attempts is not None:
+        filters["min_attempts"] = min_attempts
+    if exit_code is not None:
+        filters["exit_code"] = exit_code
+    return filters
+
+
+def _run_bulk(action, verbs, filters, chunk_size, pause):
+    """Run a chunked DLQ operation, printing progress after each chunk."""
+    total = db.count_dead_jobs(**filters)
+    if not total:
+        typer.echo(typer.style("No DLQ jobs match the given filters.", fg=typer.colors.YELLOW))
+        return
+    typer.echo(typer.style(f"{verbs[0]} {total} DLQ job(s) in chunks of {chunk_size}...", fg=typer.colors.CYAN))
+    done, skipped = 0, []
+    for done in db.bulk_dead_jobs(action, chunk_size=chunk_size, pause=pause, skipped=skipped, **filters):
+        typer.echo(f"  {done}/{total}")
+    typer.echo(typer.style(f"{verbs[1]} {done} DLQ job(s).", fg=typer.colors.GREEN, bold=True))
+    if skipped:
+        shown = ", ".join(skipped[:10]) + (f", ... (+{len(skipped) - 10} more)" if len(skipped) > 10 else "")
+        typer.echo(typer.style(
+            f"Skipped {len(skipped)} DLQ job(s) whose dedup key is held by an active job "
+            f"or that depend on a job still dead: {shown}",
+            fg=typer.colors.YELLOW,
+        ))
+
+
 # ----------------------------------------------------------------------
 # RETRY
 # ----------------------------------------------------------------------
 @app.command("retry")
-def retry_job(job_id: str):
-    """Retry a specific DLQ job by moving it back to 'pending'."""
+def retry_job(
+    job_id: Optional[str] = typer.Argument(None, help="Retry a single DLQ job"),
+    all_jobs: bool = typer.Option(False, "--all", help="Retry every DLQ job matching the filters"),
+    command: Optional[str] = typer.Option(None, "--command", help="Only jobs whose command matches this glob"),
+    older_than: Optional[str] = typer.Option(None, "--older-than", help="Only jobs dead for longer than e.g. 30m, 7d"),
+    min_attempts: Optional[int] = typer.Option(None, "--min-attempts", help="Only jobs with at least this many attempts"),
+    exit_code: Optional[int] = typer.Option(None, "--exit-code", help="Only jobs whose last attempt exited with this code"),
+    chunk_size: int = typer.Option(500, "--chunk-size", help="Jobs per transaction"),
+    pause: float = typer.Option(0.05, "--pause", help="Seconds to wait between chunks"),
+):
+    """Retry a DLQ job by id, or in bulk with --all and/or filters."""
+    filters = _build_filters(command, older_than, min_attempts, exit_code)
+
+    if job_id is None:
+        if not (all_jobs or filters):
+            typer.echo(typer.style("Give a job id, or --all and/or filters for a bulk retry.", fg=typer.colors.YELLOW))
+            raise typer.Exit(code=1)
+        try:
+            _run_bulk("retry", ("Retrying", "Retried"), filters, chunk_size, pause)
+        except Exception as e:
+            typer.echo(typer.style(f"Error retrying DLQ jobs: {e}", fg=typer.colors.RED))
+            raise typer.Exit(code=1)
+        return
+
     try:
         job = db.get_job(job_id)
         if not job:
@@ -57,16 +137,24 @@ def retry_job(job_id: str):
             )
             raise typer.Exit(code=1)
 
-        # Reset job for retry
-        db.update_job_status(job_id, "pending")
-        db.con.execute("UPDATE jobs SET attempts = 0 WHERE id=?", (job_id,))
-        db.con.commit()
+        # Reset job for retry (one UPDATE)
+        skipped = []
+        for _ in db.bulk_dead_jobs("retry", skipped=skipped, job_id=job_id):
+            pass
+        if skipped:
+            dead_parents = db.dead_parents(job_id)
+            reason = (f"it depends on dead job(s) {', '.join(dead_parents)}; retry those instead" if dead_parents
+                      else f"dedup key '{job['dedup_key']}' is held by an active job")
+            typer.echo(typer.style(f"Job {job_id} was not retried: {reason}.", fg=typer.colors.YELLOW))
+            raise typer.Exit(code=1)
 
         typer.echo(
             typer.style(
                 f"Job {job_id} moved back to 'pending' for retry.", fg=typer.colors.GREEN, bold=True
             )
         )
+    except typer.Exit:
+        raise
     except Exception as e:
         typer.echo(typer.style(f"Error retrying DLQ job: {e}", fg=typer.colors.RED))
         raise typer.Exit(code=1)
@@ -76,23 +164,60 @@ def retry_job(job_id: str):
 # PURGE
 # ----------------------------------------------------------------------
 @app.command("purge")
-def purge_dlq(confirm: bool = typer.Option(False, "--confirm", help="Confirm DLQ purge")):
-    """Permanently delete all jobs from the DLQ (use with caution)."""
+def purge_dlq(
+    confirm: bool = typer.Option(False, "--confirm", help="Confirm DLQ purge"),
+    older_than: Optional[str] = typer.Option(None, "--older-than", help="Only jobs dead for longer than e.g. 30m, 7d"),
+    command: Optional[str] = typer.Option(None, "--command", help="Only jobs whose command matches this glob"),
+    min_attempts: Optional[int] = typer.Option(None, "--min-attempts", help="Only jobs with at least this many attempts"),
+    exit_code: Optional[int] = typer.Option(None, "--exit-code", help="Only jobs whose last attempt exited with this code"),
+    chunk_size: int = typer.Option(500, "--chunk-size", help="Jobs per transaction"),
+    pause: float = typer.Option(0.05, "--pause", help="Seconds to wait between chunks"),
+):
+    """Permanently delete DLQ jobs (all, or those matching filters) in chunks."""
     if not confirm:
         typer.echo(
             typer.style(
-                "Use '--confirm' to permanently purge all DLQ jobs.",
+                "Use '--confirm' to permanently purge DLQ jobs.",
                 fg=typer.colors.YELLOW,
             )
         )
         raise typer.Exit(code=1)
 
+    filters = _build_filters(command, older_than, min_attempts, exit_code)
     try:
-        with db.con:
-            db.con.execute("DELETE FROM jobs WHERE status='dead';")
-        typer.echo(
-            typer.style("All DLQ jobs purged successfully.", fg=typer.colors.GREEN, bold=True)
-        )
+        _run_bulk("purge", ("Purging", "Purged"), filters, chunk_size, pause)
     except Exception as e:
         typer.echo(typer.style(f"Error purging DLQ: {e}", fg=typer.colors.RED))
         raise typer.Exit(code=1)
+
+
+# ----------------------------------------------------------------------
+# EXPORT
+# ----------------------------------------------------------------------
+@app.command("export")
+def export_dlq(
+    output: str = typer.Argument("-", help="JSONL file to write ('-' for stdout)"),
+    older_than: Optional[str] = typer.Option(None, "--older-than", help="Only jobs dead for longer than e.g. 30m, 7d"),
+    command: Optional[str] = typer.Option(None, "--command", help="Only jobs whose command matches this glob"),
+    min_attempts: Optional[int] = typer.Option(None, "--min-attempts", help="Only jobs with at least this many attempts"),
+    exit_code: Optional[int] = typer.Option(None, "--exit-code", help="Only jobs whose last attempt exited with this code"),
+    chunk_size: int = typer.Option(500, "--chunk-size", help="Rows read per query"),
+):
+    """Stream DLQ jobs as JSON lines, one job per line."""
+    filters = _build_filters(command, older_than, min_attempts, exit_code)
+    try:
+        out = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+        count = 0
+        try:
+            for job in db.iter_dead_jobs(chunk_size=chunk_size, **filters):
+                record = {key: job[key] for key in job.keys() if key != "_rowid"}
+                out.write(json.dumps(record) + "\n")
+                count += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if out is not sys.stdout:
+            typer.echo(typer.style(f"Exported {count} DLQ job(s) to {output}.", fg=typer.colors.GREEN, bold=True))
+    except Exception as e:
+        typer.echo(typer.style(f"Error exporting DLQ: {e}", fg=typer.colors.RED), err=True)
+        raise typer.Exit(code=1)
@@ -1,15 +1,142 @@
 import typer
 import json
+import shlex
+import time
 import uuid
 from datetime import datetime, timezone
 from dateutil import parser
-from core.storage import Database
+from core.storage import Database, DuplicateJobError, QueueFullError, UnknownDependencyError
+from core.admission import AdmissionPolicy
 from core.config import ConfigManager
+from core.retry_policy import RetryPolicy
+from core.timeutil import parse_duration
+from core import fanout, capabilities
 
 app = typer.Typer(help="Manage job queue operations")
 db = Database()
 
 
+def build_job(job_data: dict, config: dict) -> dict:
+    """
+    Validate a job JSON object and apply configuration defaults.
+    Returns the keyword arguments for Database.add_job (except run_at);
+    invalid fields print an error and exit. Also used for schedule templates.
+    """
+    job_id = job_data.get("id") or str(uuid.uuid4())
+    command = job_data.get("command")
+    kind, spec = "shell", None
+
+    if job_data.get("callable"):
+        # Python callable job: {"callable": "pkg.module:func", "args": [...], "kwargs": {...}}
+        target = job_data["callable"]
+        args = job_data.get("args") or []
+        kwargs = job_data.get("kwargs") or {}
+        if ":" not in target or not isinstance(args, list) or not isinstance(kwargs, dict):
+            typer.secho("Error: 'callable' must look like 'pkg.module:func' with list 'args' and object 'kwargs'.",
+                        fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        kind, spec = "callable", {"callable": target, "args": args, "kwargs": kwargs}
+        call_args = [json.dumps(a) for a in args] + [f"{k}={json.dumps(v)}" for k, v in kwargs.items()]
+        command = command or f"{target}({', '.join(call_args)})"
+
+    elif job_data.get("argv"):
+        # Direct exec without a shell: {"argv": [...], "env": {...}, "cwd": "..."}
+        argv = job_data["argv"]
+        env = job_data.get("env") or {}
+        cwd = job_data.get("cwd")
+        if (not isinstance(argv, list) or not all(isinstance(a, str) for a in argv)
+                or not isinstance(env, dict) or not all(isinstance(v, str) for v in env.values())):
+            typer.secho("Error: 'argv' must be a list of strings and 'env' an object of strings.", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        kind, spec = "argv", {"argv": argv, "env": env, "cwd": cwd}
+        command = command or shlex.join(argv)
+
+    elif job_data.get("map"):
+        # Fan-out: {"map": {"glob": "in/*.csv", "command": "convert {item}", "reduce": "merge {parent}"}}
+        fan = job_data["map"]
+        try:
+            if not isinstance(fan, dict) or not isinstance(fan.get("command"), str):
+                raise ValueError("'command' template is required")
+            fanout.validate_source(fan)
+            chunk_size = int(fan.get("chunk_size", config.get("map_chunk_size", 500)))
+            window = int(fan.get("window", config.get("map_window", chunk_size * 4)))
+            if chunk_size <= 0 or window <= 0:
+                raise ValueError("'chunk_size' and 'window' must be positive")
+        except (ValueError, TypeError) as e:
+            typer.secho(f"Error: Invalid 'map' job ({e}).", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        source = {name: fan[name] for name in fanout.SOURCES if fan.get(name) is not None}
+        kind, spec = "map", {"source": source, "command": fan["command"], "chunk_size": chunk_size, "window": window}
+        origin = f"{len(source['items'])} items" if "items" in source else " ".join(f"{k} {v}" for k, v in source.items())
+        command = command or f"map [{origin}]: {fan['command']}"
+
+    if not command:
+        typer.secho("Error: Missing required field 'command' (or 'argv' / 'callable' / 'map').", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    # Configuration defaults
+    max_retries = int(job_data.get("max_retries", config.get("max_retries", 3)))
+    priority = int(job_data.get("priority", 0))
+    queue = job_data.get("queue") or "default"
+    tag = job_data.get("tag")
+    dedup_key = job_data.get("dedup_key")
+    dedup_mode = job_data.get("dedup_mode", config.get("dedup_mode", "coalesce"))
+    try:
+        dedup_ttl = int(parse_duration(job_data.get("dedup_ttl", config.get("dedup_ttl", 0))))
+    except ValueError as e:
+        typer.secho(f"Error: Invalid 'dedup_ttl' ({e}).", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    depends_on = job_data.get("depends_on") or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    retry_policy = job_data.get("retry_policy")
+    if retry_policy is not None:
+        if isinstance(retry_policy, str):
+            retry_policy = {"kind": retry_policy}
+        try:
+            RetryPolicy.from_spec(retry_policy)
+        except (ValueError, TypeError) as e:
+            typer.secho(f"Error: Invalid 'retry_policy' ({e}).", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+
+    cache_ttl = job_data.get("cache_ttl")
+    cache_inputs = job_data.get("cache_inputs") or []
+    if isinstance(cache_inputs, str):
+        cache_inputs = [cache_inputs]
+    if cache_ttl is not None:
+        try:
+            cache_ttl = parse_duration(cache_ttl)
+        except ValueError as e:
+            typer.secho(f"Error: Invalid 'cache_ttl' ({e}).", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+    if not all(isinstance(path, str) for path in cache_inputs):
+        typer.secho("Error: 'cache_inputs' must be a list of file paths.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    try:
+        requires = capabilities.requirement_key(job_data.get("requires"))
+    except ValueError as e:
+        typer.secho(f"Error: Invalid 'requires' ({e}).", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    concurrency_key = job_data.get("concurrency_key")
+    concurrency_limit = job_data.get("concurrency_limit", 1)
+    if concurrency_key is not None and (not isinstance(concurrency_key, str) or not concurrency_key):
+        typer.secho("Error: 'concurrency_key' must be a non-empty string.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    if not isinstance(concurrency_limit, int) or isinstance(concurrency_limit, bool) or concurrency_limit < 1:
+        typer.secho("Error: 'concurrency_limit' must be a positive integer.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    return {
+        "job_id": job_id, "command": command, "max_retries": max_retries, "priority": priority,
+        "queue": queue, "tag": tag, "dedup_key": dedup_key, "dedup_mode": dedup_mode, "dedup_ttl": dedup_ttl,
+        "depends_on": depends_on, "kind": kind, "spec": spec, "retry_policy": retry_policy,
+        "cache_ttl": cache_ttl or None, "cache_inputs": cache_inputs, "concurrency_key": concurrency_key,
+        "concurrency_limit": concurrency_limit, "requires": requires,
+    }
+
+
 @app.command()
 def enqueue(
     job_json: str = typer.Argument(..., help='Job JSON string, e.g. \'{"command": "echo Hello"}\'')
@@ -29,20 +156,15 @@ def enqueue(
         typer.secho("Error: Invalid JSON format. Please provide valid JSON.", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    job_id = job_data.get("id") or str(uuid.uuid4())
-    command = job_data.get("command")
+    job = build_job(job_data, config)
+    run_at = job_data.get("run_at")
 
-    if not command:
-        typer.secho("Error: Missing required field 'command'.", fg=typer.colors.RED)
+    try:
+        admission = AdmissionPolicy(config.get("backpressure"))
+    except (ValueError, TypeError, KeyError) as e:
+        typer.secho(f"Error: Invalid 'backpressure' config ({e}).", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    # -------------------------------
-    # Load configuration defaults
-    # -------------------------------
-    max_retries = int(job_data.get("max_retries", config.get("max_retries", 3)))
-    priority = int(job_data.get("priority", 0))
-    run_at = job_data.get("run_at")
-
     # -------------------------------
     # Parse run_at (convert to UTC)
     # -------------------------------
@@ -66,17 +188,74 @@ def enqueue(
     # Insert into database
     # -------------------------------
     try:
-        db.add_job(job_id, command, max_retries, priority=priority, run_at=run_at_str)
+        # In 'block' mode a full backlog is re-checked until it drains below
+        # its low watermark or the backpressure timeout runs out.
+        deadline = time.monotonic() + admission.timeout
+        while True:
+            try:
+                job_id, outcome = db.add_job(
+                    **job, run_at=run_at_str, admission=admission if admission.enabled else None,
+                )
+                break
+            except QueueFullError as e:
+                if e.mode != "block" or time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+        reducer = (job_data.get("map") or {}).get("reduce")
+        if reducer and outcome == "created":
+            db.add_job(
+                fanout.child_id(job_id, "reduce"), reducer.replace("{parent}", job_id), job["max_retries"],
+                priority=job["priority"], queue=job["queue"], tag=job["tag"], depends_on=[job_id],
+                requires=job["requires"],
+            )
+
+        if outcome == "coalesced":
+            typer.secho(f"\nDuplicate job ignored — already queued as {job_id}", fg=typer.colors.YELLOW, bold=True)
+            return
+        if outcome == "replaced":
+            typer.secho(f"\nExisting pending job {job_id} replaced", fg=typer.colors.GREEN, bold=True)
+            return
 
         typer.secho("\nJob Enqueued Successfully", fg=typer.colors.GREEN, bold=True)
         typer.echo("-" * 50)
         typer.secho(f"ID        : {job_id}", fg=typer.colors.BRIGHT_WHITE)
-        typer.secho(f"Command   : {command}", fg=typer.colors.BRIGHT_WHITE)
-        typer.secho(f"Retries   : {max_retries}", fg=typer.colors.BRIGHT_WHITE)
-        typer.secho(f"Priority  : {priority}", fg=typer.colors.BRIGHT_WHITE)
+        typer.secho(f"Command   : {job['command']}", fg=typer.colors.BRIGHT_WHITE)
+        typer.secho(
+            f"Retries   : {job['max_retries']}"
+            + (f" ({job['retry_policy']['kind']})" if job["retry_policy"] else ""),
+            fg=typer.colors.BRIGHT_WHITE,
+        )
+        typer.secho(f"Priority  : {job['priority']}", fg=typer.colors.BRIGHT_WHITE)
+        typer.secho(f"Queue     : {job['queue']}" + (f" (tag: {job['tag']})" if job["tag"] else ""),
+                    fg=typer.colors.BRIGHT_WHITE)
         typer.secho(f"Run At    : {run_at_str} UTC", fg=typer.colors.BRIGHT_WHITE)
+        if job["depends_on"]:
+            typer.secho(f"Depends On: {', '.join(job['depends_on'])}", fg=typer.colors.BRIGHT_WHITE)
+        if job["requires"]:
+            typer.secho(f"Requires  : {job['requires'].replace(',', ', ')}", fg=typer.colors.BRIGHT_WHITE)
+        if job["concurrency_key"]:
+            typer.secho(f"Concurrency: {job['concurrency_key']} (at most {job['concurrency_limit']} running)",
+                        fg=typer.colors.BRIGHT_WHITE)
+        if job["kind"] == "map":
+            spec = job["spec"]
+            typer.secho(f"Fan-out   : chunks of {spec['chunk_size']}, at most {spec['window']} unfinished children"
+                        + (f", then reducer {fanout.child_id(job_id, 'reduce')}" if reducer else ""),
+                        fg=typer.colors.BRIGHT_WHITE)
+        if job["cache_ttl"]:
+            typer.secho(f"Cache TTL : {job['cache_ttl']:g}s", fg=typer.colors.BRIGHT_WHITE)
         typer.echo("-" * 50)
 
+    except DuplicateJobError as e:
+        typer.secho(f"Error: Job rejected. {e}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    except UnknownDependencyError as e:
+        typer.secho(f"Error: Job rejected. {e}; enqueue its parents first.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    except QueueFullError as e:
+        waited = f" after waiting {admission.timeout:g}s" if e.mode == "block" else ""
+        typer.secho(f"Error: Job rejected{waited}. {e}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
     except Exception as e:
         typer.secho(f"Error: Failed to enqueue job ({e})", fg=typer.colors.RED)
         raise typer.Exit(code=1)
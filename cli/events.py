@@ -0,0 +1,53 @@
+import json
+import time
+from typing import Optional
+
+import typer
+from core.storage import Database
+
+app = typer.Typer(help="Stream job state transitions")
+db = Database()
+
+
+@app.command()
+def events(
+    since: Optional[int] = typer.Option(None, "--since", help="Start after this sequence number (default: 0)"),
+    follow: bool = typer.Option(False, "--follow", "-f", help="Keep waiting for new events"),
+    consumer: Optional[str] = typer.Option(
+        None, "--consumer", help="Named cursor: resume from its last position and acknowledge what was printed"
+    ),
+    as_json: bool = typer.Option(False, "--json", help="Print one JSON object per line"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Stop after this many events"),
+    interval: float = typer.Option(0.5, "--interval", help="Polling interval in seconds with --follow"),
+    batch_size: int = typer.Option(500, "--batch-size", help="Events read per query"),
+):
+    """Print job events (seq, time, job, status, attempts) in order, optionally following new ones."""
+    if since is None:
+        since = (db.get_consumer_seq(consumer) if consumer else None) or 0
+
+    printed = 0
+    try:
+        while True:
+            batch = db.read_events(since, batch_size if limit is None else min(batch_size, limit - printed))
+            for event in batch:
+                if as_json:
+                    typer.echo(json.dumps(dict(event)))
+                else:
+                    typer.echo(f"{event['seq']:>10}  {event['at']}  {event['job_id']:<36} "
+                               f"{event['status']:<10} attempts={event['attempts']}")
+            if batch:
+                since = batch[-1]["seq"]
+                printed += len(batch)
+                if consumer:
+                    db.ack_events(consumer, since)
+            if limit is not None and printed >= limit:
+                break
+            if not batch or len(batch) < batch_size:
+                if not follow:
+                    break
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        typer.echo(typer.style(f"Error reading events: {e}", fg=typer.colors.RED), err=True)
+        raise typer.Exit(code=1)
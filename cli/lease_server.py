@@ -0,0 +1,37 @@
+from typing import Optional
+
+import typer
+from core.config import ConfigManager
+from core.lease import LeaseServer
+from core.timeutil import parse_duration
+
+app = typer.Typer(help="Serve jobs to remote workers")
+
+
+@app.command()
+def lease_server(
+    listen: Optional[str] = typer.Option(
+        None, "--listen", help="host:port or unix:/path to listen on (default: lease_server.listen, else 127.0.0.1:7070)"
+    ),
+    token: Optional[str] = typer.Option(None, "--token", help="Shared secret remote workers must present"),
+):
+    """Run a job-lease server so workers on other hosts can process this queue (worker-start --server)."""
+    settings = ConfigManager().get_value("lease_server") or {}
+    listen = listen or settings.get("listen") or "127.0.0.1:7070"
+    token = token if token is not None else settings.get("token")
+    try:
+        server = LeaseServer(listen, token=token, lease_ttl=parse_duration(settings.get("lease_ttl") or 60))
+    except (ValueError, OSError) as e:
+        typer.echo(typer.style(f"Error: Cannot listen on {listen} ({e}).", fg=typer.colors.RED))
+        raise typer.Exit(code=1)
+
+    typer.echo(typer.style(f"Lease server listening on {listen}", fg=typer.colors.GREEN, bold=True))
+    typer.echo(f"Authentication : {'token' if token else 'none'}")
+    typer.echo(f"Lease TTL      : {server.server.leases.ttl:g}s")
+    typer.echo("Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        typer.echo(typer.style("\nLease server stopped.", fg=typer.colors.YELLOW))
+    finally:
+        server.server.server_close()
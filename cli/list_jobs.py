@@ -1,9 +1,15 @@
+from itertools import chain
+from typing import Optional
+
 import typer
 from core.storage import Database
 
 app = typer.Typer(help="List and filter jobs by status")
 db = Database()
 
+# Only the columns the table prints are read.
+LIST_COLUMNS = ("id", "status", "priority", "attempts", "created_at")
+
 
 @app.command()
 def list_jobs(
@@ -12,24 +18,26 @@ def list_jobs(
         "--status",
         "-s",
         help="Filter jobs by status (pending, processing, completed, failed, dead, or all)",
-    )
+    ),
+    search: Optional[str] = typer.Option(
+        None, "--search", "-q", help="Only jobs whose command contains this text (full-text index)"
+    ),
 ):
     """List jobs by status or show all jobs."""
     try:
-        # Handle 'all' explicitly
-        if status.lower() == "all":
-            query = "SELECT * FROM jobs ORDER BY created_at DESC"
-            cur = db.con.cursor()
-            cur.execute(query)
-            jobs = cur.fetchall()
+        columns = LIST_COLUMNS
+        if search:
+            jobs = db.iter_search_jobs(search, status=status, columns=columns)
         else:
-            jobs = db.list_job_bystatus(status)
+            jobs = db.iter_jobs(status, columns=columns)
+        # Rows are streamed page by page; peek at the first one to detect an empty result.
+        first = next(jobs, None)
 
         # Title
         typer.echo(typer.style(f"Job List — Status: {status.upper()}", fg=typer.colors.CYAN, bold=True))
         typer.echo("-" * 85)
 
-        if not jobs:
+        if first is None:
             typer.echo(typer.style(f"No jobs found with status '{status}'.", fg=typer.colors.YELLOW))
             raise typer.Exit(code=0)
 
@@ -40,18 +48,20 @@ def list_jobs(
         typer.echo("-" * 85)
 
         # Job Rows
-        for job in jobs:
+        count = 0
+        for job in chain((first,), jobs):
             typer.echo(
-                f"{job['id']:<36} "
-                f"{job['status']:<12} "
-                f"{job['priority']:<8} "
-                f"{job['attempts']:<9} "
-                f"{job['created_at']:<20}"
+                f"{job.id:<36} "
+                f"{job.status:<12} "
+                f"{job.priority:<8} "
+                f"{job.attempts:<9} "
+                f"{job.created_at:<20}"
             )
+            count += 1
 
         typer.echo("-" * 85)
         typer.echo(
-            typer.style(f"Total Jobs Displayed: {len(jobs)}", fg=typer.colors.GREEN)
+            typer.style(f"Total Jobs Displayed: {count}", fg=typer.colors.GREEN)
         )
 
     except Exception as e:
@@ -0,0 +1,121 @@
+import json
+import typer
+from datetime import datetime, timezone
+from dateutil import parser
+from core.storage import Database
+from core.config import ConfigManager
+from core.timeutil import parse_duration
+from core.schedules import Schedule, CATCHUP_POLICIES, format_timestamp
+from cli.enqueue import build_job
+
+app = typer.Typer(help="Manage recurring (cron / interval) jobs")
+db = Database()
+
+
+def _error(message: str):
+    typer.echo(typer.style(f"Error: {message}", fg=typer.colors.RED))
+    raise typer.Exit(code=1)
+
+
+@app.command()
+def schedule_add(
+    name: str = typer.Argument(..., help="Schedule name; tick jobs are named '<name>@<YYYYmmddTHHMMSS>'"),
+    job_json: str = typer.Argument(..., help='Job template, same JSON as enqueue, e.g. \'{"command": "./report.sh"}\''),
+    cron: str = typer.Option(None, "--cron", help="5-field cron expression in UTC, e.g. '*/5 * * * *' or '@daily'"),
+    every: str = typer.Option(None, "--every", help="Fixed interval instead of cron, e.g. 30s, 15m, 1h"),
+    catchup: str = typer.Option("latest", "--catchup", help=f"Missed ticks: {' / '.join(CATCHUP_POLICIES)}"),
+    start: str = typer.Option(None, "--start", help="First fire time (default: the next tick from now)"),
+    replace: bool = typer.Option(False, "--replace", help="Overwrite an existing schedule with this name"),
+):
+    """Create a recurring job that worker processes materialize on every tick."""
+    if "@" in name:
+        _error("Schedule names may not contain '@'.")
+    try:
+        schedule = Schedule(cron=cron, every=parse_duration(every) if every is not None else None, catchup=catchup)
+    except ValueError as e:
+        _error(str(e))
+    try:
+        job_data = json.loads(job_json)
+    except json.JSONDecodeError:
+        _error("Invalid JSON format. Please provide valid JSON.")
+    if not isinstance(job_data, dict):
+        _error("The job template must be a JSON object.")
+    for field in ("id", "run_at"):
+        if field in job_data:
+            _error(f"'{field}' is set per tick and cannot be part of a schedule template.")
+    if (job_data.get("map") or {}).get("reduce"):
+        _error("Map jobs with a 'reduce' step cannot be scheduled.")
+
+    template = build_job(job_data, ConfigManager().load())
+    del template["job_id"]
+
+    now = datetime.now(timezone.utc)
+    if start:
+        try:
+            first = parser.parse(start)
+        except (ValueError, OverflowError) as e:
+            _error(f"Invalid --start ({e}).")
+        first = (first if first.tzinfo else first.astimezone()).astimezone(timezone.utc).replace(microsecond=0)
+    else:
+        first = schedule.next_after(now.replace(microsecond=0))
+
+    try:
+        db.add_schedule(name, template, format_timestamp(first), cron=cron, every=schedule.every,
+                        catchup=catchup, replace=replace)
+    except ValueError as e:
+        _error(f"{e} (use --replace to overwrite it).")
+
+    typer.echo(typer.style(f"\nSchedule '{name}' saved", fg=typer.colors.GREEN, bold=True))
+    typer.echo("-" * 50)
+    typer.echo(f"Trigger   : {f'cron {cron}' if cron else f'every {every}'}")
+    typer.echo(f"Command   : {template['command']}")
+    typer.echo(f"Catch-up  : {catchup}")
+    typer.echo(f"Next Run  : {format_timestamp(first)} UTC")
+    typer.echo("-" * 50)
+
+
+@app.command()
+def schedule_list():
+    """Show all schedules with their next and last fire times."""
+    schedules = db.list_schedules()
+    if not schedules:
+        typer.echo(typer.style("No schedules defined.", fg=typer.colors.YELLOW))
+        raise typer.Exit(code=0)
+
+    typer.echo(typer.style(f"{'NAME':<20} {'TRIGGER':<18} {'CATCHUP':<8} {'NEXT_RUN':<20} {'LAST_RUN':<20} "
+                           f"{'FIRED':<6} COMMAND", bold=True))
+    typer.echo("-" * 120)
+    for row in schedules:
+        trigger = row["cron"] if row["cron"] else f"every {row['every']:g}s"
+        next_run = row["next_run"] if row["enabled"] else "paused"
+        command = db.schedule_template(row)["command"]
+        typer.echo(f"{row['name']:<20} {trigger:<18} {row['catchup']:<8} {next_run or '-':<20} "
+                   f"{row['last_run'] or '-':<20} {row['fired']:<6} {command}")
+
+
+@app.command()
+def schedule_pause(name: str = typer.Argument(..., help="Schedule to pause")):
+    """Stop materializing jobs for a schedule until it is resumed."""
+    if not db.set_schedule_enabled(name, False):
+        _error(f"Schedule '{name}' not found.")
+    typer.echo(typer.style(f"Schedule '{name}' paused.", fg=typer.colors.YELLOW))
+
+
+@app.command()
+def schedule_resume(name: str = typer.Argument(..., help="Schedule to resume")):
+    """Resume a paused schedule from its next tick (ticks missed while paused are skipped)."""
+    row = db.get_schedule(name)
+    if row is None:
+        _error(f"Schedule '{name}' not found.")
+    following = Schedule.from_row(row).next_after(datetime.now(timezone.utc).replace(microsecond=0))
+    db.set_schedule_enabled(name, True, following and format_timestamp(following))
+    typer.echo(typer.style(f"Schedule '{name}' resumed; next run {format_timestamp(following)} UTC.",
+                           fg=typer.colors.GREEN))
+
+
+@app.command()
+def schedule_remove(name: str = typer.Argument(..., help="Schedule to delete")):
+    """Delete a schedule. Jobs it already created are kept."""
+    if not db.remove_schedule(name):
+        _error(f"Schedule '{name}' not found.")
+    typer.echo(typer.style(f"Schedule '{name}' removed.", fg=typer.colors.GREEN))
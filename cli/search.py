@@ -0,0 +1,38 @@
+import typer
+from core.storage import Database
+
+app = typer.Typer(help="Search jobs by command text")
+db = Database()
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Text the command must contain, e.g. 'backup.sh' (all terms must match)"),
+    status: str = typer.Option("all", "--status", "-s", help="Only jobs with this status (or all)"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Maximum number of jobs to show"),
+):
+    """Find jobs whose command mentions the given text, newest first."""
+    try:
+        jobs = db.search_jobs(query, status=status, limit=limit, columns=("id", "status", "created_at", "command"))
+    except ValueError as e:
+        typer.echo(typer.style(f"Error: {e}", fg=typer.colors.RED))
+        raise typer.Exit(code=1)
+    except Exception as e:
+        typer.echo(typer.style(f"Search failed: {e}", fg=typer.colors.RED))
+        raise typer.Exit(code=1)
+
+    typer.echo(typer.style(f"Jobs matching '{query}' — Status: {status.upper()}", fg=typer.colors.CYAN, bold=True))
+    typer.echo("-" * 100)
+
+    if not jobs:
+        typer.echo(typer.style("No matching jobs found.", fg=typer.colors.YELLOW))
+        raise typer.Exit(code=0)
+
+    typer.echo(typer.style(f"{'ID':<36} {'STATUS':<12} {'CREATED_AT':<20} COMMAND", bold=True))
+    typer.echo("-" * 100)
+    for job in jobs:
+        typer.echo(f"{job['id']:<36} {job['status']:<12} {job['created_at']:<20} {job['command']}")
+
+    typer.echo("-" * 100)
+    more = " (limit reached, use --limit for more)" if len(jobs) == limit else ""
+    typer.echo(typer.style(f"Matches Displayed: {len(jobs)}{more}", fg=typer.colors.GREEN))
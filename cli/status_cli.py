@@ -2,6 +2,9 @@ import typer
 import os
 import json
 from core.storage import Database
+from core.config import ConfigManager
+from core.admission import AdmissionPolicy
+from core.aging import AgingPolicy
 
 
 app = typer.Typer(help="Show system and worker status for QueueCTL")
@@ -28,24 +31,162 @@ def status():
     stop_file = "stop_signal.json"
 
     # ----------------------------------------------------------------------
-    # Worker Info
+    # Worker Info (heartbeat table)
+    # ----------------------------------------------------------------------
+    try:
+        interval = float(ConfigManager().get_value("heartbeat_interval") or 2)
+        workers = db.list_workers(live_within=max(10.0, interval * 3))
+        print(f"Active Workers : {len(workers)}" + ("" if workers else " (no active threads)"))
+        for w in workers:
+            print(
+                f"  {w['name']:<10} {w['status']:<5} job={w['current_job'] or '-':<36} "
+                f"done={w['jobs_done']:<5} heartbeat={w['last_heartbeat']} ({w['host']}:{w['pid']})"
+            )
+    except Exception as e:
+        print(f"Warning: Could not read worker heartbeats ({e})")
+
+    # ----------------------------------------------------------------------
+    # Process Summary (autoscaling / rate limits)
     # ----------------------------------------------------------------------
     try:
         if os.path.exists(status_file):
             with open(status_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            active = data.get("active_workers", 0)
-            threads = data.get("threads", [])
-            timestamp = data.get("timestamp", "N/A")
+            print(f"Last Updated   : {data.get('timestamp', 'N/A')}")
 
-            print(f"Active Workers : {active}")
-            print(f"Worker Names   : {', '.join(threads) if threads else '(none)'}")
-            print(f"Last Updated   : {timestamp}")
-        else:
-            print("Active Workers : 0 (no active threads)")
+            autoscale = data.get("autoscale") or {}
+            if autoscale.get("enabled"):
+                print(f"Autoscaling    : {autoscale['min_workers']}-{autoscale['max_workers']} workers")
+                sample = autoscale.get("last_sample")
+                if sample:
+                    load = sample["load_per_cpu"]
+                    print(
+                        f"Last Decision  : {sample['action']} -> {sample['target']} ({sample['reason']}); "
+                        f"ready={sample['ready']}, oldest={sample['oldest_ready_age']}s, "
+                        f"load={load if load is not None else 'n/a'}"
+                    )
+                for event in (autoscale.get("history") or [])[-5:]:
+                    print(f"  {event['timestamp']}  {event['action']:<4} {event['workers']} -> {event['target']}  "
+                          f"({event['reason']})")
+
+            log = data.get("logging")
+            if log:
+                print(f"Console Log    : {log['format']} >= {log['level']}; written={log['written']}, "
+                      f"dropped={log['dropped']}, suppressed={log['suppressed']}, queued={log['queued']}")
+
+            phases = data.get("phases") or {}
+            if phases:
+                print("\nPhase Timing (ms: avg / max, count)")
+                print("-" * 50)
+                for name, stats in sorted(phases.items(), key=lambda item: -item[1]["total_ms"]):
+                    print(f"{name:<16}: {stats['avg_ms']:>9.3f} / {stats['max_ms']:>9.3f}  ({stats['count']})")
+
+            rate_limits = data.get("rate_limits") or {}
+            if rate_limits:
+                print("\nRate Limits (tokens / burst @ rate/s)")
+                print("-" * 50)
+                for key, bucket in rate_limits.items():
+                    print(f"{key:<24}: {bucket['tokens']:g} / {bucket['burst']:g} @ {bucket['rate']:g}/s")
     except Exception as e:
         print(f"Warning: Could not read worker status ({e})")
 
+    # ----------------------------------------------------------------------
+    # Resource Usage (job_runs aggregates)
+    # ----------------------------------------------------------------------
+    try:
+        stats = db.run_stats_by_command(limit=5)
+        if stats:
+            print("\nTop Commands by CPU")
+            print("-" * 50)
+            for row in stats:
+                print(
+                    f"{row['command'][:40]:<40} runs={row['runs']:<4} cpu={row['cpu_total']}s "
+                    f"wall_avg={row['wall_avg']}s max_rss={row['max_rss_kb'] or 0}KiB timeouts={row['timeouts']}"
+                )
+    except Exception as e:
+        print(f"Warning: Could not read resource usage ({e})")
+
+    # ----------------------------------------------------------------------
+    # Fan-out Progress (map_progress counters)
+    # ----------------------------------------------------------------------
+    try:
+        maps = db.list_active_maps()
+        if maps:
+            print("\nFan-out Jobs (done / created / total)")
+            print("-" * 50)
+            for m in maps:
+                total = m["total"] if m["total"] is not None else "?"
+                print(f"{m['job_id']:<36} {m['completed'] + m['dead']} / {m['created']} / {total}"
+                      + (f"  ({m['dead']} dead)" if m["dead"] else ""))
+    except Exception as e:
+        print(f"Warning: Could not read fan-out progress ({e})")
+
+    # ----------------------------------------------------------------------
+    # Result Cache
+    # ----------------------------------------------------------------------
+    try:
+        cache = db.cache_stats()
+        lookups = cache["hits"] + cache["misses"]
+        if cache["entries"] or lookups:
+            hit_rate = f"{cache['hits'] / lookups:.0%}" if lookups else "n/a"
+            print("\nResult Cache")
+            print("-" * 50)
+            print(f"Entries        : {cache['entries']} ({cache['bytes'] / 1024:.1f} KiB)")
+            print(f"Hits / Misses  : {cache['hits']} / {cache['misses']} (hit rate {hit_rate})")
+            print(f"Evictions      : {cache['evictions']}")
+    except Exception as e:
+        print(f"Warning: Could not read result cache stats ({e})")
+
+    # ----------------------------------------------------------------------
+    # Starvation (ready-job wait times, priority aging)
+    # ----------------------------------------------------------------------
+    try:
+        aging = AgingPolicy(ConfigManager().get_value("aging"))
+        stats = db.starvation_stats(aging.starve_after)
+        if stats["ready"]:
+            print("\nStarvation")
+            print("-" * 50)
+            print(f"Ready Jobs     : {stats['ready']} (oldest waiting {stats['oldest_wait']:g}s)")
+            print(f"Starving       : {stats['starving']} ready for over {aging.starve_after:g}s")
+            if aging.enabled:
+                print(f"Aging          : +{aging.step} every {aging.interval:g}s up to {aging.max_priority}; "
+                      f"{stats['aged']} job(s) promoted")
+    except Exception as e:
+        print(f"Warning: Could not read starvation metrics ({e})")
+
+    # ----------------------------------------------------------------------
+    # Concurrency Keys (running / limit)
+    # ----------------------------------------------------------------------
+    try:
+        slots = db.concurrency_usage()
+        if slots:
+            print("\nConcurrency Keys (running / limit)")
+            print("-" * 50)
+            for slot in slots:
+                full = "  FULL" if slot["running"] >= slot["max_running"] else ""
+                print(f"{slot['key']:<24}: {slot['running']} / {slot['max_running']}{full}")
+    except Exception as e:
+        print(f"Warning: Could not read concurrency keys ({e})")
+
+    # ----------------------------------------------------------------------
+    # Backpressure (queue_depth counters vs. watermarks)
+    # ----------------------------------------------------------------------
+    try:
+        policy = AdmissionPolicy(ConfigManager().get_value("backpressure"))
+        depths = [d for d in db.queue_depths() if d["queue"] in policy.watermarks or d["throttled"] or d["shed"]]
+        if depths:
+            print("\nBackpressure (pending / high, low)")
+            print("-" * 50)
+            for d in depths:
+                mark = policy.watermarks.get(d["queue"])
+                limits = f"{mark.high}, {mark.low} [{mark.mode}]" if mark else "-"
+                name = "(all queues)" if d["queue"] == "*" else d["queue"]
+                print(f"{name:<16}: {d['pending']} / {limits}"
+                      + ("  SATURATED" if d["saturated"] else "")
+                      + f"  throttled={d['throttled']} shed={d['shed']}")
+    except Exception as e:
+        print(f"Warning: Could not read backpressure state ({e})")
+
     # ----------------------------------------------------------------------
     # Stop Signal Info
     # ----------------------------------------------------------------------
@@ -3,13 +3,23 @@ import time
 import os
 from core.worker_engine import WorkerManager
 from core.config import ConfigManager
+from core import capabilities
+from core.lease import RemoteDatabase, LeaseError
 
 app = typer.Typer(help="Start or stop background worker threads for job processing.")
 
 
 @app.command()
 def start(
-    count: int = typer.Option(None, "--count", "-c", help="Number of workers to start (overrides config)")
+    count: int = typer.Option(None, "--count", "-c", help="Number of workers to start (overrides config)"),
+    min_workers: int = typer.Option(None, "--min", help="Minimum pool size when autoscaling (overrides config)"),
+    max_workers: int = typer.Option(None, "--max", help="Maximum pool size when autoscaling (overrides config)"),
+    trace: str = typer.Option(None, "--trace", help="Record per-phase spans and write a Chrome trace JSON here on exit"),
+    profile: bool = typer.Option(False, "--profile", help="Profile all worker threads and dump stats on exit"),
+    profile_output: str = typer.Option("queuectl.prof", "--profile-output", help="pstats file written by --profile"),
+    tags: str = typer.Option(None, "--tags", help="Comma-separated capabilities, e.g. 'gpu,highmem' (overrides config)"),
+    server: str = typer.Option(None, "--server", help="Lease server to claim jobs from (host:port or unix:/path) "
+                                                      "instead of the local database"),
 ):
     """
     Start one or more worker threads to process pending jobs.
@@ -22,13 +32,45 @@ def start(
     config_data = config.load()
     worker_count = count or config_data.get("worker_count", 1)
     backoff_base = config_data.get("backoff_base", 2)
-
+    if tags is not None:
+        try:
+            capabilities.satisfied_keys(tags)
+        except ValueError as e:
+            typer.secho(f"Error: Invalid --tags ({e}).", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+    token = (config_data.get("lease_server") or {}).get("token")
+    if server is not None:
+        probe = None
+        try:
+            probe = RemoteDatabase(server, token)
+            probe.ready_stats()
+        except (ValueError, LeaseError) as e:
+            typer.secho(f"Error: Cannot use lease server '{server}' ({e}).", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        finally:
+            if probe is not None:
+                probe.close()
 
     typer.echo(f"Configured Worker Count : {typer.style(worker_count, fg=typer.colors.GREEN)}")
     typer.echo(f"Backoff Base            : {typer.style(backoff_base, fg=typer.colors.GREEN)}")
+
+    manager = WorkerManager(
+        worker_count=worker_count, backoff_base=backoff_base, min_workers=min_workers, max_workers=max_workers,
+        trace_path=trace, profile_path=profile_output if profile else None, tags=tags,
+        server=server, token=token,
+    )
+    if manager.autoscaler.enabled:
+        bounds = f"{manager.autoscaler.min_workers}-{manager.autoscaler.max_workers}"
+        typer.echo(f"Autoscaling Range       : {typer.style(bounds, fg=typer.colors.GREEN)}")
+    if manager.server:
+        typer.echo(f"Lease Server            : {typer.style(manager.server, fg=typer.colors.GREEN)}")
+    if manager.tags:
+        typer.echo(f"Worker Tags             : {typer.style(', '.join(manager.tags), fg=typer.colors.GREEN)}")
+    if manager.profiler:
+        typer.echo(f"Profiling               : {typer.style(manager.profiler.backend, fg=typer.colors.GREEN)}")
     typer.echo("-" * 50)
 
-    manager = WorkerManager(worker_count=worker_count, backoff_base=backoff_base)
+    worker_count = manager.worker_count
     manager.start_workers()
 
     typer.echo(
@@ -50,6 +92,7 @@ def start(
             # Stop requested via stop signal file
             if os.path.exists(stop_file):
                 typer.echo(typer.style("Stop signal file detected. Stopping all workers...", fg=typer.colors.YELLOW))
+                WorkerManager.stop_flag = True
                 break
 
             # No active workers remaining
@@ -71,6 +114,8 @@ def start(
     while time.time() < deadline and any(t.is_alive() for t in getattr(WorkerManager, "workers", [])):
         time.sleep(0.2)
 
+    manager.shutdown()
+
     # Cleanup stale files
     if os.path.exists(WorkerManager.STATUS_FILE):
         os.remove(WorkerManager.STATUS_FILE)
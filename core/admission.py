@@ -0,0 +1,53 @@
+MODES = ("block", "reject", "shed")
+
+
+class Watermark:
+    """High/low pending-job watermarks for one scope (a queue, or '*' for all queues)."""
+
+    def __init__(self, scope: str, high: int, low: int = None, mode: str = "block"):
+        if high <= 0:
+            raise ValueError(f"{scope}: 'high' must be positive")
+        low = int(high * 0.9) if low is None else low
+        if not 0 <= low <= high:
+            raise ValueError(f"{scope}: 'low' must be between 0 and 'high'")
+        if mode not in MODES:
+            raise ValueError(f"{scope}: mode must be one of {', '.join(MODES)}")
+        self.scope = scope
+        self.high = int(high)
+        self.low = int(low)
+        self.mode = mode
+
+
+class AdmissionPolicy:
+    """
+    Enqueue admission control from the "backpressure" config key, e.g.
+        {"high": 100000, "low": 80000, "mode": "block", "timeout": 30,
+         "queues": {"reports": {"high": 500, "mode": "shed"}}}
+
+    Each scope with a `high` watermark admits jobs until its pending count
+    reaches `high`, then stays saturated until the count falls to `low`.
+    While saturated, `block` makes enqueue wait (up to `timeout` seconds),
+    `reject` fails it, and `shed` moves the scope's lowest-priority pending
+    job to the DLQ to make room for a higher-priority one. Queues inherit
+    the global mode unless they set their own.
+    """
+
+    def __init__(self, settings: dict = None):
+        settings = settings or {}
+        mode = settings.get("mode", "block")
+        self.timeout = float(settings.get("timeout", 30))
+        self.watermarks = {}
+        if settings.get("high"):
+            self.watermarks["*"] = Watermark("*", int(settings["high"]), settings.get("low"), mode)
+        for queue, spec in (settings.get("queues") or {}).items():
+            if isinstance(spec, (int, float)):
+                spec = {"high": spec}
+            self.watermarks[queue] = Watermark(queue, int(spec["high"]), spec.get("low"), spec.get("mode", mode))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.watermarks)
+
+    def scopes_for(self, queue: str):
+        """Watermarks that apply to a job in `queue`: the queue's own first, then the global one."""
+        return [w for w in (self.watermarks.get(queue), self.watermarks.get("*")) if w is not None]
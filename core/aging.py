@@ -0,0 +1,34 @@
+from core.timeutil import parse_duration
+
+
+class AgingPolicy:
+    """
+    Priority aging from the "aging" config key, e.g.
+        {"interval": "5m", "step": 1, "max_priority": 10, "starve_after": "30m"}
+
+    A pending job gains `step` priority for every `interval` it has been
+    ready to run (since its run_at), up to `max_priority`, so low-priority
+    work cannot be starved by a steady stream of urgent jobs. Promotion is
+    a periodic batch UPDATE run by each worker process's heartbeat thread;
+    the claim itself is untouched and stays an index seek. The target
+    priority is computed from the wait time, so concurrent promoters
+    never double-promote. Jobs ready for longer than `starve_after` are
+    reported as starving.
+    """
+
+    DEFAULTS = {"interval": "5m", "step": 1, "max_priority": 10, "starve_after": "30m"}
+
+    def __init__(self, settings: dict = None):
+        self.enabled = bool(settings) and settings.get("enabled", True) is not False
+        opts = {**self.DEFAULTS, **(settings or {})}
+        self.interval = parse_duration(opts["interval"])
+        self.step = int(opts["step"])
+        self.max_priority = int(opts["max_priority"])
+        self.starve_after = parse_duration(opts["starve_after"])
+        if self.interval <= 0 or self.step <= 0 or self.starve_after <= 0:
+            raise ValueError("interval, step and starve_after must be positive")
+
+    @property
+    def check_every(self) -> float:
+        """Seconds between promotion passes: a quarter interval, at most a minute."""
+        return max(1.0, min(self.interval / 4, 60.0))
@@ -0,0 +1,112 @@
+import math
+import os
+import time
+
+
+class ScaleDecision:
+    """Result of one autoscaler evaluation."""
+
+    def __init__(self, target: int, action: str, reason: str):
+        self.target = target
+        self.action = action  # 'up', 'down' or 'hold'
+        self.reason = reason
+
+    def to_dict(self) -> dict:
+        return {"target": self.target, "action": self.action, "reason": self.reason}
+
+
+class Autoscaler:
+    """
+    Decides the worker pool size from queue backlog and host load.
+
+    - Scale up when the ready backlog exceeds `backlog_per_worker` jobs per
+      worker, or the oldest ready job has waited longer than `max_wait`
+      seconds, for `up_streak` consecutive evaluations, and the host's
+      per-CPU load average is below `max_load`.
+    - Scale down one worker at a time when nothing is ready and some
+      workers are idle for `down_streak` consecutive evaluations, or
+      immediately when the host is overloaded (load > 1.5 x max_load).
+    - After any change, further scale-ups wait `up_cooldown` seconds and
+      scale-downs wait `down_cooldown` seconds.
+    """
+
+    DEFAULTS = {
+        "interval": 5,
+        "backlog_per_worker": 2,
+        "max_wait": 10,
+        "max_load": 1.0,
+        "up_streak": 2,
+        "down_streak": 3,
+        "up_cooldown": 10,
+        "down_cooldown": 30,
+    }
+
+    def __init__(self, min_workers: int, max_workers: int, settings: dict = None):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        opts = {**self.DEFAULTS, **(settings or {})}
+        self.interval = float(opts["interval"])
+        self.backlog_per_worker = float(opts["backlog_per_worker"])
+        self.max_wait = float(opts["max_wait"])
+        self.max_load = float(opts["max_load"])
+        self.up_streak = int(opts["up_streak"])
+        self.down_streak = int(opts["down_streak"])
+        self.up_cooldown = float(opts["up_cooldown"])
+        self.down_cooldown = float(opts["down_cooldown"])
+
+        self._pressure = 0
+        self._slack = 0
+        self._last_change = float("-inf")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > self.min_workers
+
+    @staticmethod
+    def host_load():
+        """1-minute load average per CPU, or None where unavailable."""
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            return None
+
+    def decide(self, current: int, depth: int, oldest_age: float, idle: int, load=None, now=None) -> ScaleDecision:
+        """Evaluate one sample and return the desired pool size."""
+        now = time.monotonic() if now is None else now
+        since_change = now - self._last_change
+
+        if current < self.min_workers:
+            return self._change(now, self.min_workers, "up", "below min_workers")
+        if current > self.max_workers:
+            return self._change(now, self.max_workers, "down", "above max_workers")
+
+        overloaded = load is not None and load > self.max_load * 1.5
+        backlogged = depth > current * self.backlog_per_worker or (depth > 0 and oldest_age > self.max_wait)
+        drained = depth == 0 and idle > 0
+
+        self._pressure = self._pressure + 1 if backlogged else 0
+        self._slack = self._slack + 1 if drained else 0
+
+        if overloaded and current > self.min_workers and since_change >= self.down_cooldown:
+            return self._change(now, current - 1, "down", f"host load {load:.2f}/cpu")
+
+        if self._pressure >= self.up_streak and current < self.max_workers:
+            if load is not None and load >= self.max_load:
+                return ScaleDecision(current, "hold", f"backlog {depth} but host load {load:.2f}/cpu")
+            if since_change < self.up_cooldown:
+                return ScaleDecision(current, "hold", "scale-up cooldown")
+            wanted = max(current + 1, math.ceil(depth / self.backlog_per_worker))
+            target = min(self.max_workers, wanted)
+            return self._change(now, target, "up", f"backlog {depth}, oldest {oldest_age:.0f}s")
+
+        if self._slack >= self.down_streak and current > self.min_workers:
+            if since_change < self.down_cooldown:
+                return ScaleDecision(current, "hold", "scale-down cooldown")
+            return self._change(now, current - 1, "down", f"queue drained, {idle} idle")
+
+        return ScaleDecision(current, "hold", "steady")
+
+    def _change(self, now: float, target: int, action: str, reason: str) -> ScaleDecision:
+        self._last_change = now
+        self._pressure = self._slack = 0
+        return ScaleDecision(target, action, reason)
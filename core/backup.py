@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+from core.storage import EXPORT_TABLES
+
+EXPORT_FORMAT = "queuectl-export"
+EXPORT_VERSION = 1
+
+
+def export_store(db, path, chunk_size: int = 1000, progress=None) -> dict:
+    """
+    Write the queue (EXPORT_TABLES) to a gzip-compressed JSON-lines file:
+    a header line, then per table a {"table", "columns"} line followed by
+    one JSON array per row, and a closing {"end": counts} line so a
+    truncated file is detected on import. Rows are read and written a page
+    at a time; the file appears under `path` only once complete.
+    `progress(table, rows_so_far)` is called after every page.
+    """
+    counts = {table: 0 for table in EXPORT_TABLES}
+    partial = f"{path}.partial"
+    with gzip.open(partial, "wt", encoding="utf-8", compresslevel=6) as out:
+        out.write(json.dumps({
+            "format": EXPORT_FORMAT, "version": EXPORT_VERSION,
+            "exported_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        }) + "\n")
+        for table in EXPORT_TABLES:
+            out.write(json.dumps({"table": table, "columns": db.table_columns(table)}) + "\n")
+            for page in db.iter_table(table, chunk_size):
+                out.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in page))
+                counts[table] += len(page)
+                if progress:
+                    progress(table, counts[table])
+        out.write(json.dumps({"end": counts}) + "\n")
+    os.replace(partial, path)
+    return counts
+
+
+def import_store(db, path, chunk_size: int = 1000, pause: float = 0.05, progress=None) -> dict:
+    """
+    Load an export_store file, `chunk_size` rows per transaction with a
+    `pause`-second sleep between chunks so running workers keep claiming.
+    Rows whose key already exists are skipped, which makes re-importing
+    the same file (e.g. after an interrupted import) harmless.
+    Returns {table: (read, inserted)}; raises ValueError for a file that is
+    not an export or was truncated.
+    """
+    stats = {}
+    table = columns = None
+    batch = []
+
+    def flush():
+        if batch:
+            read, inserted = stats[table]
+            stats[table] = (read + len(batch), inserted + db.import_rows(table, columns, batch))
+            batch.clear()
+            if progress:
+                progress(table, *stats[table])
+            time.sleep(pause)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"{path} is not a queuectl export")
+        if header.get("version", 0) > EXPORT_VERSION:
+            raise ValueError(f"{path} was written by a newer version (format v{header['version']})")
+        end = None
+        for line in f:
+            record = json.loads(line)
+            if isinstance(record, list):
+                if table is None:
+                    raise ValueError(f"{path} has rows before a table header")
+                batch.append(record)
+                if len(batch) >= chunk_size:
+                    flush()
+            elif "table" in record:
+                flush()
+                table, columns = record["table"], record["columns"]
+                if table not in EXPORT_TABLES:
+                    raise ValueError(f"{path} contains unknown table '{table}'")
+                stats.setdefault(table, (0, 0))
+            elif "end" in record:
+                flush()
+                end = record["end"]
+        flush()
+    if end is None:
+        raise ValueError(f"{path} is truncated (rows read so far were imported; re-run after fixing the file)")
+    return stats
@@ -0,0 +1,37 @@
+import re
+from itertools import combinations
+
+MAX_TAGS = 8
+TAG_PATTERN = re.compile(r"^[A-Za-z0-9_.:-]+$")
+
+
+def parse_tags(tags) -> list:
+    """Normalize a tag list or comma-separated string into sorted, unique tags."""
+    if tags is None:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    if not isinstance(tags, (list, tuple)) or not all(isinstance(t, str) for t in tags):
+        raise ValueError("tags must be a list of strings or a comma-separated string")
+    tags = sorted({t.strip() for t in tags if t.strip()})
+    for tag in tags:
+        if not TAG_PATTERN.match(tag):
+            raise ValueError(f"invalid tag '{tag}' (letters, digits and _ . : - only)")
+    return tags
+
+
+def requirement_key(tags) -> str:
+    """Canonical form of a job's `requires` set, as stored in jobs.requires ('' = runs anywhere)."""
+    return ",".join(parse_tags(tags))
+
+
+def satisfied_keys(tags) -> list:
+    """
+    Every requirement key a worker with `tags` can run: all subsets of its
+    tags, including the empty one. The claim looks these up in an index,
+    so jobs needing tags the worker lacks are never visited.
+    """
+    tags = parse_tags(tags)
+    if len(tags) > MAX_TAGS:
+        raise ValueError(f"a worker can have at most {MAX_TAGS} tags")
+    return [",".join(subset) for size in range(len(tags) + 1) for subset in combinations(tags, size)]
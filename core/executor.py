@@ -0,0 +1,211 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class CallableResult:
+    """Outcome of a callable job, shaped like subprocess.CompletedProcess."""
+
+    def __init__(self, returncode: int, stdout: str = "", stderr: str = "", usage: dict = None):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.usage = usage or {}
+
+
+# ----------------------------------------------------------------------
+# Executor Process Side
+# ----------------------------------------------------------------------
+def _resolve(target: str, cache: dict):
+    """Import 'pkg.module:func' once per interpreter and cache the callable."""
+    func = cache.get(target)
+    if func is None:
+        module_name, _, attr = target.partition(":")
+        func = importlib.import_module(module_name)
+        for part in (attr or "main").split("."):
+            func = getattr(func, part)
+        cache[target] = func
+    return func
+
+
+def _rss_kb() -> int:
+    """Current resident set size of this process in KiB."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        if resource is not None:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return 0
+
+
+def _cpu_times():
+    """(user, sys) CPU seconds consumed so far by this process."""
+    if resource is None:
+        return 0.0, 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime, usage.ru_stime
+
+
+def _executor_main(conn):
+    """Serve (target, args, kwargs) requests until the pipe closes."""
+    # Ctrl+C is handled by the parent, which recycles executors itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cache = {}
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        target, args, kwargs = request
+        user_before, sys_before = _cpu_times()
+        try:
+            value = _resolve(target, cache)(*args, **kwargs)
+            reply = (0, "" if value is None else repr(value), "")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            reply = (code, "", "" if code == 0 else str(e.code))
+        except BaseException:
+            reply = (1, "", traceback.format_exc())
+        user_after, sys_after = _cpu_times()
+        conn.send(reply + (_rss_kb(), user_after - user_before, sys_after - sys_before))
+
+
+# ----------------------------------------------------------------------
+# Pool (Worker Side)
+# ----------------------------------------------------------------------
+class _ExecutorProcess:
+    """A single warm interpreter and the pipe used to talk to it."""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_executor_main, args=(child_conn,), name="QueueCTL-Executor", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def close(self):
+        """Ask the interpreter to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+class WarmExecutorPool:
+    """
+    Pool of preforked Python interpreters for callable jobs.
+
+    Each executor keeps its imported modules between jobs, so a callable
+    job costs a pipe round trip instead of a fork/exec plus interpreter
+    start-up. Executors are replaced when a job times out, after
+    `max_tasks` jobs, or once their RSS exceeds `max_rss_mb`. At most
+    `size` executors are kept idle; extra ones started while every
+    executor was busy are closed when they are handed back.
+    """
+
+    def __init__(self, size: int = 1, max_tasks: int = 100, max_rss_mb: int = 512):
+        self.size = max(1, size)
+        self.max_tasks = max_tasks
+        self.max_rss_kb = max_rss_mb * 1024
+        # Executors are started while worker, heartbeat and log threads run, and
+        # fork() from a multithreaded process can leave the child stuck on a
+        # lock another thread held. The forkserver is a fresh single-threaded
+        # interpreter that has already imported __main__ (the CLI entry point)
+        # and this module, so forking from it stays cheap. Windows uses spawn.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self.ctx = multiprocessing.get_context("forkserver")
+            self.ctx.set_forkserver_preload(["__main__", __name__])
+        else:
+            self.ctx = multiprocessing.get_context("spawn")
+        self.idle = queue.LifoQueue()
+        self.warmed = False
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Start the full pool (WorkerManager does this before starting threads)."""
+        with self._lock:
+            if self.warmed:
+                return
+            self.warmed = True
+            for _ in range(self.size):
+                self.idle.put(_ExecutorProcess(self.ctx))
+
+    def _checkin(self, proc):
+        """Hand an executor back to the pool, closing it if the pool is already full."""
+        with self._lock:
+            if self.idle.qsize() < self.size:
+                self.idle.put(proc)
+                return
+        proc.close()
+
+    def _replace(self):
+        """Start a replacement for a retired executor if the pool has room for it."""
+        with self._lock:
+            if self.idle.qsize() < self.size:
+                self.idle.put(_ExecutorProcess(self.ctx))
+
+    def run(self, target: str, args=(), kwargs=None, timeout: float = None) -> CallableResult:
+        """Execute `target(*args, **kwargs)` in a warm executor."""
+        self.warm()
+        started = time.monotonic()
+        try:
+            proc = self.idle.get_nowait()
+        except queue.Empty:
+            proc = _ExecutorProcess(self.ctx)
+
+        try:
+            proc.conn.send((target, list(args or ()), dict(kwargs or {})))
+            if not proc.conn.poll(timeout):
+                proc.kill()
+                self._replace()
+                raise subprocess.TimeoutExpired(target, timeout)
+            returncode, stdout, stderr, rss_kb, cpu_user, cpu_sys = proc.conn.recv()
+        except (EOFError, OSError) as e:
+            proc.kill()
+            self._replace()
+            return CallableResult(1, "", f"Executor process exited unexpectedly: {e}")
+
+        proc.tasks += 1
+        if proc.tasks >= self.max_tasks or rss_kb > self.max_rss_kb:
+            proc.close()
+            self._replace()
+        else:
+            self._checkin(proc)
+        usage = {
+            "wall_time": round(time.monotonic() - started, 3),
+            "cpu_user": round(cpu_user, 3),
+            "cpu_sys": round(cpu_sys, 3),
+            "max_rss_kb": rss_kb,
+        }
+        return CallableResult(returncode, stdout, stderr, usage)
+
+    def shutdown(self):
+        """Stop all idle executors."""
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,71 @@
+import glob
+import os
+import shlex
+
+SOURCES = ("items", "file", "glob")
+
+
+def validate_source(source: dict):
+    """Check a map job's item source: exactly one of items (list), file (path) or glob (pattern)."""
+    given = [name for name in SOURCES if source.get(name) is not None]
+    if len(given) != 1:
+        raise ValueError("give exactly one of 'items', 'file' or 'glob'")
+    if given[0] == "items":
+        if not isinstance(source["items"], list) or not all(isinstance(i, str) for i in source["items"]):
+            raise ValueError("'items' must be a list of strings")
+    elif not isinstance(source[given[0]], str):
+        raise ValueError(f"'{given[0]}' must be a string")
+
+
+def read_items(source: dict, cursor: int, count: int, spill_path: str):
+    """
+    Read up to `count` items starting at `cursor`.
+    Returns (items, new_cursor, exhausted).
+
+    For inline lists the cursor is an index. Files are read line by line
+    from a byte offset, so each chunk costs O(chunk) no matter how far in
+    it is. A glob is expanded (sorted) once into `spill_path` and then read
+    like a file.
+    """
+    if source.get("items") is not None:
+        items = source["items"][cursor:cursor + count]
+        new_cursor = cursor + len(items)
+        return items, new_cursor, new_cursor >= len(source["items"])
+
+    path = source.get("file")
+    if path is None:
+        path = spill_path
+        if not os.path.exists(spill_path):
+            matches = sorted(glob.glob(source["glob"], recursive=True))
+            tmp_path = f"{spill_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(m + "\n" for m in matches)
+            os.replace(tmp_path, spill_path)
+
+    items = []
+    with open(path, "rb") as f:
+        f.seek(cursor)
+        while len(items) < count:
+            line = f.readline()
+            if not line:
+                break
+            item = line.decode("utf-8").rstrip("\r\n")
+            if item:
+                items.append(item)
+        new_cursor = f.tell()
+        exhausted = new_cursor >= os.fstat(f.fileno()).st_size
+    return items, new_cursor, exhausted
+
+
+def child_id(parent_id: str, index: int) -> str:
+    return f"{parent_id}.{index}"
+
+
+def render(template: str, item: str, index: int, parent_id: str) -> str:
+    """
+    Fill a command template: {item} is shell-quoted, {index} is the item's
+    position and {parent} the map job's id.
+    """
+    return (template.replace("{item}", shlex.quote(item))
+            .replace("{index}", str(index))
+            .replace("{parent}", parent_id))
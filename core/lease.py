@@ -0,0 +1,414 @@
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from core.storage import Database, DuplicateJobError, QueueFullError, UnknownDependencyError
+from core.rollups import LatencySketch
+
+# Database methods a remote worker may call: claiming and finishing jobs,
+# heartbeats/metrics, map expansion, result cache and schedule firing.
+LEASE_METHODS = frozenset({
+    "fetch_next_pending_job", "update_job_status", "fail_job", "expand_map", "get_map_progress",
+    "cache_lookup", "complete_from_cache", "cache_store", "record_cache_lookups",
+    "record_runs", "merge_rollups", "upsert_workers", "purge_workers", "prune_rollups", "trim_events",
+    "ready_stats", "promote_waiting_jobs",
+    "add_job", "get_schedule", "list_schedules", "schedule_template", "advance_schedule",
+})
+# Calls the client may resend after reconnecting: reads, idempotent writes, and
+# claims (the server releases whatever the dropped connection had leased).
+RETRY_SAFE = frozenset({
+    "fetch_next_pending_job", "get_map_progress", "cache_lookup", "ready_stats", "promote_waiting_jobs",
+    "upsert_workers", "purge_workers", "prune_rollups", "trim_events",
+    "get_schedule", "list_schedules", "schedule_template",
+})
+# Calls that finish a claimed job; only the connection holding its lease may make them.
+_LEASED_CALLS = frozenset({"update_job_status", "fail_job", "complete_from_cache", "expand_map"})
+# Exceptions re-raised on the client with their attributes.
+_ERRORS = {
+    "DuplicateJobError": (DuplicateJobError, ("job_id", "status")),
+    "QueueFullError": (QueueFullError, ("scope", "pending", "high", "mode")),
+    "UnknownDependencyError": (UnknownDependencyError, ("job_ids",)),
+}
+
+
+class LeaseError(RuntimeError):
+    """The lease server refused a call or could not be reached."""
+
+
+class LeaseLostError(LeaseError):
+    """
+    The job's lease is gone: the connection dropped while finishing it (the
+    server requeued it for another worker), so the worker must abandon it.
+    """
+
+
+def parse_address(address: str):
+    """'host:port' for TCP or 'unix:/path/to.sock' for a Unix socket -> (family, address)."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"invalid address '{address}' (expected host:port or unix:/path)")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def is_loopback(address: str) -> bool:
+    """True for Unix sockets and TCP addresses only reachable from this host."""
+    family, target = parse_address(address)
+    if family == socket.AF_UNIX:
+        return True
+    host = target[0].strip("[]")
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _default(value):
+    if isinstance(value, LatencySketch):
+        return {"__sketch__": {str(k): v for k, v in value.counts.items()}}
+    if hasattr(value, "keys"):  # sqlite3.Row
+        return dict(value)
+    raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+def _object_hook(obj):
+    if "__sketch__" in obj and len(obj) == 1:
+        return LatencySketch({int(k): v for k, v in obj["__sketch__"].items()})
+    return obj
+
+
+def encode(message) -> bytes:
+    return json.dumps(message, default=_default, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes):
+    return json.loads(line, object_hook=_object_hook)
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+class _LeaseTable:
+    """
+    Leases granted by one server: job id -> (connection, deadline). A lease
+    lasts `ttl` seconds from the claim and is extended whenever a heartbeat
+    reports the job as running, so a worker that goes silent (crashed host,
+    half-open connection) loses its jobs even if its socket never closes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.deadlines = {}
+
+    def grant(self, handler, job_id):
+        with self.lock:
+            handler.leased.add(job_id)
+            self.deadlines[job_id] = (handler, time.monotonic() + self.ttl)
+
+    def renew(self, job_ids):
+        deadline = time.monotonic() + self.ttl
+        with self.lock:
+            for job_id in job_ids:
+                if job_id in self.deadlines:
+                    self.deadlines[job_id] = (self.deadlines[job_id][0], deadline)
+
+    def drop(self, handler, job_ids):
+        with self.lock:
+            for job_id in job_ids:
+                handler.leased.discard(job_id)
+                if self.deadlines.get(job_id, (None,))[0] is handler:
+                    del self.deadlines[job_id]
+
+    def take_expired(self):
+        """Remove and return (job_id, handler) for every lease past its deadline."""
+        now = time.monotonic()
+        with self.lock:
+            expired = [(job_id, handler) for job_id, (handler, deadline) in self.deadlines.items() if deadline <= now]
+            for job_id, handler in expired:
+                self.drop(handler, [job_id])
+        return expired
+
+
+class _LeaseHandler(socketserver.StreamRequestHandler):
+    """
+    One connection = one remote worker thread. Requests are JSON lines,
+    either {"id": n, "call": name, "args": [...], "kwargs": {...}} or
+    {"id": n, "batch": [call, ...]} (one round trip, answered with
+    "results"). Jobs claimed over the connection are leased to it: if it
+    drops before finishing them, or their lease expires without a
+    heartbeat renewing it, they go back to 'pending'.
+    """
+
+    def setup(self):
+        super().setup()
+        if self.request.family != socket.AF_UNIX:
+            # Let the kernel notice peers that vanished without closing the connection.
+            self.request.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, max(1, int(self.server.leases.ttl)))
+        self.db = Database(self.server.db_path)
+        self.leased = set()
+
+    def handle(self):
+        token = self.server.token
+        if token is not None:
+            hello = self.rfile.readline()
+            given = str(decode(hello).get("token") or "") if hello else ""
+            if not hmac.compare_digest(given.encode(), token.encode()):
+                self.wfile.write(encode({"error": {"type": "LeaseError", "message": "invalid token"}}))
+                return
+            self.wfile.write(encode({"ok": True}))
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request = decode(line)
+            if "batch" in request:
+                reply = {"id": request.get("id"), "results": [self._dispatch(call) for call in request["batch"]]}
+            else:
+                reply = {"id": request.get("id"), **self._dispatch(request)}
+            self.wfile.write(encode(reply))
+            self.wfile.flush()
+
+    def finish(self):
+        leases = self.server.leases
+        try:
+            with leases.lock:
+                held = sorted(self.leased)
+                leases.drop(self, held)
+                if held:
+                    self.db.release_jobs(held)
+        finally:
+            self.db.con.close()
+            super().finish()
+
+    def hang_up(self):
+        """Close the connection from the server side (its leases have expired)."""
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _dispatch(self, call):
+        name = call.get("call")
+        args, kwargs = call.get("args") or [], call.get("kwargs") or {}
+        if name not in LEASE_METHODS:
+            return {"error": {"type": "LeaseError", "message": f"method '{name}' is not available remotely"}}
+        if name in _LEASED_CALLS:
+            job_id = args[0]["id"] if name == "expand_map" else args[0]
+            # Held across the call so the reaper cannot requeue the job while it is being finished.
+            with self.server.leases.lock:
+                if job_id not in self.leased:
+                    return {"error": {"type": "LeaseLostError", "message": f"job {job_id} is not leased to this worker"}}
+                return self._call(name, args, kwargs)
+        return self._call(name, args, kwargs)
+
+    def _call(self, name, args, kwargs):
+        try:
+            result = getattr(self.db, name)(*args, **kwargs)
+        except Exception as e:
+            attrs = {attr: getattr(e, attr) for attr in _ERRORS.get(type(e).__name__, (None, ()))[1]}
+            return {"error": {"type": type(e).__name__, "message": str(e), "attrs": attrs}}
+        self._track(name, args, result)
+        return {"result": result}
+
+    def _track(self, name, args, result):
+        leases = self.server.leases
+        if name == "fetch_next_pending_job" and result is not None:
+            leases.grant(self, result["id"])
+        elif name == "upsert_workers":
+            # Heartbeat rows carry each worker thread's current job.
+            leases.renew([row[5] for row in args[0] if row[5]])
+        elif name == "update_job_status" and args[1] != "processing":
+            leases.drop(self, [args[0]])
+        elif name in ("fail_job", "complete_from_cache"):
+            leases.drop(self, [args[0]])
+        elif name == "expand_map":
+            leases.drop(self, [args[0]["id"]])
+
+
+class LeaseServer:
+    """
+    Job-lease server: serves `Database` calls to remote workers
+    (`worker-start --server`) over TCP or a Unix socket, so executor hosts
+    need no access to store.db. Runs standalone (`queuectl lease-server`)
+    or embedded in the dashboard process. Leases not renewed by a
+    heartbeat within `lease_ttl` seconds are requeued.
+    """
+
+    def __init__(self, address: str, db_path=None, token: str = None, lease_ttl: float = 60.0):
+        family, bind = parse_address(address)
+        if not token and not is_loopback(address):
+            raise ValueError(f"refusing to serve {address} without a token (only loopback addresses may skip it)")
+        base = socketserver.ThreadingUnixStreamServer if family == socket.AF_UNIX else socketserver.ThreadingTCPServer
+        if family == socket.AF_UNIX and os.path.exists(bind):
+            os.remove(bind)
+        server_class = type("Server", (base,), {"daemon_threads": True, "allow_reuse_address": True})
+        self.server = server_class(bind, _LeaseHandler)
+        self.server.db_path = db_path or Database().db_path
+        self.server.token = token
+        self.server.leases = _LeaseTable(lease_ttl)
+        self.address = address
+        self._stopped = threading.Event()
+
+    def serve_forever(self):
+        threading.Thread(target=self._reap_loop, name="LeaseReaper", daemon=True).start()
+        try:
+            self.server.serve_forever(poll_interval=0.5)
+        finally:
+            self._stopped.set()
+
+    def _reap_loop(self):
+        db = Database(self.server.db_path)
+        try:
+            while not self._stopped.wait(min(max(self.server.leases.ttl / 4, 0.25), 5)):
+                self.reap_expired(db)
+        finally:
+            db.con.close()
+
+    def reap_expired(self, db: Database) -> int:
+        """Requeue jobs whose lease expired and hang up connections left holding none."""
+        leases = self.server.leases
+        with leases.lock:
+            expired = leases.take_expired()
+            if expired:
+                db.release_jobs(sorted(job_id for job_id, _ in expired))
+            stale = {handler for _, handler in expired if not handler.leased}
+        for handler in stale:
+            handler.hang_up()
+        return len(expired)
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread (embedded mode)."""
+        thread = threading.Thread(target=self.serve_forever, name="LeaseServer", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+class RemoteDatabase:
+    """
+    Stand-in for `Database` in remote workers: each LEASE_METHODS call is
+    a request to the lease server. Use one instance per thread, like a
+    sqlite connection. Inside `batch()`, calls are queued (returning None)
+    and sent together when the block exits.
+    """
+
+    def __init__(self, address: str, token: str = None, timeout: float = 30.0):
+        self.address = address
+        self.token = token
+        self.timeout = timeout
+        self._sock = self._file = None
+        self._seq = 0
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        family, target = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(target)
+        except OSError as e:
+            sock.close()
+            raise LeaseError(f"cannot reach lease server at {self.address}: {e}") from e
+        self._sock, self._file = sock, sock.makefile("rwb")
+        if self.token is not None:
+            self._file.write(encode({"token": self.token}))
+            self._file.flush()
+            reply = decode(self._file.readline() or b"{}")
+            if not reply.get("ok"):
+                self.close()
+                raise LeaseError("lease server rejected the token")
+
+    def close(self):
+        for closable in (self._file, self._sock):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._sock = self._file = None
+
+    def _roundtrip(self, message, resend=True):
+        """
+        Send one request and read its reply. If the connection dropped, the
+        request is resent once over a new connection only when `resend` is
+        set; otherwise the server may already have applied it (and requeued
+        this connection's jobs), so LeaseLostError is raised instead.
+        """
+        with self._lock:
+            self._seq += 1
+            message["id"] = self._seq
+            for attempt in (1, 2):
+                sent = False
+                try:
+                    if self._file is None:
+                        self._connect()
+                    sent = True
+                    self._file.write(encode(message))
+                    self._file.flush()
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("connection closed by lease server")
+                    return decode(line)
+                except OSError as e:
+                    self.close()
+                    if sent and not resend:
+                        raise LeaseLostError(f"connection to lease server lost mid-call: {e}") from e
+                    if attempt == 2:
+                        raise LeaseError(f"lease server call failed: {e}") from e
+
+    @staticmethod
+    def _unwrap(reply):
+        error = reply.get("error")
+        if error is None:
+            return reply.get("result")
+        cls, attrs = _ERRORS.get(error["type"], (None, ()))
+        if cls is not None:
+            raise cls(**error.get("attrs", {}))
+        if error["type"] == "ValueError":
+            raise ValueError(error["message"])
+        if error["type"] == "LeaseLostError":
+            raise LeaseLostError(error["message"])
+        raise LeaseError(f"{error['type']}: {error['message']}")
+
+    def call(self, name, *args, **kwargs):
+        request = {"call": name, "args": list(args), "kwargs": kwargs}
+        if self._pending is not None:
+            self._pending.append(request)
+            return None
+        return self._unwrap(self._roundtrip(request, resend=name in RETRY_SAFE))
+
+    @contextmanager
+    def batch(self):
+        """Queue calls made inside the block and send them in one round trip."""
+        self._pending = []
+        try:
+            yield self
+            calls = self._pending
+        finally:
+            self._pending = None
+        if calls:
+            resend = all(call["call"] in RETRY_SAFE for call in calls)
+            for reply in self._roundtrip({"batch": calls}, resend=resend)["results"]:
+                self._unwrap(reply)
+
+    def __getattr__(self, name):
+        if name not in LEASE_METHODS:
+            raise AttributeError(f"'{name}' is not available through the lease server")
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
@@ -0,0 +1,111 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens."""
+
+    def __init__(self, rate: float, burst: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(self.rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        """Credit tokens accrued since the last refill."""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def take(self):
+        """
+        Spend one token. Concurrent claims may overdraw the bucket; the debt
+        is refilled before it admits again, so the long-run rate holds.
+        """
+        self.tokens -= 1.0
+
+
+class RateLimiter:
+    """
+    Per-queue and per-tag token buckets shared by all threads of a WorkerManager.
+
+    Limits come from the "rate_limits" config key, e.g.
+        {"queue:reports": {"rate": 2, "burst": 5}, "tag:github-api": {"rate": 10}}
+
+    Buckets are consulted at claim time: exhausted queues/tags are excluded
+    from the claim query, so a worker simply picks other work instead of
+    sleeping on a limit.
+
+    Buckets live in process memory, so each worker process (local or
+    remote) enforces its own copy of a limit: N processes together admit
+    up to N times the configured rate.
+    """
+
+    KINDS = ("queue", "tag")
+
+    def __init__(self, limits: dict = None):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        for key, spec in (limits or {}).items():
+            kind, _, name = str(key).partition(":")
+            if kind not in self.KINDS or not name:
+                raise ValueError(f"Invalid rate limit key '{key}' (expected 'queue:<name>' or 'tag:<name>')")
+            if isinstance(spec, (int, float)):
+                spec = {"rate": spec}
+            self.buckets[(kind, name)] = TokenBucket(spec["rate"], spec.get("burst"))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.buckets)
+
+    # ------------------------------------------------------------------
+    # Claim Integration
+    # ------------------------------------------------------------------
+    def acquire(self, claim):
+        """
+        Run `claim(exclude_queues, exclude_tags)` with exhausted classes
+        excluded, then charge one token to the claimed job's queue and tag.
+        The lock covers only the bucket reads and the charge, not the claim
+        query, so threads do not queue behind each other's database round
+        trip. Threads claiming at the same moment may each spend the last
+        token; the bucket goes negative and stays closed until refilled.
+        """
+        if not self.buckets:
+            return claim((), ())
+
+        with self.lock:
+            now = time.monotonic()
+            blocked = {"queue": [], "tag": []}
+            for (kind, name), bucket in self.buckets.items():
+                bucket.refill(now)
+                if bucket.tokens < 1.0:
+                    blocked[kind].append(name)
+
+        job = claim(blocked["queue"], blocked["tag"])
+        if job is not None:
+            with self.lock:
+                for key in (("queue", job["queue"]), ("tag", job["tag"])):
+                    bucket = self.buckets.get(key)
+                    if bucket is not None:
+                        bucket.take()
+        return job
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        """Return current token state keyed by 'queue:<name>' / 'tag:<name>'."""
+        with self.lock:
+            now = time.monotonic()
+            state = {}
+            for (kind, name), bucket in self.buckets.items():
+                bucket.refill(now)
+                state[f"{kind}:{name}"] = {
+                    "rate": bucket.rate,
+                    "burst": bucket.burst,
+                    "tokens": round(bucket.tokens, 2),
+                }
+            return state
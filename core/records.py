@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+
+class JobRecord:
+    """
+    Compact read-only view of one jobs row, holding only the projected
+    columns in __slots__ (no per-row dict or sqlite3.Row column map).
+    Supports both `job.status` and `job["status"]`, so it can stand in for
+    a Row in CLI and template code. Use `JobRecord.projection(columns)` to
+    get the record type for a column tuple; types are cached.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("JobRecord is read-only")
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"JobRecord({', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__)})"
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def projection(columns: tuple) -> type:
+        """Record type with exactly `columns` as slots."""
+        return type("JobRecord", (JobRecord,), {"__slots__": tuple(columns)})
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class ResultCache:
+    """
+    Content-addressed cache of successful job results.
+
+    A job opts in with `cache_ttl` (seconds). Its cache key is a SHA-256 over
+    what it executes (kind, command, executor spec) and a fingerprint of its
+    declared `cache_inputs` files (path, size and mtime, like make), taken at
+    claim time. A fresh entry lets the worker complete the job without
+    spawning anything; successful runs are stored for later jobs with their
+    exit code, a reference to the job that produced them (its log holds the
+    output) and any captured stdout/stderr (callable jobs).
+
+    Entries live in the `result_cache` table and are evicted least recently
+    used first once `max_entries` or `max_mb` (config key "result_cache") is
+    exceeded. Hit/miss counters are kept in memory and flushed by the
+    heartbeat thread.
+    """
+
+    DEFAULTS = {"max_entries": 10000, "max_mb": 256}
+
+    def __init__(self, settings: dict = None):
+        settings = {**self.DEFAULTS, **(settings or {})}
+        self.max_entries = int(settings["max_entries"])
+        self.max_bytes = int(float(settings["max_mb"]) * 1024 * 1024)
+        if self.max_entries <= 0 or self.max_bytes <= 0:
+            raise ValueError("max_entries and max_mb must be positive")
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def key_for(job) -> str:
+        """Cache key of a claimed job row."""
+        spec = json.loads(job["spec"]) if job["spec"] else None
+        cwd = (spec or {}).get("cwd") or ""
+        inputs = []
+        for path in json.loads(job["cache_inputs"] or "[]"):
+            try:
+                st = os.stat(os.path.join(cwd, path))
+                inputs.append([path, st.st_size, st.st_mtime_ns])
+            except OSError:
+                inputs.append([path, None, None])
+        payload = {"kind": job["kind"], "command": job["command"], "spec": spec, "inputs": inputs}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def count(self, outcome: str):
+        """Record a lookup outcome ('hits' or 'misses')."""
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def drain(self) -> dict:
+        """Return and reset the counters accumulated since the last flush."""
+        with self._lock:
+            counts, self._counts = self._counts, {"hits": 0, "misses": 0}
+        return counts
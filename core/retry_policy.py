@@ -0,0 +1,102 @@
+import json
+import random
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed job is retried and how long it waits first.
+
+    Kinds (`delay` is the base unit in seconds, default 1):
+      - exponential:         delay * base ** attempts (base defaults to backoff_base)
+      - decorrelated_jitter: random between delay and 3x the previous delay
+      - fixed:               delay
+      - linear:              delay * attempts
+
+    Every delay is capped at `max_delay` seconds. `jitter` (0..1) randomly
+    shortens exponential/fixed/linear delays by up to that fraction so jobs
+    that failed together do not all retry in the same second.
+
+    `retry_on` lists the only exit codes that may be retried; `no_retry_on`
+    lists exit codes that go straight to the DLQ. Timeouts and launch errors
+    have no exit code and are always retried (until max_retries).
+    """
+
+    KINDS = ("exponential", "decorrelated_jitter", "fixed", "linear")
+    FIELDS = ("kind", "base", "delay", "max_delay", "jitter", "retry_on", "no_retry_on")
+
+    def __init__(self, kind: str = "exponential", base: float = 2, delay: float = 1, max_delay: float = 3600,
+                 jitter: float = 0, retry_on=None, no_retry_on=None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Invalid retry policy '{kind}' (expected one of {', '.join(self.KINDS)})")
+        if delay < 0 or max_delay < 0 or base < 1:
+            raise ValueError("Retry policy needs delay >= 0, max_delay >= 0 and base >= 1")
+        if not 0 <= jitter <= 1:
+            raise ValueError("Retry policy jitter must be between 0 and 1")
+        self.kind = kind
+        self.base = float(base)
+        self.delay = float(delay)
+        self.max_delay = float(max_delay)
+        self.jitter = float(jitter)
+        self.retry_on = {int(c) for c in retry_on} if retry_on is not None else None
+        self.no_retry_on = {int(c) for c in (no_retry_on or ())}
+
+    @classmethod
+    def from_spec(cls, spec, base: float = 2):
+        """
+        Build a policy from a kind name or a dict such as
+        {"kind": "fixed", "delay": 30, "no_retry_on": [2]}.
+        `base` is the default growth factor for exponential policies.
+        """
+        if isinstance(spec, str):
+            spec = json.loads(spec) if spec.lstrip().startswith("{") else {"kind": spec}
+        if not isinstance(spec, dict):
+            raise ValueError("Retry policy must be a policy name or an object")
+        unknown = set(spec) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown retry policy field(s): {', '.join(sorted(unknown))}")
+        return cls(**{"base": base, **spec})
+
+    def to_dict(self) -> dict:
+        data = {"kind": self.kind, "delay": self.delay, "max_delay": self.max_delay}
+        if self.kind == "exponential":
+            data["base"] = self.base
+        if self.jitter:
+            data["jitter"] = self.jitter
+        if self.retry_on is not None:
+            data["retry_on"] = sorted(self.retry_on)
+        if self.no_retry_on:
+            data["no_retry_on"] = sorted(self.no_retry_on)
+        return data
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+    def should_retry(self, exit_code) -> bool:
+        """Whether a failure with this exit code (None for timeouts/errors) may be retried."""
+        if exit_code is None:
+            return True
+        if exit_code in self.no_retry_on:
+            return False
+        return self.retry_on is None or exit_code in self.retry_on
+
+    def next_delay(self, attempts: int, last_delay: float = None) -> float:
+        """Seconds to wait before attempt `attempts + 1`, given the delay used last time."""
+        if self.kind == "decorrelated_jitter":
+            previous = max(self.delay, last_delay or self.delay)
+            return round(min(self.max_delay, random.uniform(self.delay, previous * 3)), 3)
+
+        if self.kind == "exponential":
+            # Float powers overflow for very high attempt counts; that is the cap anyway.
+            try:
+                raw = self.delay * self.base ** attempts
+            except OverflowError:
+                raw = self.max_delay
+        elif self.kind == "linear":
+            raw = self.delay * attempts
+        else:
+            raw = self.delay
+
+        delay = min(self.max_delay, raw)
+        if self.jitter:
+            delay -= delay * self.jitter * random.random()
+        return round(delay, 3)
@@ -0,0 +1,151 @@
+import json
+import math
+import threading
+from datetime import datetime, timezone, timedelta
+
+RESOLUTIONS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+RESOLUTION_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+COUNTERS = ("enqueued", "completed", "failed", "dead")
+
+
+def bucket_start(dt: datetime, resolution: str) -> str:
+    """Start of the rollup bucket containing `dt`, in storage timestamp format."""
+    return dt.strftime(RESOLUTIONS[resolution])
+
+
+class LatencySketch:
+    """
+    Mergeable log-scale histogram for duration quantiles.
+
+    Bucket i covers durations up to 1ms * sqrt(2)^i, so every estimate is
+    within ~41% of the true value. The largest bucket is ~4.6 hours; longer
+    durations share the last bucket. Two sketches merge by adding counts,
+    which lets minute rows roll up into hours and days without raw data.
+    Serialized as a sparse {index: count} JSON object.
+    """
+
+    BASE = 0.001
+    GROWTH = math.sqrt(2)
+    BUCKETS = 48
+
+    def __init__(self, counts: dict = None):
+        self.counts = counts or {}
+
+    @classmethod
+    def index(cls, seconds: float) -> int:
+        if seconds <= cls.BASE:
+            return 0
+        return min(cls.BUCKETS - 1, math.ceil(math.log(seconds / cls.BASE, cls.GROWTH)))
+
+    @classmethod
+    def upper_bound(cls, index: int) -> float:
+        return cls.BASE * cls.GROWTH ** index
+
+    @classmethod
+    def loads(cls, text):
+        if not text:
+            return cls()
+        return cls({int(k): v for k, v in json.loads(text).items()})
+
+    def dumps(self) -> str:
+        return json.dumps({str(k): v for k, v in sorted(self.counts.items())})
+
+    def add(self, seconds: float, count: int = 1):
+        i = self.index(seconds)
+        self.counts[i] = self.counts.get(i, 0) + count
+
+    def merge(self, other: "LatencySketch"):
+        for i, count in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + count
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th quantile, or None if empty."""
+        total = self.total
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return round(self.upper_bound(i), 3)
+        return round(self.upper_bound(max(self.counts)), 3)
+
+
+class RollupBuffer:
+    """
+    Per-minute counters and duration sketches accumulated in memory by
+    worker threads and drained by the heartbeat writer into `rollups`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._minutes = {}
+
+    def _entry(self, now: datetime):
+        key = bucket_start(now, "minute")
+        entry = self._minutes.get(key)
+        if entry is None:
+            entry = self._minutes[key] = {
+                **{name: 0 for name in COUNTERS},
+                "duration_sum": 0.0, "duration_count": 0, "sketch": LatencySketch(),
+            }
+        return entry
+
+    def count(self, counter: str, n: int = 1, now: datetime = None):
+        with self._lock:
+            self._entry(now or datetime.now(timezone.utc))[counter] += n
+
+    def observe(self, counter: str, duration: float = None, now: datetime = None):
+        """Count one finished run under `counter` and record its duration."""
+        with self._lock:
+            entry = self._entry(now or datetime.now(timezone.utc))
+            entry[counter] += 1
+            if duration is not None:
+                entry["duration_sum"] += duration
+                entry["duration_count"] += 1
+                entry["sketch"].add(duration)
+
+    def drain(self) -> dict:
+        """Return and reset everything buffered so far, keyed by minute bucket."""
+        with self._lock:
+            minutes, self._minutes = self._minutes, {}
+        return minutes
+
+
+def series(rows, resolution: str, points: int, now: datetime = None):
+    """
+    Expand rollup rows into `points` consecutive buckets ending at the
+    current one, filling gaps with zeros. Each point is a dict with the
+    counters, the mean duration and p50/p95 from the sketch.
+    """
+    now = now or datetime.now(timezone.utc)
+    step = timedelta(seconds=RESOLUTION_SECONDS[resolution])
+    if resolution == "day":
+        current = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif resolution == "hour":
+        current = now.replace(minute=0, second=0, microsecond=0)
+    else:
+        current = now.replace(second=0, microsecond=0)
+    by_bucket = {row["bucket"]: row for row in rows}
+
+    result = []
+    for n in range(points - 1, -1, -1):
+        bucket = bucket_start(current - n * step, resolution)
+        row = by_bucket.get(bucket)
+        point = {"bucket": bucket, **{name: (row[name] if row else 0) for name in COUNTERS}}
+        sketch = LatencySketch.loads(row["sketch"]) if row else LatencySketch()
+        point["avg"] = round(row["duration_sum"] / row["duration_count"], 3) if row and row["duration_count"] else None
+        point["p50"] = sketch.quantile(0.5)
+        point["p95"] = sketch.quantile(0.95)
+        result.append(point)
+    return result
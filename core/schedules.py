@@ -0,0 +1,226 @@
+import heapq
+import time
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from core.storage import DuplicateJobError
+from core.timeutil import TIMESTAMP_FORMAT
+
+CATCHUP_POLICIES = ("all", "latest", "skip")
+CATCHUP_LIMIT = 100     # most missed ticks materialized by the 'all' policy
+MISFIRE_GRACE = 60      # seconds a tick may be late and still fire under 'skip'
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *", "@annually": "0 0 1 1 *", "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0", "@daily": "0 0 * * *", "@midnight": "0 0 * * *", "@hourly": "0 * * * *",
+}
+_NAMES = {
+    3: {m: i for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun",
+                                    "jul", "aug", "sep", "oct", "nov", "dec"], start=1)},
+    4: {d: i for i, d in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])},
+}
+_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def parse_timestamp(text: str) -> datetime:
+    return datetime.strptime(text, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(dt: datetime) -> str:
+    return dt.strftime(TIMESTAMP_FORMAT)
+
+
+class CronExpression:
+    """
+    Standard 5-field cron expression (minute hour day-of-month month
+    day-of-week), evaluated in UTC. Supports '*', lists, ranges, steps,
+    month/day names and the @hourly/@daily/... macros. As in cron, a job
+    fires when either day field matches if both are restricted.
+    """
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        fields = _MACROS.get(expr.strip().lower(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression '{expr}' must have 5 fields")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(text, index) for index, text in enumerate(fields)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+        if self.next_after(datetime(2000, 1, 1, tzinfo=timezone.utc)) is None:
+            raise ValueError(f"cron expression '{expr}' never fires")
+
+    @staticmethod
+    def _parse_field(text: str, index: int) -> set:
+        low, high = _RANGES[index]
+        names = _NAMES.get(index, {})
+
+        def value(token):
+            token = token.lower()
+            number = names[token] if token in names else int(token)
+            if not low <= number <= high:
+                raise ValueError(f"cron value {token} out of range {low}-{high}")
+            return number
+
+        values = set()
+        for part in text.split(","):
+            span, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if step <= 0:
+                raise ValueError(f"invalid cron step in '{part}'")
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start, end = (value(v) for v in span.split("-", 1))
+            else:
+                start = value(span)
+                end = high if step > 1 else start
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day = dt.day in self.days
+        weekday = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day or weekday
+        return day and weekday
+
+    def next_after(self, dt: datetime):
+        """First matching minute strictly after `dt`, or None within the next five years."""
+        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        return None
+
+
+class Schedule:
+    """A recurring trigger: a cron expression or a fixed interval, plus a catch-up policy."""
+
+    def __init__(self, cron: str = None, every: float = None, catchup: str = "latest"):
+        if (cron is None) == (every is None):
+            raise ValueError("give exactly one of a cron expression or an interval")
+        if every is not None and every <= 0:
+            raise ValueError("interval must be positive")
+        if catchup not in CATCHUP_POLICIES:
+            raise ValueError(f"catch-up policy must be one of {', '.join(CATCHUP_POLICIES)}")
+        self.cron = CronExpression(cron) if cron is not None else None
+        self.every = every
+        self.catchup = catchup
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(cron=row["cron"], every=row["every"], catchup=row["catchup"])
+
+    def next_after(self, dt: datetime) -> datetime:
+        """Next tick strictly after `dt`."""
+        if self.cron is not None:
+            return self.cron.next_after(dt)
+        return dt + timedelta(seconds=self.every)
+
+    def due(self, next_run: datetime, now: datetime):
+        """
+        Ticks to materialize when the schedule was due at `next_run`, and the
+        following next_run. Missed ticks are all fired ('all', at most
+        CATCHUP_LIMIT of the most recent), collapsed into the latest one
+        ('latest'), or dropped unless within MISFIRE_GRACE ('skip').
+        """
+        if self.every is not None:
+            # Intervals are computed arithmetically, however long the outage.
+            missed = int((now - next_run).total_seconds() // self.every)
+            first = max(0, missed - CATCHUP_LIMIT + 1)
+            ticks = [next_run + timedelta(seconds=self.every * i) for i in range(first, missed + 1)]
+            following = next_run + timedelta(seconds=self.every * (missed + 1))
+        else:
+            ticks, tick = deque(maxlen=CATCHUP_LIMIT), next_run
+            while tick is not None and tick <= now:
+                ticks.append(tick)
+                tick = self.cron.next_after(tick)
+            ticks, following = list(ticks), tick
+        if self.catchup == "latest":
+            ticks = ticks[-1:]
+        elif self.catchup == "skip":
+            ticks = [t for t in ticks[-1:] if (now - t).total_seconds() <= MISFIRE_GRACE]
+        return ticks, following
+
+
+def tick_job_id(name: str, tick: datetime) -> str:
+    """Deterministic job id of one schedule tick; its uniqueness makes firing idempotent."""
+    return f"{name}@{tick:%Y%m%dT%H%M%S}"
+
+
+def fire(db, name: str, now: datetime):
+    """
+    Materialize the due ticks of schedule `name` and advance its next_run.
+    Safe to run from several worker processes at once: tick jobs have
+    deterministic ids, so a tick inserted twice is coalesced, and next_run
+    only moves forward by compare-and-set. Returns the next fire time
+    (None if the schedule was removed, disabled or will never fire again).
+    """
+    row = db.get_schedule(name)
+    if row is None or not row["enabled"] or row["next_run"] is None:
+        return None
+    next_run = parse_timestamp(row["next_run"])
+    if next_run > now:
+        return next_run
+    ticks, following = Schedule.from_row(row).due(next_run, now)
+    template = db.schedule_template(row)
+    for tick in ticks:
+        try:
+            db.add_job(tick_job_id(name, tick), run_at=tick.isoformat(), **template)
+        except DuplicateJobError:
+            pass
+    db.advance_schedule(name, row["next_run"], following and format_timestamp(following),
+                        format_timestamp(ticks[-1]) if ticks else None, len(ticks))
+    return following
+
+
+class Scheduler:
+    """
+    In-worker timer for recurring schedules. Upcoming fire times are kept in
+    a min-heap, so each wake-up costs O(log n) in the number of schedules;
+    the heap is rebuilt from the schedules table every `refresh` seconds to
+    pick up schedules added, changed or fired by other processes.
+    """
+
+    def __init__(self, refresh: float = 30.0):
+        self.refresh = refresh
+        self._heap = []
+        self._loaded_at = None
+
+    def reload(self, db):
+        self._heap = [(parse_timestamp(row["next_run"]), row["name"]) for row in db.list_schedules(enabled_only=True)
+                      if row["next_run"] is not None]
+        heapq.heapify(self._heap)
+        self._loaded_at = time.monotonic()
+
+    def run_due(self, db, now: datetime = None) -> int:
+        """Fire every schedule whose time has come; returns how many were processed."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh:
+            self.reload(db)
+        now = now or datetime.now(timezone.utc)
+        processed = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, name = heapq.heappop(self._heap)
+            following = fire(db, name, now)
+            processed += 1
+            if following is not None:
+                heapq.heappush(self._heap, (following, name))
+        return processed
+
+    def seconds_until_next(self, now: datetime = None) -> float:
+        """Time to sleep before the next fire (capped by the refresh interval)."""
+        if not self._heap:
+            return self.refresh
+        now = now or datetime.now(timezone.utc)
+        return max(0.0, min(self.refresh, (self._heap[0][0] - now).total_seconds()))
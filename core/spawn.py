@@ -0,0 +1,167 @@
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from core.tracing import tracer
+
+# Process groups, wait4() and rusage are POSIX-only; Windows falls back to
+# Popen.wait() with wall-clock accounting only.
+POSIX = os.name == "posix"
+
+
+class ProcessResult:
+    """Outcome of a job process, shaped like subprocess.CompletedProcess plus resource usage."""
+
+    def __init__(self, args, returncode: int, usage: dict):
+        self.args = args
+        self.returncode = returncode
+        self.stdout = None
+        self.stderr = None
+        self.usage = usage
+
+
+# (program, PATH) -> resolved path. Misses are not cached, so a program
+# installed after the worker started is found on its next launch.
+_WHICH_CACHE = {}
+_WHICH_CACHE_SIZE = 256
+
+
+def _which(program: str, path: str):
+    """Resolve a program name against PATH once per (name, PATH) pair."""
+    executable = _WHICH_CACHE.get((program, path))
+    if executable is None:
+        executable = shutil.which(program, path=path)
+        if executable is not None:
+            if len(_WHICH_CACHE) >= _WHICH_CACHE_SIZE:
+                _WHICH_CACHE.clear()
+            _WHICH_CACHE[(program, path)] = executable
+    return executable
+
+
+def resolve_executable(argv, env=None):
+    """
+    Return an executable path for argv[0].
+
+    Bare program names are resolved against PATH once and cached, instead
+    of the child walking every PATH entry with execve() on each launch.
+    """
+    program = argv[0]
+    if os.path.dirname(program):
+        return program
+    path = (env or {}).get("PATH", os.environ.get("PATH", os.defpath))
+    executable = _which(program, path)
+    if executable is None:
+        raise FileNotFoundError(f"Executable not found: {program}")
+    return executable
+
+
+def run_shell(command: str, timeout: float, kill_grace: float = 5):
+    """Run a command string through /bin/sh (the classic job path)."""
+    return _supervise(command, timeout, kill_grace, shell=True)
+
+
+def run_argv(argv, timeout: float, env=None, cwd=None, use_posix_spawn=False, kill_grace: float = 5):
+    """
+    Run an argv list directly, without a shell.
+
+    By default CPython launches the child with vfork()+exec (3.10+ on
+    Linux), which benchmarks/bench_spawn.py measures as the cheapest path.
+    `use_posix_spawn` sets close_fds=False so eligible launches (no cwd,
+    no new session) go through posix_spawn() instead, for platforms where
+    that wins; such children share the worker's process group.
+    `env` entries are layered on top of the worker's environment.
+    """
+    full_env = {**os.environ, **env} if env else None
+    return _supervise(
+        list(argv),
+        timeout,
+        kill_grace,
+        executable=resolve_executable(argv, full_env),
+        env=full_env,
+        cwd=cwd,
+        close_fds=not use_posix_spawn,
+        new_session=not use_posix_spawn,
+    )
+
+
+# ----------------------------------------------------------------------
+# Supervision
+# ----------------------------------------------------------------------
+def _supervise(args, timeout: float, kill_grace: float, new_session: bool = True, **popen_kwargs):
+    """
+    Start a job in its own session (process group) and reap it with wait4().
+
+    On timeout the whole group gets SIGTERM, then SIGKILL after `kill_grace`
+    seconds, so grandchildren spawned by the job cannot outlive it.
+    subprocess.TimeoutExpired is raised with the collected usage attached
+    as `.usage`.
+    """
+    started = time.monotonic()
+    if not POSIX:
+        return _supervise_portable(args, timeout, started, **popen_kwargs)
+
+    with tracer.span("spawn"):
+        proc = subprocess.Popen(args, text=True, start_new_session=new_session, **popen_kwargs)
+    reaped = threading.Event()
+    expired = threading.Event()
+    group = proc.pid if new_session else None
+
+    def escalate():
+        expired.set()
+        _signal(proc.pid, group, signal.SIGTERM)
+        reaped.wait(kill_grace)
+        # Always finish with SIGKILL: the leader may have exited on TERM
+        # while grandchildren in its group are still running.
+        _signal(proc.pid, group, signal.SIGKILL)
+
+    timer = threading.Timer(timeout, escalate)
+    timer.daemon = True
+    timer.start()
+    try:
+        with tracer.span("wait", pid=proc.pid):
+            _, status, rusage = os.wait4(proc.pid, 0)
+    finally:
+        reaped.set()
+        timer.cancel()
+
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    usage = {
+        "wall_time": round(time.monotonic() - started, 3),
+        "cpu_user": round(rusage.ru_utime, 3),
+        "cpu_sys": round(rusage.ru_stime, 3),
+        "max_rss_kb": rusage.ru_maxrss,
+    }
+
+    if expired.is_set():
+        timer.join()
+        exc = subprocess.TimeoutExpired(args, timeout)
+        exc.usage = usage
+        raise exc
+    return ProcessResult(args, proc.returncode, usage)
+
+
+def _signal(pid: int, group, signum):
+    """Signal the job's process group (or just the process when it has none)."""
+    try:
+        if group is not None:
+            os.killpg(group, signum)
+        else:
+            os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def _supervise_portable(args, timeout: float, started: float, **popen_kwargs):
+    """Fallback for platforms without process groups or wait4()."""
+    with tracer.span("spawn"):
+        proc = subprocess.Popen(args, text=True, **popen_kwargs)
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired as exc:
+        proc.kill()
+        proc.wait()
+        exc.usage = {"wall_time": round(time.monotonic() - started, 3)}
+        raise
+    return ProcessResult(args, proc.returncode, {"wall_time": round(time.monotonic() - started, 3)})
@@ -1,9 +1,59 @@
+import json
 import sqlite3
-from datetime import datetime, timezone
+import time
+from itertools import islice
+from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from core.tracing import tracer
+from core.records import JobRecord
+from core.rollups import RESOLUTIONS, COUNTERS, LatencySketch, bucket_start
 
 DB_PATH = Path(__file__).resolve().parent.parent / "store.db"
 
+# Statuses from which a job can still run; dedup keys are unique across these.
+ACTIVE_STATUSES = ("pending", "processing", "failed")
+DEDUP_MODES = ("reject", "replace", "coalesce")
+# Tables carried by export/import (the queue and its scheduling state), with the key each is paged by.
+EXPORT_TABLES = {
+    "jobs": ("rowid",),
+    "job_edges": ("parent_id", "child_id"),
+    "map_progress": ("job_id",),
+    "schedules": ("name",),
+}
+
+
+class DuplicateJobError(Exception):
+    """Raised by add_job in 'reject' mode when an equivalent job already exists."""
+
+    def __init__(self, job_id, status):
+        super().__init__(f"Duplicate of existing job {job_id} (status: {status})")
+        self.job_id = job_id
+        self.status = status
+
+
+class UnknownDependencyError(ValueError):
+    """Raised by add_job when `depends_on` names jobs that do not exist."""
+
+    def __init__(self, job_ids):
+        super().__init__(f"Unknown dependency {', '.join(repr(j) for j in job_ids)}")
+        self.job_ids = list(job_ids)
+
+
+class _SnapshotRestarted(Exception):
+    """A concurrent write restarted an online backup (see Database.snapshot)."""
+
+
+class QueueFullError(Exception):
+    """Raised by add_job when a backpressure watermark does not admit the job."""
+
+    def __init__(self, scope, pending, high, mode):
+        where = "all queues" if scope == "*" else f"queue '{scope}'"
+        super().__init__(f"Backlog of {where} is full ({pending} pending, high watermark {high})")
+        self.scope = scope
+        self.pending = pending
+        self.high = high
+        self.mode = mode
+
 
 class Database:
     """
@@ -11,10 +61,32 @@ class Database:
     Provides atomic operations for enqueueing, updating, and fetching jobs.
     """
 
+    # Columns added after the original 'jobs' schema. They are applied with
+    # ALTER TABLE so existing store.db files upgrade in place.
+    JOB_COLUMNS = {
+        "queue": "TEXT NOT NULL DEFAULT 'default'",
+        "tag": "TEXT",
+        "dedup_key": "TEXT",
+        "deps_remaining": "INTEGER NOT NULL DEFAULT 0",
+        "kind": "TEXT NOT NULL DEFAULT 'shell'",
+        "spec": "TEXT",
+        "retry_policy": "TEXT",
+        "last_exit_code": "INTEGER",
+        "last_delay": "REAL",
+        "cache_ttl": "REAL",
+        "cache_inputs": "TEXT",
+        "parent_id": "TEXT",
+        "concurrency_key": "TEXT",
+        "concurrency_limit": "INTEGER NOT NULL DEFAULT 1",
+        "requires": "TEXT NOT NULL DEFAULT ''",
+        "base_priority": "INTEGER",
+    }
+
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
         self.con = sqlite3.connect(self.db_path, check_same_thread=False)
         self.con.row_factory = sqlite3.Row
+        self._job_columns = None
         self._create_tables()
 
     # ----------------------------------------------------------------------
@@ -36,26 +108,611 @@ class Database:
                     updated_at TEXT NOT NULL
                 );
             """)
+            added = self._ensure_columns("jobs", self.JOB_COLUMNS)
+            if "base_priority" in added:
+                # Jobs enqueued before aging existed start aging from their current priority.
+                self.con.execute("UPDATE jobs SET base_priority = priority WHERE base_priority IS NULL;")
+            self.con.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedup_active
+                ON jobs(dedup_key)
+                WHERE dedup_key IS NOT NULL AND status IN {ACTIVE_STATUSES};
+            """)
+            self.con.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_dedup_recent
+                ON jobs(dedup_key, created_at)
+                WHERE dedup_key IS NOT NULL;
+            """)
+            # Ready jobs by the worker tags they require (core.capabilities), in
+            # claim order: each claim seeks only the requirement sets its worker
+            # satisfies and stops at the first runnable row without sorting.
+            self.con.execute("DROP INDEX IF EXISTS idx_jobs_requires;")
+            self.con.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_ready
+                ON jobs(requires, priority DESC, run_at, created_at)
+                WHERE status = 'pending' AND deps_remaining = 0;
+            """)
+            # Pending jobs by how long they have been ready: the aging pass and
+            # starvation metrics read only the range older than their cutoff.
+            self.con.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_aging
+                ON jobs(run_at)
+                WHERE status = 'pending';
+            """)
+            self.con.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_parent
+                ON jobs(parent_id)
+                WHERE parent_id IS NOT NULL;
+            """)
+            # Newest-first listings walk this index, so the first page needs no sort.
+            self.con.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);")
+            self._create_search_index()
+            self._create_depth_counters()
+            self._create_concurrency_slots()
+            # Dependency edges (parent must complete before child may run).
+            # Keyed by parent so completing a job touches only its children.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS job_edges (
+                    parent_id TEXT NOT NULL,
+                    child_id TEXT NOT NULL,
+                    PRIMARY KEY (parent_id, child_id)
+                ) WITHOUT ROWID;
+            """)
+            # Worker liveness, written periodically by each worker process.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS workers (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    host TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    current_job TEXT,
+                    job_started_at TEXT,
+                    jobs_done INTEGER DEFAULT 0,
+                    started_at TEXT NOT NULL,
+                    last_heartbeat TEXT NOT NULL
+                );
+            """)
+            # One row per execution attempt with its resource usage.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS job_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    attempt INTEGER NOT NULL,
+                    outcome TEXT NOT NULL,
+                    exit_code INTEGER,
+                    wall_time REAL,
+                    cpu_user REAL,
+                    cpu_sys REAL,
+                    max_rss_kb INTEGER,
+                    finished_at TEXT NOT NULL
+                );
+            """)
+            self.con.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs(job_id);")
+            self.con.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_command ON job_runs(command);")
+            self._create_event_log()
+            # Recurring job templates (core.schedules); next_run is the next tick to materialize.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS schedules (
+                    name TEXT PRIMARY KEY,
+                    cron TEXT,
+                    every REAL,
+                    catchup TEXT NOT NULL DEFAULT 'latest',
+                    template TEXT NOT NULL,
+                    next_run TEXT,
+                    last_run TEXT,
+                    fired INTEGER NOT NULL DEFAULT 0,
+                    enabled INTEGER NOT NULL DEFAULT 1,
+                    created_at TEXT NOT NULL
+                );
+            """)
+            # Fan-out progress of 'map' jobs. Counters are updated as children
+            # are created and finish, so progress never requires counting children.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS map_progress (
+                    job_id TEXT PRIMARY KEY,
+                    cursor INTEGER NOT NULL DEFAULT 0,
+                    created INTEGER NOT NULL DEFAULT 0,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    dead INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER,
+                    exhausted INTEGER NOT NULL DEFAULT 0,
+                    waiting INTEGER NOT NULL DEFAULT 0,
+                    chunk_size INTEGER NOT NULL,
+                    window INTEGER NOT NULL
+                ) WITHOUT ROWID;
+            """)
+            # Results of cacheable jobs, keyed by core.result_cache.ResultCache.key_for.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    source_job TEXT NOT NULL,
+                    exit_code INTEGER NOT NULL,
+                    stdout TEXT,
+                    stderr TEXT,
+                    size INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID;
+            """)
+            self.con.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_lru ON result_cache(last_used);")
+            # Single-row totals, maintained by triggers so eviction never has to scan the cache.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    entries INTEGER NOT NULL DEFAULT 0,
+                    bytes INTEGER NOT NULL DEFAULT 0,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0,
+                    evictions INTEGER NOT NULL DEFAULT 0
+                );
+            """)
+            self.con.execute("INSERT OR IGNORE INTO result_cache_stats (id) VALUES (1);")
+            self.con.execute("""
+                CREATE TRIGGER IF NOT EXISTS result_cache_insert AFTER INSERT ON result_cache BEGIN
+                    UPDATE result_cache_stats SET entries = entries + 1, bytes = bytes + new.size WHERE id = 1;
+                END;
+            """)
+            self.con.execute("""
+                CREATE TRIGGER IF NOT EXISTS result_cache_delete AFTER DELETE ON result_cache BEGIN
+                    UPDATE result_cache_stats SET entries = entries - 1, bytes = bytes - old.size WHERE id = 1;
+                END;
+            """)
+            self.con.execute("""
+                CREATE TRIGGER IF NOT EXISTS result_cache_resize AFTER UPDATE OF size ON result_cache BEGIN
+                    UPDATE result_cache_stats SET bytes = bytes - old.size + new.size WHERE id = 1;
+                END;
+            """)
+            # Pre-aggregated throughput/latency per minute, hour and day.
+            self.con.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    resolution TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    enqueued INTEGER NOT NULL DEFAULT 0,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    dead INTEGER NOT NULL DEFAULT 0,
+                    duration_sum REAL NOT NULL DEFAULT 0,
+                    duration_count INTEGER NOT NULL DEFAULT 0,
+                    sketch TEXT,
+                    PRIMARY KEY (resolution, bucket)
+                ) WITHOUT ROWID;
+            """)
+
+    def _create_search_index(self):
+        """
+        Full-text index over jobs.command (external-content FTS5 table keyed
+        by jobs.rowid), kept in sync by triggers and backfilled on creation.
+        The trigram tokenizer makes any substring of 3+ characters searchable,
+        like grep; SQLite builds older than 3.34 fall back to word tokens.
+        """
+        existing = self.con.execute("SELECT sql FROM sqlite_master WHERE name = 'jobs_fts';").fetchone()
+        if existing is None:
+            try:
+                self.con.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts
+                    USING fts5(command, content='jobs', content_rowid='rowid', tokenize='trigram');
+                """)
+            except sqlite3.OperationalError:
+                self.con.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts
+                    USING fts5(command, content='jobs', content_rowid='rowid');
+                """)
+            self.con.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild');")
+            existing = self.con.execute("SELECT sql FROM sqlite_master WHERE name = 'jobs_fts';").fetchone()
+        self._fts_trigram = "trigram" in existing["sql"]
+
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts(rowid, command) VALUES (new.rowid, new.command);
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, command) VALUES ('delete', old.rowid, old.command);
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF command ON jobs BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, command) VALUES ('delete', old.rowid, old.command);
+                INSERT INTO jobs_fts(rowid, command) VALUES (new.rowid, new.command);
+            END;
+        """)
+
+    def _create_depth_counters(self):
+        """
+        Ready-backlog counters per queue plus a '*' row for all queues, kept
+        exact by triggers so admission control reads two rows instead of
+        counting jobs. Also holds each scope's backpressure state.
+
+        A job counts while it is pending with all dependencies met, so
+        DAG-blocked batches do not throttle enqueues while workers are idle.
+        Jobs whose run_at is in the future (deferred or retrying) still
+        count: a trigger cannot follow the clock, and they are work the
+        workers must do soon.
+        """
+        created = self.con.execute("SELECT 1 FROM sqlite_master WHERE name = 'queue_depth';").fetchone() is None
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS queue_depth (
+                queue TEXT PRIMARY KEY,
+                pending INTEGER NOT NULL DEFAULT 0,
+                saturated INTEGER NOT NULL DEFAULT 0,
+                throttled INTEGER NOT NULL DEFAULT 0,
+                shed INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+        """)
+        old = self.con.execute("SELECT sql FROM sqlite_master WHERE name = 'queue_depth_update';").fetchone()
+        if old is not None and "deps_remaining" not in old["sql"]:
+            # Counters from before blocked jobs were excluded: rebuild them.
+            for name in ("queue_depth_insert", "queue_depth_delete", "queue_depth_update"):
+                self.con.execute(f"DROP TRIGGER IF EXISTS {name};")
+            self.con.execute("UPDATE queue_depth SET pending = 0;")
+            created = True
+        if created:
+            self.con.execute("""
+                INSERT INTO queue_depth (queue, pending)
+                SELECT queue, COUNT(*) FROM jobs WHERE status = 'pending' AND deps_remaining = 0 GROUP BY queue
+                UNION ALL
+                SELECT '*', COUNT(*) FROM jobs WHERE status = 'pending' AND deps_remaining = 0
+                ON CONFLICT(queue) DO UPDATE SET pending = excluded.pending;
+            """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS queue_depth_insert AFTER INSERT ON jobs
+            WHEN new.status = 'pending' AND new.deps_remaining = 0 BEGIN
+                INSERT INTO queue_depth (queue, pending) VALUES (new.queue, 1), ('*', 1)
+                ON CONFLICT(queue) DO UPDATE SET pending = pending + 1;
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS queue_depth_delete AFTER DELETE ON jobs
+            WHEN old.status = 'pending' AND old.deps_remaining = 0 BEGIN
+                UPDATE queue_depth SET pending = pending - 1 WHERE queue IN (old.queue, '*');
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS queue_depth_update AFTER UPDATE OF status, queue, deps_remaining ON jobs
+            WHEN (old.status = 'pending' AND old.deps_remaining = 0)
+                 != (new.status = 'pending' AND new.deps_remaining = 0)
+                OR old.queue != new.queue BEGIN
+                UPDATE queue_depth SET pending = pending - 1
+                WHERE old.status = 'pending' AND old.deps_remaining = 0 AND queue IN (old.queue, '*');
+                INSERT INTO queue_depth (queue, pending)
+                SELECT name, 1 FROM (SELECT new.queue AS name UNION ALL SELECT '*')
+                WHERE new.status = 'pending' AND new.deps_remaining = 0
+                ON CONFLICT(queue) DO UPDATE SET pending = pending + 1;
+            END;
+        """)
+        # Lowest-priority, newest pending job first: the victim when shedding load.
+        self.con.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_shed_queue
+            ON jobs(queue, priority, created_at DESC)
+            WHERE status = 'pending';
+        """)
+        self.con.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_shed
+            ON jobs(priority, created_at DESC)
+            WHERE status = 'pending';
+        """)
+
+    def _create_concurrency_slots(self):
+        """
+        Running-job counts per concurrency key, kept by triggers on the
+        transitions into and out of 'processing'. A row exists only while a
+        key has running jobs; the partial index lists the keys at their
+        limit, which the claim skips without looking at their jobs' siblings.
+        """
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS concurrency_slots (
+                key TEXT PRIMARY KEY,
+                running INTEGER NOT NULL,
+                max_running INTEGER NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        self.con.execute("""
+            CREATE INDEX IF NOT EXISTS idx_concurrency_full
+            ON concurrency_slots(key)
+            WHERE running >= max_running;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS concurrency_slot_take AFTER UPDATE OF status ON jobs
+            WHEN new.concurrency_key IS NOT NULL AND new.status = 'processing' AND old.status != 'processing' BEGIN
+                INSERT INTO concurrency_slots (key, running, max_running)
+                VALUES (new.concurrency_key, 1, new.concurrency_limit)
+                ON CONFLICT(key) DO UPDATE SET running = running + 1, max_running = excluded.max_running;
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS concurrency_slot_release AFTER UPDATE OF status ON jobs
+            WHEN old.concurrency_key IS NOT NULL AND old.status = 'processing' AND new.status != 'processing' BEGIN
+                UPDATE concurrency_slots SET running = running - 1 WHERE key = old.concurrency_key;
+                DELETE FROM concurrency_slots WHERE key = old.concurrency_key AND running <= 0;
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS concurrency_slot_delete AFTER DELETE ON jobs
+            WHEN old.concurrency_key IS NOT NULL AND old.status = 'processing' BEGIN
+                UPDATE concurrency_slots SET running = running - 1 WHERE key = old.concurrency_key;
+                DELETE FROM concurrency_slots WHERE key = old.concurrency_key AND running <= 0;
+            END;
+        """)
+
+    def _create_event_log(self):
+        """
+        Append-only change feed: one compact row per job state transition.
+        Rows are written by triggers in the same transaction as the change,
+        so bulk updates, failure propagation and fan-out are covered too.
+        AUTOINCREMENT keeps `seq` monotonic even after old rows are trimmed.
+        """
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS job_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER,
+                at TEXT NOT NULL
+            );
+        """)
+        # Named cursors of event consumers; events all of them have read can be trimmed.
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS event_consumers (
+                name TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS job_events_insert AFTER INSERT ON jobs BEGIN
+                INSERT INTO job_events (job_id, status, attempts, at)
+                VALUES (new.id, new.status, new.attempts, strftime('%Y-%m-%d %H:%M:%S', 'now'));
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS job_events_update AFTER UPDATE OF status, attempts ON jobs
+            WHEN old.status != new.status OR old.attempts != new.attempts BEGIN
+                INSERT INTO job_events (job_id, status, attempts, at)
+                VALUES (new.id, new.status, new.attempts, strftime('%Y-%m-%d %H:%M:%S', 'now'));
+            END;
+        """)
+        self.con.execute("""
+            CREATE TRIGGER IF NOT EXISTS job_events_delete AFTER DELETE ON jobs BEGIN
+                INSERT INTO job_events (job_id, status, attempts, at)
+                VALUES (old.id, 'deleted', old.attempts, strftime('%Y-%m-%d %H:%M:%S', 'now'));
+            END;
+        """)
+
+    def _ensure_columns(self, table, columns):
+        """Add any missing columns to an existing table; returns the names added."""
+        existing = {row["name"] for row in self.con.execute(f"PRAGMA table_info({table});")}
+        added = []
+        for name, ddl in columns.items():
+            if name in existing:
+                continue
+            try:
+                self.con.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl};")
+                added.append(name)
+            except sqlite3.OperationalError as e:
+                # Another process may have upgraded the table concurrently.
+                if "duplicate column" not in str(e):
+                    raise
+        return added
 
     # ----------------------------------------------------------------------
     #  Job Creation
     # ----------------------------------------------------------------------
-    def add_job(self, job_id, command, max_retries, priority=0, run_at=None):
+    def add_job(self, job_id, command, max_retries, priority=0, run_at=None, queue="default", tag=None,
+                dedup_key=None, dedup_mode="coalesce", dedup_ttl=0, depends_on=None, kind="shell", spec=None,
+                retry_policy=None, cache_ttl=None, cache_inputs=None, admission=None, concurrency_key=None,
+                concurrency_limit=1, requires=""):
         """
         Insert a new job into the database.
         All timestamps are stored in UTC ('YYYY-MM-DD HH:MM:SS' format).
+
+        A job is a duplicate if its id already exists, or if another job with
+        the same `dedup_key` is still active or was created within the last
+        `dedup_ttl` seconds. Duplicates are handled according to `dedup_mode`:
+          - reject:   raise DuplicateJobError
+          - replace:  overwrite the existing job if it is still pending
+          - coalesce: keep the existing job untouched
+
+        Returns (job_id, outcome) where outcome is 'created', 'replaced' or
+        'coalesced', and job_id is the id of the job that will actually run.
+
+        `depends_on` lists job ids that must complete before this job becomes
+        claimable. If any of them is already dead the new job is created dead.
+
+        `kind` selects the executor ('shell', 'argv' or 'callable'); `spec` holds the
+        executor-specific payload (e.g. callable target and args) and is
+        stored as JSON. `command` is always kept as a human-readable summary.
+
+        `retry_policy` (a dict, see core.retry_policy) overrides the queue's
+        retry policy for this job and is stored as JSON.
+
+        `cache_ttl` (seconds) opts the job into the result cache: a successful
+        result of an identical job (same command/spec and `cache_inputs`
+        files) younger than this is reused instead of running again.
+
+        A 'map' job's `spec` carries an item source, a command template and
+        `chunk_size` / `window`; its children are created later by expand_map.
+
+        `requires` is a requirement key (core.capabilities.requirement_key):
+        only workers started with all of those tags will claim the job.
+
+        Jobs sharing a `concurrency_key` run at most `concurrency_limit` at a
+        time; the limit of the most recently claimed job wins.
+
+        `admission` (core.admission.AdmissionPolicy) applies backpressure to
+        new jobs: QueueFullError is raised when a saturated scope does not
+        admit the job. Scope state is committed even then, so hysteresis
+        and throttle counters survive the rejection.
         """
+        if dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"Invalid dedup mode '{dedup_mode}' (expected one of {', '.join(DEDUP_MODES)})")
+
         now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
         run_at = self._validate_run_at(run_at) or now
+        queue = queue or "default"
+        fanout = spec if kind == "map" else None
+        spec = json.dumps(spec) if spec is not None else None
+        retry_policy = json.dumps(retry_policy) if retry_policy is not None else None
+        cache_inputs = json.dumps(cache_inputs) if cache_inputs else None
 
         with self.con:
-            self.con.execute("""
-                INSERT INTO jobs (
-                    id, command, status, attempts, max_retries,
-                    priority, run_at, created_at, updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-            """, (job_id, command, "pending", 0, max_retries, priority, run_at, now, now))
+            # Take the write lock up front so the duplicate check and the
+            # insert are atomic with respect to other producers.
+            self.con.execute("BEGIN IMMEDIATE;")
+            existing = self._find_duplicate(job_id, dedup_key, dedup_ttl)
+
+            if existing is not None:
+                if dedup_mode == "reject":
+                    raise DuplicateJobError(existing["id"], existing["status"])
+
+                if dedup_mode == "replace" and existing["status"] == "pending":
+                    self.con.execute("""
+                        UPDATE jobs
+                        SET command = ?, max_retries = ?, priority = ?, run_at = ?,
+                            queue = ?, tag = ?, kind = ?, spec = ?, retry_policy = ?,
+                            cache_ttl = ?, cache_inputs = ?, concurrency_key = ?, concurrency_limit = ?,
+                            requires = ?, base_priority = ?, updated_at = ?
+                        WHERE id = ?;
+                    """, (command, max_retries, priority, run_at, queue, tag, kind, spec, retry_policy,
+                          cache_ttl, cache_inputs, concurrency_key, concurrency_limit, requires, priority, now,
+                          existing["id"]))
+                    return existing["id"], "replaced"
+
+                return existing["id"], "coalesced"
+
+            full = self._admit(queue, priority, admission, now) if admission is not None else None
+            if full is None:
+                self.con.execute("""
+                    INSERT INTO jobs (
+                        id, command, status, attempts, max_retries,
+                        priority, run_at, created_at, updated_at, queue, tag, dedup_key, kind, spec, retry_policy,
+                        cache_ttl, cache_inputs, concurrency_key, concurrency_limit, requires, base_priority
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+                """, (job_id, command, "pending", 0, max_retries, priority, run_at, now, now, queue, tag, dedup_key,
+                      kind, spec, retry_policy, cache_ttl, cache_inputs, concurrency_key, concurrency_limit,
+                      requires, priority))
+                if depends_on:
+                    self._link_dependencies(job_id, depends_on, now)
+                if fanout:
+                    items = fanout["source"].get("items")
+                    self.con.execute("""
+                        INSERT INTO map_progress (job_id, total, chunk_size, window) VALUES (?, ?, ?, ?);
+                    """, (job_id, len(items) if items is not None else None, fanout["chunk_size"], fanout["window"]))
+                self._count_enqueued(datetime.now(timezone.utc))
+                return job_id, "created"
+
+        # Raised after the commit so the scope's saturation state is kept.
+        raise full
+
+    def _admit(self, queue, priority, admission, now):
+        """
+        Check a new job against the watermarks of its queue and of all queues
+        (inside add_job's transaction). Returns None to admit it, or the
+        QueueFullError to raise. In 'shed' mode a lower-priority pending job
+        is moved to the DLQ to make room.
+        """
+        for mark in admission.scopes_for(queue):
+            row = self.con.execute("SELECT pending, saturated FROM queue_depth WHERE queue = ?;",
+                                   (mark.scope,)).fetchone()
+            pending, saturated = (row["pending"], row["saturated"]) if row else (0, 0)
+            if saturated and pending <= mark.low:
+                saturated = 0
+                self.con.execute("UPDATE queue_depth SET saturated = 0 WHERE queue = ?;", (mark.scope,))
+            if not saturated and pending < mark.high:
+                continue
+            if not saturated:
+                self.con.execute("""
+                    INSERT INTO queue_depth (queue, saturated) VALUES (?, 1)
+                    ON CONFLICT(queue) DO UPDATE SET saturated = 1;
+                """, (mark.scope,))
+            if mark.mode == "shed" and self._shed(mark.scope, priority, now):
+                continue
+            self.con.execute("UPDATE queue_depth SET throttled = throttled + 1 WHERE queue = ?;", (mark.scope,))
+            return QueueFullError(mark.scope, pending, mark.high, mark.mode)
+        return None
+
+    def _shed(self, scope, priority, now):
+        """Move the lowest-priority (newest first) ready job of `scope` to the DLQ if it ranks below `priority`."""
+        if scope == "*":
+            victim = self.con.execute("""
+                SELECT id, priority, parent_id FROM jobs INDEXED BY idx_jobs_shed
+                WHERE status = 'pending' AND deps_remaining = 0
+                ORDER BY priority ASC, created_at DESC
+                LIMIT 1;
+            """).fetchone()
+        else:
+            victim = self.con.execute("""
+                SELECT id, priority, parent_id FROM jobs INDEXED BY idx_jobs_shed_queue
+                WHERE status = 'pending' AND deps_remaining = 0 AND queue = ?
+                ORDER BY priority ASC, created_at DESC
+                LIMIT 1;
+            """, (scope,)).fetchone()
+        if victim is None or victim["priority"] >= priority:
+            return False
+        self.con.execute("UPDATE jobs SET status = 'dead', updated_at = ? WHERE id = ?;", (now, victim["id"]))
+        self._propagate_failure(victim["id"], now)
+        if victim["parent_id"]:
+            self._child_finished(victim["parent_id"], "dead", now)
+        self.con.execute("UPDATE queue_depth SET shed = shed + 1 WHERE queue = ?;", (scope,))
+        return True
+
+    def queue_depths(self):
+        """Ready-backlog counters and backpressure state per queue ('*' is all queues)."""
+        return self.con.execute("SELECT * FROM queue_depth ORDER BY queue;").fetchall()
+
+    def concurrency_usage(self):
+        """Concurrency keys with running jobs, fullest first."""
+        return self.con.execute("""
+            SELECT key, running, max_running FROM concurrency_slots
+            ORDER BY running >= max_running DESC, key;
+        """).fetchall()
+
+    def _link_dependencies(self, job_id, depends_on, now):
+        """Record dependency edges for a new job and set its remaining-dependency counter."""
+        remaining = 0
+        parent_dead = False
+        parents = {}
+        for parent_id in dict.fromkeys(depends_on):
+            parents[parent_id] = self.con.execute("SELECT status FROM jobs WHERE id = ?;", (parent_id,)).fetchone()
+        missing = [parent_id for parent_id, parent in parents.items() if parent is None]
+        if missing:
+            raise UnknownDependencyError(missing)
+        for parent_id, parent in parents.items():
+            if parent["status"] == "completed":
+                continue
+            if parent["status"] == "dead":
+                parent_dead = True
+            self.con.execute("INSERT INTO job_edges (parent_id, child_id) VALUES (?, ?);", (parent_id, job_id))
+            remaining += 1
+
+        self.con.execute("""
+            UPDATE jobs
+            SET deps_remaining = ?, status = ?, updated_at = ?
+            WHERE id = ?;
+        """, (remaining, "dead" if parent_dead else "pending", now, job_id))
+
+    def _find_duplicate(self, job_id, dedup_key, dedup_ttl):
+        """Return the job that a new enqueue would duplicate, if any."""
+        row = self.con.execute("SELECT id, status FROM jobs WHERE id = ?;", (job_id,)).fetchone()
+        if row or not dedup_key:
+            return row
+
+        # Finished jobs only count inside a positive TTL window.
+        window, params = "", [dedup_key]
+        if dedup_ttl and dedup_ttl > 0:
+            window_start = datetime.now(timezone.utc) - timedelta(seconds=dedup_ttl)
+            window = "OR created_at >= ?"
+            params.append(window_start.strftime("%Y-%m-%d %H:%M:%S"))
+        return self.con.execute(f"""
+            SELECT id, status FROM jobs
+            WHERE dedup_key = ?
+            AND (status IN {ACTIVE_STATUSES} {window})
+            ORDER BY created_at DESC
+            LIMIT 1;
+        """, params).fetchone()
 
     # ----------------------------------------------------------------------
     #  Job Retrieval
@@ -77,27 +734,244 @@ class Database:
         cur.execute("SELECT * FROM jobs WHERE id = ?;", (job_id,))
         return cur.fetchone()
 
-    def list_job_bystatus(self, status):
-        """List jobs by their current status."""
+    def list_job_bystatus(self, status, columns=None):
+        """List jobs by their current status (newest first; see iter_jobs)."""
+        return list(self.iter_jobs(status, columns=columns))
+
+    @property
+    def job_columns(self) -> tuple:
+        """Every column of the jobs table, in table order."""
+        if self._job_columns is None:
+            self._job_columns = tuple(d[0] for d in self.con.execute("SELECT * FROM jobs LIMIT 0;").description)
+        return self._job_columns
+
+    def _projection(self, columns):
+        """JobRecord type for `columns` (default: all), validated against the jobs table."""
+        columns = tuple(columns) if columns else self.job_columns
+        unknown = [c for c in columns if c not in self.job_columns]
+        if unknown:
+            raise ValueError(f"Unknown job column(s): {', '.join(unknown)}")
+        return JobRecord.projection(columns)
+
+    def _iter_pages(self, record, sql, params, key_columns, chunk_size):
+        """
+        Yield `record`s page by page: each page is one short query resuming
+        after the last row's `key_columns` (keyset pagination), read with
+        fetchmany so memory stays bounded by `chunk_size` however many rows
+        match. `sql` must select the key columns first, then the projection,
+        and contain a `{after}` placeholder for the resume condition.
+        """
+        keys, last = len(key_columns), None
         cur = self.con.cursor()
-        if status.lower() == "all":
-            cur.execute("SELECT * FROM jobs ORDER BY datetime(created_at) DESC;")
-        else:
-            cur.execute("SELECT * FROM jobs WHERE status = ? ORDER BY datetime(created_at) DESC;", (status,))
-        return cur.fetchall()
+        cur.row_factory = None
+        while True:
+            if last is None:
+                cur.execute(sql.format(after="1"), (*params, chunk_size))
+            else:
+                marks = ", ".join("?" * keys)
+                after = f"({', '.join(key_columns)}) < ({marks})" if keys > 1 else f"{key_columns[0]} < ?"
+                cur.execute(sql.format(after=after), (*params, *last, chunk_size))
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            for row in rows:
+                yield record(row[keys:])
+            if len(rows) < chunk_size:
+                return
+            last = rows[-1][:keys]
+
+    def iter_jobs(self, status=None, columns=None, chunk_size=500):
+        """
+        Stream jobs newest first as JobRecords holding only `columns`.
+        Pages walk idx_jobs_created, so the first rows arrive without
+        sorting the table and memory stays constant for any table size.
+        """
+        record = self._projection(columns)
+        where, params = "", []
+        if status and status.lower() != "all":
+            where, params = "status = ? AND ", [status]
+        sql = f"""
+            SELECT created_at, rowid, {", ".join(record.__slots__)} FROM jobs INDEXED BY idx_jobs_created
+            WHERE {where}{{after}}
+            ORDER BY created_at DESC, rowid DESC
+            LIMIT ?;
+        """
+        return self._iter_pages(record, sql, params, ("created_at", "rowid"), chunk_size)
+
+    def iter_search_jobs(self, query, status=None, columns=None, chunk_size=500):
+        """Stream search_jobs matches (newest first) as JobRecords, in pages like iter_jobs."""
+        record = self._projection(columns)
+        where, params = "", [self._fts_query(query)]
+        if status and status.lower() != "all":
+            where = " AND j.status = ?"
+            params.append(status)
+        sql = f"""
+            SELECT f.rowid, {", ".join("j." + c for c in record.__slots__)} FROM jobs_fts f
+            JOIN jobs j ON j.rowid = f.rowid
+            WHERE jobs_fts MATCH ?{where} AND {{after}}
+            ORDER BY f.rowid DESC
+            LIMIT ?;
+        """
+        return self._iter_pages(record, sql, params, ("f.rowid",), chunk_size)
+
+    def search_jobs(self, query, status=None, limit=50, columns=None):
+        """
+        Jobs whose command contains every whitespace-separated term of
+        `query`, newest first. Served from the jobs_fts index, so the cost
+        depends on the number of matches rather than the size of `jobs`.
+        Raises ValueError for an empty query or (trigram index) a term
+        shorter than 3 characters.
+        """
+        jobs = self.iter_search_jobs(query, status, columns, chunk_size=min(limit or 500, 500))
+        return list(islice(jobs, limit))
+
+    def _fts_query(self, query):
+        """Quote each term as an FTS5 phrase so punctuation ('backup.sh', '--force') is matched literally."""
+        terms = (query or "").split()
+        if not terms:
+            raise ValueError("Search query is empty")
+        if self._fts_trigram:
+            short = [t for t in terms if len(t) < 3]
+            if short:
+                raise ValueError(f"Search terms must be at least 3 characters: {', '.join(short)}")
+        return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+    def rebuild_search_index(self):
+        """Re-derive jobs_fts from jobs (e.g. after a VACUUM renumbered rowids)."""
+        with self.con:
+            self.con.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild');")
 
     # ----------------------------------------------------------------------
     #  Job Updates
     # ----------------------------------------------------------------------
     def update_job_status(self, job_id, status):
-        """Update a job's status."""
+        """
+        Update a job's status.
+        Completing a job releases its dependents; a dead job takes all of its
+        not-yet-run descendants down with it.
+        """
         now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-        with self.con:
-            self.con.execute("""
+        with tracer.span("db.update", status=status), self.con:
+            row = self.con.execute("""
                 UPDATE jobs
                 SET status = ?, updated_at = ?
-                WHERE id = ?;
-            """, (status, now, job_id))
+                WHERE id = ? AND status != ?
+                RETURNING parent_id;
+            """, (status, now, job_id, status)).fetchone()
+            if row is None:
+                return
+
+            if status == "completed":
+                self._release_dependents(job_id)
+            elif status == "dead":
+                self._propagate_failure(job_id, now)
+            if row["parent_id"] and status in ("completed", "dead"):
+                self._child_finished(row["parent_id"], status, now)
+
+    def _release_dependents(self, job_id):
+        """Decrement the dependency counter of each direct child (O(out-degree))."""
+        self.con.execute("""
+            UPDATE jobs
+            SET deps_remaining = deps_remaining - 1
+            WHERE id IN (SELECT child_id FROM job_edges WHERE parent_id = ?);
+        """, (job_id,))
+
+    def _rearm_dependents(self, job_ids, now):
+        """
+        After retrying dead jobs: recount their dependency counters, then
+        bring back the descendants that died only because of them (they
+        never ran and have no other dead parent) as pending jobs waiting on
+        them again. Returns the ids re-armed this way.
+        """
+        rearmed, frontier = [], list(job_ids)
+        while frontier:
+            marks = ",".join("?" * len(frontier))
+            self.con.execute(f"""
+                UPDATE jobs
+                SET deps_remaining = (
+                    SELECT COUNT(*) FROM job_edges e JOIN jobs p ON p.id = e.parent_id
+                    WHERE e.child_id = jobs.id AND p.status != 'completed'
+                )
+                WHERE id IN ({marks});
+            """, frontier)
+            frontier = [row[0] for row in self.con.execute(f"""
+                UPDATE jobs
+                SET status = 'pending', run_at = ?, updated_at = ?
+                WHERE status = 'dead' AND attempts = 0
+                AND id IN (SELECT child_id FROM job_edges WHERE parent_id IN ({marks}))
+                AND NOT EXISTS (
+                    SELECT 1 FROM job_edges e JOIN jobs p ON p.id = e.parent_id
+                    WHERE e.child_id = jobs.id AND p.status = 'dead'
+                )
+                AND (dedup_key IS NULL OR NOT EXISTS (
+                    SELECT 1 FROM jobs a WHERE a.dedup_key = jobs.dedup_key AND a.status IN {ACTIVE_STATUSES}
+                ))
+                RETURNING id;
+            """, (now, now, *frontier))]
+            rearmed.extend(frontier)
+        return rearmed
+
+    def dead_parents(self, job_id):
+        """Ids of the dead jobs `job_id` directly depends on."""
+        return [row[0] for row in self.con.execute("""
+            SELECT p.id FROM job_edges e JOIN jobs p ON p.id = e.parent_id
+            WHERE e.child_id = ? AND p.status = 'dead'
+            ORDER BY p.id;
+        """, (job_id,))]
+
+    def _dead_parent_blocked(self, job_ids):
+        """
+        Ids among `job_ids` that depend on a dead job which is not being
+        retried with them (directly or through such a job). Retrying those
+        would leave them pending behind a parent that never completes.
+        """
+        marks = ",".join("?" * len(job_ids))
+        edges = self.con.execute(f"""
+            SELECT e.child_id, e.parent_id FROM job_edges e JOIN jobs p ON p.id = e.parent_id
+            WHERE e.child_id IN ({marks}) AND p.status = 'dead';
+        """, list(job_ids)).fetchall()
+        blocked, changed = set(), True
+        while changed:
+            changed = False
+            for child_id, parent_id in edges:
+                if child_id not in blocked and (parent_id not in job_ids or parent_id in blocked):
+                    blocked.add(child_id)
+                    changed = True
+        return blocked
+
+    def _propagate_failure(self, job_id, now):
+        """Mark every waiting descendant of a dead job as dead."""
+        self.con.execute("""
+            WITH RECURSIVE descendants(id) AS (
+                SELECT child_id FROM job_edges WHERE parent_id = ?
+                UNION
+                SELECT e.child_id FROM job_edges e JOIN descendants d ON e.parent_id = d.id
+            )
+            UPDATE jobs
+            SET status = 'dead', updated_at = ?
+            WHERE id IN (SELECT id FROM descendants)
+            AND status IN ('pending', 'failed');
+        """, (job_id, now))
+
+    def fail_job(self, job_id, retry_at=None, exit_code=None, delay=None):
+        """
+        Record a failed attempt in a single UPDATE.
+        With `retry_at` the job goes back to pending at that time; without it
+        the job is dead and its waiting descendants are marked dead too.
+        """
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with tracer.span("db.fail"), self.con:
+            row = self.con.execute("""
+                UPDATE jobs
+                SET attempts = attempts + 1, status = ?, run_at = COALESCE(?, run_at),
+                    last_exit_code = ?, last_delay = COALESCE(?, last_delay), updated_at = ?
+                WHERE id = ?
+                RETURNING parent_id;
+            """, ("pending" if retry_at else "dead", retry_at, exit_code, delay, now, job_id)).fetchone()
+            if retry_at is None:
+                self._propagate_failure(job_id, now)
+                if row and row["parent_id"]:
+                    self._child_finished(row["parent_id"], "dead", now)
 
     def increment_attempts(self, job_id):
         """Increment retry count for a job."""
@@ -113,30 +987,264 @@ class Database:
                 WHERE status = 'processing';
             """)
 
+    def release_jobs(self, job_ids):
+        """Revert specific claimed jobs to 'pending' (their remote worker disconnected mid-run)."""
+        if not job_ids:
+            return 0
+        with self.con:
+            cur = self.con.execute(f"""
+                UPDATE jobs
+                SET status = 'pending', updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'processing' AND id IN ({",".join("?" * len(job_ids))});
+            """, list(job_ids))
+        return cur.rowcount
+
     # ----------------------------------------------------------------------
     #  Job Fetching (For Workers)
     # ----------------------------------------------------------------------
-    def fetch_next_pending_job(self):
+    def fetch_next_pending_job(self, exclude_queues=(), exclude_tags=(), accepts=("",)):
         """
         Select and lock the next job ready to run.
-        Chooses highest priority first, then earliest 'run_at'.
+        Chooses highest priority first, then earliest 'run_at'. run_at is
+        stored normalized to UTC, so it is compared as text and the order
+        matches idx_jobs_ready.
+        Only jobs whose dependencies have all completed are eligible.
+        Jobs in `exclude_queues` / `exclude_tags` (e.g. rate-limited) are skipped,
+        as are jobs whose concurrency key is at its limit. The slot is taken
+        by a trigger in the same statement, so two claims cannot both fill it.
+        `accepts` lists the requirement keys the worker satisfies
+        (core.capabilities.satisfied_keys); the default only takes jobs
+        without requirements. Each key is one seek returning at most one row,
+        and only those rows are sorted.
         """
-        with self.con:
-            cursor = self.con.execute("""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        filters, filter_params = "", []
+        if exclude_queues:
+            filters += f" AND queue NOT IN ({', '.join('?' * len(exclude_queues))})"
+            filter_params.extend(exclude_queues)
+        if exclude_tags:
+            filters += f" AND (tag IS NULL OR tag NOT IN ({', '.join('?' * len(exclude_tags))}))"
+            filter_params.extend(exclude_tags)
+
+        # Best ready job for one requirement key: an index seek that stops at the first row.
+        candidate = f"""
+            SELECT id, priority, run_at, created_at, rowid AS seq
+            FROM jobs INDEXED BY idx_jobs_ready
+            WHERE status = 'pending'
+            AND deps_remaining = 0
+            AND requires = ?
+            AND run_at <= ?{filters}
+            AND (concurrency_key IS NULL OR concurrency_key NOT IN (
+                SELECT key FROM concurrency_slots INDEXED BY idx_concurrency_full
+                WHERE running >= max_running
+            ))
+            ORDER BY priority DESC, run_at ASC, created_at ASC, rowid ASC
+            LIMIT 1
+        """
+        params = [now]
+        for key in accepts:
+            params.extend([key, now, *filter_params])
+        if len(accepts) == 1:
+            pick = f"SELECT id FROM ({candidate})"
+        else:
+            # A tagged worker satisfies several keys: merge one seek per key
+            # instead of sorting every job matching any of them.
+            union = " UNION ALL ".join(f"SELECT * FROM ({candidate})" for _ in accepts)
+            pick = f"SELECT id FROM ({union}) ORDER BY priority DESC, run_at ASC, created_at ASC, seq ASC LIMIT 1"
+
+        with tracer.span("db.claim"), self.con:
+            cursor = self.con.execute(f"""
                 UPDATE jobs
                 SET status = 'processing', updated_at = ?
-                WHERE id = (
-                    SELECT id
-                    FROM jobs
-                    WHERE status = 'pending'
-                    AND datetime(run_at) <= datetime('now', 'utc')
-                    ORDER BY priority DESC, datetime(run_at) ASC, created_at ASC
-                    LIMIT 1
-                )
+                WHERE id = ({pick})
                 RETURNING *;
-            """, (datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),))
+            """, params)
             return cursor.fetchone()
 
+    # ----------------------------------------------------------------------
+    #  Priority Aging
+    # ----------------------------------------------------------------------
+    def promote_waiting_jobs(self, interval, step, max_priority):
+        """
+        Raise the priority of pending jobs to base_priority + step for every
+        full `interval` seconds since their run_at, capped at `max_priority`.
+        Only jobs ready for at least one interval are visited (idx_jobs_aging)
+        and priorities never go down, so repeating the pass is harmless.
+        Returns the number of promoted jobs.
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = (now - timedelta(seconds=interval)).strftime("%Y-%m-%d %H:%M:%S")
+        target = """MIN(:max, COALESCE(base_priority, priority)
+                        + :step * CAST((julianday(:now) - julianday(run_at)) * 86400 / :interval AS INTEGER))"""
+        with tracer.span("db.aging"), self.con:
+            cursor = self.con.execute(f"""
+                UPDATE jobs INDEXED BY idx_jobs_aging
+                SET priority = {target}
+                WHERE status = 'pending' AND run_at <= :cutoff AND priority < :max
+                AND {target} > priority;
+            """, {"max": max_priority, "step": step, "interval": interval, "cutoff": cutoff,
+                  "now": now.strftime("%Y-%m-%d %H:%M:%S")})
+        return cursor.rowcount
+
+    def starvation_stats(self, starve_after):
+        """
+        Wait-time metrics of ready pending jobs: how many there are, the
+        oldest wait in seconds, how many have waited over `starve_after`
+        seconds and how many currently run above their base priority.
+        """
+        now = datetime.now(timezone.utc)
+        fmt = "%Y-%m-%d %H:%M:%S"
+        row = self.con.execute("""
+            SELECT COUNT(*) AS ready, MIN(run_at) AS oldest,
+                   SUM(run_at <= ?) AS starving,
+                   SUM(priority > COALESCE(base_priority, priority)) AS aged
+            FROM jobs INDEXED BY idx_jobs_aging
+            WHERE status = 'pending' AND run_at <= ? AND deps_remaining = 0;
+        """, ((now - timedelta(seconds=starve_after)).strftime(fmt), now.strftime(fmt))).fetchone()
+        oldest = datetime.strptime(row["oldest"], fmt).replace(tzinfo=timezone.utc) if row["oldest"] else None
+        return {
+            "ready": row["ready"],
+            "oldest_wait": round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+            "starving": row["starving"] or 0,
+            "aged": row["aged"] or 0,
+        }
+
+    # ----------------------------------------------------------------------
+    #  Dead Letter Queue (bulk operations)
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _dead_filter(job_id=None, command=None, older_than=None, min_attempts=None, exit_code=None):
+        """
+        Build the WHERE clause selecting dead jobs.
+        `command` is a GLOB pattern ('curl *'), `older_than` is in seconds
+        since the job died (its last update).
+        """
+        clauses, params = ["status = 'dead'"], []
+        if job_id is not None:
+            clauses.append("id = ?")
+            params.append(job_id)
+        if command:
+            clauses.append("command GLOB ?")
+            params.append(command)
+        if older_than is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than)
+            clauses.append("updated_at < ?")
+            params.append(cutoff.strftime("%Y-%m-%d %H:%M:%S"))
+        if min_attempts is not None:
+            clauses.append("attempts >= ?")
+            params.append(min_attempts)
+        if exit_code is not None:
+            clauses.append("last_exit_code = ?")
+            params.append(exit_code)
+        return " AND ".join(clauses), params
+
+    def count_dead_jobs(self, **filters):
+        """Number of dead jobs matching the filters (see _dead_filter)."""
+        where, params = self._dead_filter(**filters)
+        return self.con.execute(f"SELECT COUNT(*) FROM jobs WHERE {where};", params).fetchone()[0]
+
+    def iter_dead_jobs(self, chunk_size=500, **filters):
+        """
+        Stream matching dead jobs in rowid order, one short read per chunk,
+        so exports never hold a cursor open across the whole table.
+        """
+        where, params = self._dead_filter(**filters)
+        last_rowid = 0
+        while True:
+            rows = self.con.execute(f"""
+                SELECT rowid AS _rowid, * FROM jobs
+                WHERE {where} AND rowid > ?
+                ORDER BY rowid
+                LIMIT ?;
+            """, (*params, last_rowid, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1]["_rowid"]
+            yield from rows
+
+    def bulk_dead_jobs(self, action, chunk_size=500, pause=0.05, skipped=None, **filters):
+        """
+        Retry ('retry') or delete ('purge') matching dead jobs in chunks.
+
+        Each chunk is its own short transaction, walking the table by rowid,
+        with a `pause`-second sleep between chunks so workers can take the
+        write lock to claim jobs. Yields the running total after every chunk.
+
+        A dead job whose dedup_key is held by an active job (or by another
+        job retried earlier in the run), or that still depends on a dead job
+        not retried with it, stays in the DLQ; its id is appended to the
+        `skipped` list if one is given. Retried jobs get their dependency
+        counters recounted, and descendants that died only because of them
+        are re-armed (see _rearm_dependents).
+        """
+        if action not in ("retry", "purge"):
+            raise ValueError(f"Unknown DLQ action '{action}'")
+        where, params = self._dead_filter(**filters)
+        last_rowid, done = 0, 0
+        while True:
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            with self.con:
+                rows = self.con.execute(f"""
+                    SELECT rowid, id FROM jobs
+                    WHERE {where} AND rowid > ?
+                    ORDER BY rowid
+                    LIMIT ?;
+                """, (*params, last_rowid, chunk_size)).fetchall()
+                if not rows:
+                    return
+                last_rowid = rows[-1][0]
+                marks = ",".join("?" * len(rows))
+                ids = [r[1] for r in rows]
+                if action == "retry":
+                    # Only one job per dedup_key may be active, so keep the first dead job of
+                    # each key and only when no active job holds it.
+                    retry = {r[0] for r in self.con.execute(f"""
+                        SELECT id FROM jobs
+                        WHERE id IN ({marks}) AND status = 'dead' AND (
+                            dedup_key IS NULL OR (
+                                NOT EXISTS (
+                                    SELECT 1 FROM jobs a
+                                    WHERE a.dedup_key = jobs.dedup_key AND a.status IN {ACTIVE_STATUSES}
+                                )
+                                AND rowid = (
+                                    SELECT MIN(d.rowid) FROM jobs d
+                                    WHERE d.dedup_key = jobs.dedup_key AND d.id IN ({marks}) AND d.status = 'dead'
+                                )
+                            )
+                        );
+                    """, ids + ids)}
+                    retry -= self._dead_parent_blocked(retry)
+                    if skipped is not None:
+                        skipped.extend(i for i in ids if i not in retry)
+                    ids = [i for i in ids if i in retry]
+                    marks = ",".join("?" * len(ids))
+                    # Retried map children are no longer counted as dead by their parent.
+                    self.con.execute(f"""
+                        UPDATE map_progress
+                        SET dead = dead - (
+                            SELECT COUNT(*) FROM jobs
+                            WHERE parent_id = map_progress.job_id AND id IN ({marks}) AND status = 'dead'
+                        )
+                        WHERE job_id IN (SELECT parent_id FROM jobs WHERE id IN ({marks}) AND parent_id IS NOT NULL);
+                    """, ids + ids)
+                    cursor = self.con.execute(f"""
+                        UPDATE jobs
+                        SET status = 'pending', attempts = 0, run_at = ?, updated_at = ?
+                        WHERE id IN ({marks}) AND status = 'dead';
+                    """, (now, now, *ids))
+                    self._rearm_dependents(ids, now)
+                else:
+                    cursor = self.con.execute(f"DELETE FROM jobs WHERE id IN ({marks}) AND status = 'dead';", ids)
+                    self.con.execute(f"""
+                        DELETE FROM job_edges
+                        WHERE parent_id IN ({marks}) OR child_id IN ({marks});
+                    """, ids + ids)
+                done += cursor.rowcount
+            yield done
+            if len(rows) < chunk_size:
+                return
+            time.sleep(pause)
+
     # ----------------------------------------------------------------------
     #  Job Summary
     # ----------------------------------------------------------------------
@@ -147,6 +1255,591 @@ class Database:
         rows = cur.fetchall()
         return {row["status"]: row["count"] for row in rows}
 
+    def ready_stats(self):
+        """Return (ready job count, age in seconds of the oldest ready job)."""
+        now = datetime.now(timezone.utc)
+        row = self.con.execute("""
+            SELECT COUNT(*) AS depth, MIN(run_at) AS oldest
+            FROM jobs
+            WHERE status = 'pending' AND deps_remaining = 0 AND run_at <= ?;
+        """, (now.strftime("%Y-%m-%d %H:%M:%S"),)).fetchone()
+        if not row["depth"]:
+            return 0, 0.0
+        oldest = datetime.strptime(row["oldest"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        return row["depth"], max(0.0, (now - oldest).total_seconds())
+
+    # ----------------------------------------------------------------------
+    #  Recurring Schedules
+    # ----------------------------------------------------------------------
+    def add_schedule(self, name, template, next_run, cron=None, every=None, catchup="latest", replace=False):
+        """
+        Store a recurring job template (add_job keyword arguments) that fires
+        first at `next_run`. Raises ValueError if the name is taken, unless
+        `replace` is set; replacing keeps the fired count.
+        """
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with self.con:
+            if replace:
+                cursor = self.con.execute("""
+                    UPDATE schedules
+                    SET cron = ?, every = ?, catchup = ?, template = ?, next_run = ?, enabled = 1
+                    WHERE name = ?;
+                """, (cron, every, catchup, json.dumps(template), next_run, name))
+                if cursor.rowcount:
+                    return
+            try:
+                self.con.execute("""
+                    INSERT INTO schedules (name, cron, every, catchup, template, next_run, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?);
+                """, (name, cron, every, catchup, json.dumps(template), next_run, now))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Schedule '{name}' already exists")
+
+    def get_schedule(self, name):
+        return self.con.execute("SELECT * FROM schedules WHERE name = ?;", (name,)).fetchone()
+
+    def list_schedules(self, enabled_only=False):
+        where = "WHERE enabled = 1" if enabled_only else ""
+        return self.con.execute(f"SELECT * FROM schedules {where} ORDER BY next_run IS NULL, next_run, name;").fetchall()
+
+    @staticmethod
+    def schedule_template(row):
+        """add_job keyword arguments of a schedule's jobs."""
+        return json.loads(row["template"])
+
+    def set_schedule_enabled(self, name, enabled, next_run=None):
+        """Pause or resume a schedule; resuming sets the next fire time. Returns False if it does not exist."""
+        with self.con:
+            if enabled:
+                cursor = self.con.execute("UPDATE schedules SET enabled = 1, next_run = ? WHERE name = ?;",
+                                          (next_run, name))
+            else:
+                cursor = self.con.execute("UPDATE schedules SET enabled = 0 WHERE name = ?;", (name,))
+        return cursor.rowcount > 0
+
+    def remove_schedule(self, name):
+        with self.con:
+            return self.con.execute("DELETE FROM schedules WHERE name = ?;", (name,)).rowcount > 0
+
+    def advance_schedule(self, name, expected_next, next_run, last_run, fired):
+        """
+        Move a schedule past the ticks just materialized. Compare-and-set on
+        next_run, so when several workers fire the same tick only the first
+        advances it. Returns True if this call won.
+        """
+        with self.con:
+            cursor = self.con.execute("""
+                UPDATE schedules
+                SET next_run = ?, last_run = COALESCE(?, last_run), fired = fired + ?
+                WHERE name = ? AND next_run = ?;
+            """, (next_run, last_run, fired, name, expected_next))
+        return cursor.rowcount > 0
+
+    # ----------------------------------------------------------------------
+    #  Worker Heartbeats
+    # ----------------------------------------------------------------------
+    def upsert_workers(self, rows):
+        """
+        Write heartbeat rows in one transaction.
+        Each row: (id, name, host, pid, status, current_job, job_started_at,
+        jobs_done, started_at, last_heartbeat).
+        """
+        with tracer.span("db.heartbeat"), self.con:
+            self.con.executemany("""
+                INSERT INTO workers (
+                    id, name, host, pid, status, current_job, job_started_at,
+                    jobs_done, started_at, last_heartbeat
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    status = excluded.status,
+                    current_job = excluded.current_job,
+                    job_started_at = excluded.job_started_at,
+                    jobs_done = excluded.jobs_done,
+                    last_heartbeat = excluded.last_heartbeat;
+            """, rows)
+
+    def list_workers(self, live_within=None):
+        """Return worker rows, optionally only those heard from in the last `live_within` seconds."""
+        if live_within is None:
+            return self.con.execute("SELECT * FROM workers ORDER BY host, pid, name;").fetchall()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=live_within)
+        return self.con.execute("""
+            SELECT * FROM workers
+            WHERE status != 'stopped' AND last_heartbeat >= ?
+            ORDER BY host, pid, name;
+        """, (cutoff.strftime("%Y-%m-%d %H:%M:%S"),)).fetchall()
+
+    def purge_workers(self, older_than):
+        """Delete worker rows whose last heartbeat is older than `older_than` seconds."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than)
+        with self.con:
+            self.con.execute("DELETE FROM workers WHERE last_heartbeat < ?;", (cutoff.strftime("%Y-%m-%d %H:%M:%S"),))
+
+    # ----------------------------------------------------------------------
+    #  Resource Accounting
+    # ----------------------------------------------------------------------
+    def record_runs(self, rows):
+        """
+        Insert finished-run rows in one transaction.
+        Each row: (job_id, command, attempt, outcome, exit_code, wall_time,
+        cpu_user, cpu_sys, max_rss_kb, finished_at).
+        """
+        with tracer.span("db.record_runs", rows=len(rows)), self.con:
+            self.con.executemany("""
+                INSERT INTO job_runs (
+                    job_id, command, attempt, outcome, exit_code, wall_time,
+                    cpu_user, cpu_sys, max_rss_kb, finished_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """, rows)
+
+    def list_job_runs(self, job_id):
+        """Return every recorded run of a job, oldest first."""
+        return self.con.execute(
+            "SELECT * FROM job_runs WHERE job_id = ? ORDER BY id;", (job_id,)
+        ).fetchall()
+
+    def run_stats_by_command(self, limit=10):
+        """Aggregate resource usage per command, most total CPU first."""
+        return self.con.execute("""
+            SELECT command,
+                   COUNT(*) AS runs,
+                   SUM(outcome = 'timeout') AS timeouts,
+                   ROUND(SUM(COALESCE(cpu_user, 0) + COALESCE(cpu_sys, 0)), 3) AS cpu_total,
+                   ROUND(AVG(wall_time), 3) AS wall_avg,
+                   MAX(max_rss_kb) AS max_rss_kb
+            FROM job_runs
+            GROUP BY command
+            ORDER BY cpu_total DESC, runs DESC
+            LIMIT ?;
+        """, (limit,)).fetchall()
+
+    # ----------------------------------------------------------------------
+    #  Event Stream
+    # ----------------------------------------------------------------------
+    def read_events(self, since=0, limit=500):
+        """Events with seq greater than `since`, oldest first (a primary-key range scan)."""
+        return self.con.execute("""
+            SELECT * FROM job_events
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?;
+        """, (since, limit)).fetchall()
+
+    def last_event_seq(self):
+        """Sequence number of the newest event (0 if there are none)."""
+        row = self.con.execute("SELECT MAX(seq) FROM job_events;").fetchone()
+        return row[0] or 0
+
+    def get_consumer_seq(self, name):
+        """Last acknowledged seq of a named consumer, or None if it is unknown."""
+        row = self.con.execute("SELECT seq FROM event_consumers WHERE name = ?;", (name,)).fetchone()
+        return row["seq"] if row else None
+
+    def ack_events(self, name, seq):
+        """Record that consumer `name` has processed every event up to `seq`."""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with self.con:
+            self.con.execute("""
+                INSERT INTO event_consumers (name, seq, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET seq = MAX(seq, excluded.seq), updated_at = excluded.updated_at;
+            """, (name, seq, now))
+
+    def remove_consumer(self, name):
+        """Forget a consumer so it no longer holds back trimming."""
+        with self.con:
+            self.con.execute("DELETE FROM event_consumers WHERE name = ?;", (name,))
+
+    def trim_events(self, max_age, chunk_size=1000, pause=0.05):
+        """
+        Delete events that every registered consumer has acknowledged, and
+        any event older than `max_age` seconds regardless. Works from the
+        oldest seq in chunks of short transactions; returns rows deleted.
+        """
+        consumed = self.con.execute("SELECT MIN(seq) FROM event_consumers;").fetchone()[0]
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age)).strftime("%Y-%m-%d %H:%M:%S")
+        deleted = 0
+        while True:
+            rows = self.con.execute("SELECT seq, at FROM job_events ORDER BY seq LIMIT ?;", (chunk_size,)).fetchall()
+            last = None
+            for row in rows:
+                if not ((consumed is not None and row["seq"] <= consumed) or row["at"] < cutoff):
+                    break
+                last = row["seq"]
+            if last is None:
+                return deleted
+            with self.con:
+                deleted += self.con.execute("DELETE FROM job_events WHERE seq <= ?;", (last,)).rowcount
+            if last != rows[-1]["seq"]:
+                return deleted
+            time.sleep(pause)
+
+    # ----------------------------------------------------------------------
+    #  Fan-out (map jobs)
+    # ----------------------------------------------------------------------
+    def get_map_progress(self, job_id):
+        """Return the map_progress row of a map job, or None."""
+        return self.con.execute("SELECT * FROM map_progress WHERE job_id = ?;", (job_id,)).fetchone()
+
+    def list_active_maps(self):
+        """Progress rows of map jobs that have not finished yet."""
+        return self.con.execute("""
+            SELECT m.*, j.command, j.status
+            FROM map_progress m
+            JOIN jobs j ON j.id = m.job_id
+            WHERE j.status NOT IN ('completed', 'dead')
+            ORDER BY j.created_at;
+        """).fetchall()
+
+    def expand_map(self, parent, cursor, new_cursor, children, exhausted):
+        """
+        Insert one chunk of children for a claimed map job and advance its cursor.
+
+        `children` is a list of (job_id, command); they inherit the parent's
+        queue, tag, priority and max_retries. The cursor update is a
+        compare-and-set on `cursor`, so a chunk is never created twice; returns
+        False if another worker already advanced it. Afterwards the parent is
+        finished (source exhausted and every child done), re-queued (room for
+        another full chunk), or parked until enough children finish.
+        """
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with tracer.span("db.expand_map", children=len(children)), self.con:
+            self.con.execute("BEGIN IMMEDIATE;")
+            row = self.con.execute("""
+                UPDATE map_progress
+                SET cursor = ?, created = created + ?, exhausted = ?, waiting = 0,
+                    total = CASE WHEN ? THEN created + ? ELSE total END
+                WHERE job_id = ? AND cursor = ?
+                RETURNING *;
+            """, (new_cursor, len(children), int(exhausted), int(exhausted), len(children),
+                  parent["id"], cursor)).fetchone()
+            if row is None:
+                return False
+
+            if children:
+                self.con.executemany("""
+                    INSERT INTO jobs (
+                        id, command, status, attempts, max_retries, priority, base_priority, run_at,
+                        created_at, updated_at, queue, tag, requires, parent_id
+                    )
+                    VALUES (?, ?, 'pending', 0, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+                """, [(child_id, command, parent["max_retries"], parent["priority"], parent["priority"],
+                       now, now, now, parent["queue"], parent["tag"], parent["requires"], parent["id"])
+                      for child_id, command in children])
+                self._count_enqueued(datetime.now(timezone.utc), len(children))
+
+            in_flight = row["created"] - row["completed"] - row["dead"]
+            if exhausted and in_flight == 0:
+                self._finish_map(row, now)
+            elif not exhausted and self._map_has_room(row):
+                self.con.execute("""
+                    UPDATE jobs SET status = 'pending', run_at = ?, updated_at = ? WHERE id = ?;
+                """, (now, now, parent["id"]))
+            else:
+                self.con.execute("UPDATE map_progress SET waiting = 1 WHERE job_id = ?;", (parent["id"],))
+                self.con.execute("UPDATE jobs SET status = 'processing', updated_at = ? WHERE id = ?;",
+                                 (now, parent["id"]))
+            return True
+
+    @staticmethod
+    def _map_has_room(row):
+        """True if a map job may create another full chunk without exceeding its window."""
+        in_flight = row["created"] - row["completed"] - row["dead"]
+        return row["window"] - in_flight >= min(row["chunk_size"], row["window"])
+
+    def _child_finished(self, parent_id, status, now):
+        """
+        Count a finished map child against its parent (inside the caller's
+        transaction). Wakes a parked parent once a chunk fits in its window,
+        and finishes the parent when its source is exhausted and the last
+        child is done.
+        """
+        column = "completed" if status == "completed" else "dead"
+        row = self.con.execute(f"""
+            UPDATE map_progress
+            SET {column} = {column} + 1
+            WHERE job_id = ?
+            RETURNING *;
+        """, (parent_id,)).fetchone()
+        if row is None:
+            return
+        if row["exhausted"]:
+            if row["created"] == row["completed"] + row["dead"]:
+                self._finish_map(row, now)
+        elif row["waiting"] and self._map_has_room(row):
+            self.con.execute("UPDATE map_progress SET waiting = 0 WHERE job_id = ?;", (parent_id,))
+            self.con.execute("""
+                UPDATE jobs SET status = 'pending', run_at = ?, updated_at = ? WHERE id = ?;
+            """, (now, now, parent_id))
+
+    def _finish_map(self, row, now):
+        """Complete a map job whose children all finished (dead if any child died), releasing its reducer."""
+        status = "completed" if row["dead"] == 0 else "dead"
+        cursor = self.con.execute("""
+            UPDATE jobs
+            SET status = ?, updated_at = ?
+            WHERE id = ? AND status NOT IN ('completed', 'dead');
+        """, (status, now, row["job_id"]))
+        if cursor.rowcount == 0:
+            return
+        if status == "completed":
+            self._release_dependents(row["job_id"])
+        else:
+            self._propagate_failure(row["job_id"], now)
+
+    # ----------------------------------------------------------------------
+    #  Result Cache
+    # ----------------------------------------------------------------------
+    def cache_lookup(self, key, max_age):
+        """Return the cached result for `key` if it was stored within the last `max_age` seconds."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        return self.con.execute("""
+            SELECT * FROM result_cache
+            WHERE key = ? AND created_at >= ?;
+        """, (key, cutoff.strftime("%Y-%m-%d %H:%M:%S"))).fetchone()
+
+    def complete_from_cache(self, job_id, key):
+        """Mark a claimed job completed from a cache hit and refresh the entry's LRU position."""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with tracer.span("db.cache_hit"), self.con:
+            self.con.execute("""
+                UPDATE result_cache
+                SET last_used = ?, hits = hits + 1
+                WHERE key = ?;
+            """, (now, key))
+            cursor = self.con.execute("""
+                UPDATE jobs
+                SET status = 'completed', attempts = attempts + 1, updated_at = ?
+                WHERE id = ? AND status != 'completed';
+            """, (now, job_id))
+            if cursor.rowcount:
+                self._release_dependents(job_id)
+
+    def cache_store(self, key, job_id, exit_code, stdout, stderr, max_entries, max_bytes):
+        """
+        Insert or refresh a cache entry, then evict least recently used
+        entries until the cache fits in `max_entries` / `max_bytes`.
+        Returns the number of evicted entries. Results larger than the whole
+        budget are not stored.
+        """
+        size = len((stdout or "").encode()) + len((stderr or "").encode())
+        if size > max_bytes:
+            return 0
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        evicted = 0
+        with tracer.span("db.cache_store"), self.con:
+            self.con.execute("""
+                INSERT INTO result_cache (key, source_job, exit_code, stdout, stderr, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    source_job = excluded.source_job,
+                    exit_code = excluded.exit_code,
+                    stdout = excluded.stdout,
+                    stderr = excluded.stderr,
+                    size = excluded.size,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used;
+            """, (key, job_id, exit_code, stdout, stderr, size, now, now))
+            while True:
+                stats = self.con.execute("SELECT entries, bytes FROM result_cache_stats WHERE id = 1;").fetchone()
+                if stats["entries"] <= max_entries and stats["bytes"] <= max_bytes:
+                    break
+                batch = max(stats["entries"] - max_entries, 1)
+                cursor = self.con.execute("""
+                    DELETE FROM result_cache
+                    WHERE key IN (SELECT key FROM result_cache WHERE key != ? ORDER BY last_used LIMIT ?);
+                """, (key, batch))
+                if not cursor.rowcount:
+                    break
+                evicted += cursor.rowcount
+            if evicted:
+                self.con.execute("UPDATE result_cache_stats SET evictions = evictions + ? WHERE id = 1;", (evicted,))
+        return evicted
+
+    def record_cache_lookups(self, hits, misses):
+        """Add buffered hit/miss counts to the cache statistics."""
+        with self.con:
+            self.con.execute("""
+                UPDATE result_cache_stats
+                SET hits = hits + ?, misses = misses + ?
+                WHERE id = 1;
+            """, (hits, misses))
+
+    def cache_stats(self):
+        """Return the cache totals row (entries, bytes, hits, misses, evictions)."""
+        return self.con.execute("SELECT * FROM result_cache_stats WHERE id = 1;").fetchone()
+
+    # ----------------------------------------------------------------------
+    #  Rollups
+    # ----------------------------------------------------------------------
+    def _count_enqueued(self, now, count=1):
+        """Bump the enqueued counter of the current minute/hour/day buckets (inside the enqueue transaction)."""
+        self.con.executemany("""
+            INSERT INTO rollups (resolution, bucket, enqueued) VALUES (?, ?, ?)
+            ON CONFLICT(resolution, bucket) DO UPDATE SET enqueued = enqueued + excluded.enqueued;
+        """, [(res, bucket_start(now, res), count) for res in RESOLUTIONS])
+
+    def merge_rollups(self, minutes):
+        """
+        Add buffered per-minute aggregates (see core.rollups.RollupBuffer)
+        into the minute, hour and day rows in one transaction.
+        """
+        merged = {}
+        for minute, entry in minutes.items():
+            dt = datetime.strptime(minute, "%Y-%m-%d %H:%M:%S")
+            for res in RESOLUTIONS:
+                key = (res, bucket_start(dt, res))
+                target = merged.get(key)
+                if target is None:
+                    merged[key] = {**entry, "sketch": LatencySketch().merge(entry["sketch"])}
+                    continue
+                for name in COUNTERS + ("duration_sum", "duration_count"):
+                    target[name] += entry[name]
+                target["sketch"].merge(entry["sketch"])
+
+        with tracer.span("db.rollups", rows=len(merged)), self.con:
+            # Sketches are merged in Python, so take the write lock before reading them.
+            self.con.execute("BEGIN IMMEDIATE;")
+            for (res, bucket), entry in merged.items():
+                row = self.con.execute(
+                    "SELECT sketch FROM rollups WHERE resolution = ? AND bucket = ?;", (res, bucket)
+                ).fetchone()
+                sketch = entry["sketch"]
+                if row is not None:
+                    sketch.merge(LatencySketch.loads(row["sketch"]))
+                self.con.execute("""
+                    INSERT INTO rollups (
+                        resolution, bucket, enqueued, completed, failed, dead,
+                        duration_sum, duration_count, sketch
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(resolution, bucket) DO UPDATE SET
+                        enqueued = enqueued + excluded.enqueued,
+                        completed = completed + excluded.completed,
+                        failed = failed + excluded.failed,
+                        dead = dead + excluded.dead,
+                        duration_sum = duration_sum + excluded.duration_sum,
+                        duration_count = duration_count + excluded.duration_count,
+                        sketch = excluded.sketch;
+                """, (res, bucket, entry["enqueued"], entry["completed"], entry["failed"], entry["dead"],
+                      entry["duration_sum"], entry["duration_count"], sketch.dumps()))
+
+    def list_rollups(self, resolution, since):
+        """Rollup rows of one resolution from bucket `since` (storage timestamp) onward."""
+        return self.con.execute("""
+            SELECT * FROM rollups
+            WHERE resolution = ? AND bucket >= ?
+            ORDER BY bucket;
+        """, (resolution, since)).fetchall()
+
+    def prune_rollups(self, retention):
+        """Delete rollup rows older than `retention[resolution]` seconds (resolutions not listed are kept)."""
+        now = datetime.now(timezone.utc)
+        with self.con:
+            for res, seconds in retention.items():
+                cutoff = bucket_start(now - timedelta(seconds=seconds), res)
+                self.con.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?;", (res, cutoff))
+
+    # ----------------------------------------------------------------------
+    #  Snapshot / Export / Import
+    # ----------------------------------------------------------------------
+    def snapshot(self, path, pages=256, pause=0.05, progress=None, max_restarts=4):
+        """
+        Copy the whole database to `path` with SQLite's online backup API,
+        `pages` pages per step with a `pause`-second sleep between steps, so
+        writers only wait for one step at a time. A write by another
+        connection makes SQLite restart the copy; after each restart the
+        step grows 4x, and after `max_restarts` the copy is done in a single
+        step. `progress(remaining, total)` is called after every step.
+        Returns the number of restarts.
+        """
+        for restarts in range(max_restarts + 1):
+            step = -1 if restarts == max_restarts else pages * 4 ** restarts
+            last = [None]
+
+            def on_step(status, remaining, total):
+                if last[0] is not None and remaining > last[0]:
+                    raise _SnapshotRestarted()
+                last[0] = remaining
+                if progress:
+                    progress(remaining, total)
+
+            target = sqlite3.connect(path)
+            try:
+                with tracer.span("db.snapshot", pages=step):
+                    self.con.backup(target, pages=step, progress=on_step, sleep=pause)
+                return restarts
+            except _SnapshotRestarted:
+                continue
+            finally:
+                target.close()
+
+    def table_columns(self, table):
+        """Column names of `table`, in table order."""
+        return [row[1] for row in self.con.execute(f"PRAGMA table_info({table});")]
+
+    def iter_table(self, table, chunk_size=1000):
+        """
+        Stream an EXPORT_TABLES table as pages (lists of tuples, in
+        table_columns order), walking its key in short queries like
+        iter_dead_jobs, so an export never holds a read transaction open.
+        """
+        key = EXPORT_TABLES[table]
+        columns = ", ".join(self.table_columns(table))
+        cur = self.con.cursor()
+        cur.row_factory = None
+        last = None
+        while True:
+            after = f"({', '.join(key)}) > ({', '.join('?' * len(key))})" if last else "1"
+            cur.execute(f"""
+                SELECT {", ".join(key)}, {columns} FROM {table}
+                WHERE {after}
+                ORDER BY {", ".join(key)}
+                LIMIT ?;
+            """, (*(last or ()), chunk_size))
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [row[len(key):] for row in rows]
+            last = rows[-1][:len(key)]
+
+    def import_rows(self, table, columns, rows):
+        """
+        Insert exported rows into an EXPORT_TABLES table in one transaction,
+        skipping rows whose key already exists. Columns this database does
+        not have are dropped; jobs that were 'processing' when exported are
+        imported as 'pending', since no worker here is running them, and jobs
+        without a base_priority (older exports) get their current priority.
+        Returns the number of rows inserted.
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Table '{table}' cannot be imported")
+        known = set(self.table_columns(table))
+        keep = [i for i, c in enumerate(columns) if c in known]
+        names = [columns[i] for i in keep]
+        jobs = table == "jobs" and "status" in names and "priority" in names
+        if jobs and "base_priority" not in names:
+            names.append("base_priority")
+        values = []
+        for row in rows:
+            picked = [row[i] for i in keep]
+            if jobs:
+                if len(picked) < len(names):
+                    picked.append(None)
+                record = dict(zip(names, picked))
+                if record["status"] == "processing":
+                    picked[names.index("status")] = "pending"
+                if record["base_priority"] is None:
+                    picked[names.index("base_priority")] = record["priority"]
+            values.append(picked)
+        with tracer.span("db.import", table=table, rows=len(values)), self.con:
+            cur = self.con.executemany(f"""
+                INSERT OR IGNORE INTO {table} ({", ".join(names)})
+                VALUES ({", ".join("?" * len(names))});
+            """, values)
+        return cur.rowcount
+
     # ----------------------------------------------------------------------
     #  Helper Methods
     # ----------------------------------------------------------------------
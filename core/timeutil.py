@@ -0,0 +1,21 @@
+import re
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)([smhdw]?)")
+
+
+def parse_duration(text) -> float:
+    """
+    Parse a duration such as '90', '45s', '30m', '12h', '7d', '2w' or '1h30m'
+    into seconds. A bare number means seconds.
+    """
+    if isinstance(text, (int, float)):
+        return float(text)
+    value = str(text).strip().lower()
+    parts = _DURATION_PART.findall(value)
+    if not value or "".join(n + u for n, u in parts) != value:
+        raise ValueError(f"Invalid duration '{text}' (examples: 90s, 30m, 12h, 7d)")
+    return sum(float(n) * _DURATION_UNITS[u or "s"] for n, u in parts)
+
@@ -0,0 +1,184 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import yappi
+except ImportError:  # optional, preferred for multi-threaded profiling when installed
+    yappi = None
+
+
+class _Span:
+    """Context manager that records one span into a Tracer on exit."""
+
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.start, self.args)
+        return False
+
+
+class _NoopSpan:
+    """Shared do-nothing span used while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """
+    Per-phase timing spans kept in a fixed-size ring buffer.
+
+    Spans cost one perf_counter call and a deque append (atomic in CPython,
+    so no lock is taken); when disabled, `span()` returns a shared no-op
+    object. The buffer can be exported as Chrome trace-event JSON (open it
+    in chrome://tracing or https://ui.perfetto.dev) or summarized per phase.
+    """
+
+    def __init__(self, capacity: int = 10000, enabled: bool = False):
+        self.enabled = enabled
+        self.spans = deque(maxlen=capacity)
+        self.pid = os.getpid()
+
+    def enable(self, capacity: int = None):
+        if capacity:
+            self.spans = deque(self.spans, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    @staticmethod
+    def now() -> int:
+        """Start mark for `record()` (nanoseconds, monotonic)."""
+        return time.perf_counter_ns()
+
+    def span(self, name: str, **args):
+        """Time the enclosed block as phase `name`."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, args)
+
+    def record(self, name: str, start_ns: int, args: dict = None):
+        """Record a span that started at `start_ns` (from `now()`) and ends now."""
+        if not self.enabled:
+            return
+        end_ns = time.perf_counter_ns()
+        self.spans.append((name, start_ns, end_ns - start_ns, threading.current_thread().name, args or None))
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def to_chrome_trace(self) -> dict:
+        """Spans as Chrome trace-event 'complete' events (microseconds)."""
+        spans = list(self.spans)
+        tids = {}
+        events = []
+        for name, start_ns, dur_ns, thread, args in spans:
+            tid = tids.setdefault(thread, len(tids) + 1)
+            event = {
+                "name": name, "cat": name.split(".")[0], "ph": "X",
+                "ts": start_ns / 1000, "dur": dur_ns / 1000, "pid": self.pid, "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        for thread, tid in tids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": thread}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> int:
+        """Write the Chrome trace JSON to `path`; returns the number of spans."""
+        trace = self.to_chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return sum(1 for e in trace["traceEvents"] if e["ph"] == "X")
+
+    def summary(self) -> dict:
+        """Per-phase count, average, max and total duration in milliseconds."""
+        phases = {}
+        for name, _, dur_ns, _, _ in list(self.spans):
+            stats = phases.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = dur_ns / 1e6
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+        for stats in phases.values():
+            stats["avg_ms"] = round(stats["total_ms"] / stats["count"], 3)
+            stats["total_ms"] = round(stats["total_ms"], 3)
+            stats["max_ms"] = round(stats["max_ms"], 3)
+        return phases
+
+
+# Process-wide tracer shared by the worker engine, storage and spawn layers.
+tracer = Tracer()
+
+
+class Profiler:
+    """
+    Function-level profile across all worker threads.
+
+    Uses yappi when it is installed (one profiler for every thread).
+    Otherwise each worker thread runs its own cProfile.Profile, and the
+    results are merged into one pstats file at shutdown.
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.backend = "yappi" if yappi is not None else "cProfile"
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        if yappi is not None:
+            yappi.set_clock_type("wall")
+            yappi.start()
+
+    @contextmanager
+    def thread(self):
+        """Profile the calling thread for the duration of the block."""
+        if yappi is not None:
+            yield
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def dump(self):
+        """Stop profiling, write merged pstats to `output` and return them (None if empty)."""
+        if yappi is not None:
+            yappi.stop()
+            yappi.get_func_stats().save(self.output, type="pstat")
+            return pstats.Stats(self.output)
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(self.output)
+        return stats
@@ -6,19 +6,46 @@ import subprocess
 import time
 import signal
 import platform
+import socket
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime, timezone, timedelta
 from core.storage import Database
 from core.config import ConfigManager
+from core.rate_limit import RateLimiter
+from core.executor import WarmExecutorPool
+from core import spawn, fanout
+from core.autoscaler import Autoscaler
+from core.retry_policy import RetryPolicy
+from core.tracing import tracer, Profiler
+from core.rollups import RollupBuffer
+from core.result_cache import ResultCache
+from core import capabilities
+from core.schedules import Scheduler
+from core.aging import AgingPolicy
+from core.timeutil import parse_duration
+from core.lease import RemoteDatabase, LeaseError
+from core.worker_log import WorkerLog
 
 
 class WorkerManager:
     """
     Thread-based worker manager for QueueCTL.
     Handles:
-    - job execution
-    - retries with exponential backoff
+    - job execution (shell commands, direct argv exec, or Python callables on warm executors)
+    - retries via pluggable retry policies (per job or per queue)
     - per-job logging
-    - timeout enforcement
+    - timeout enforcement (TERM, then KILL, on the job's whole process group)
+    - per-run resource accounting (CPU, max RSS, wall time)
+    - content-addressed result cache for opted-in jobs (skips the spawn on a hit)
+    - fan-out map jobs, expanded into child jobs one chunk at a time
+    - per-queue / per-tag rate limiting
+    - autoscaling between min_workers and max_workers
+    - worker heartbeats (one writer thread per process)
+    - per-minute throughput/latency rollups (written by the heartbeat thread)
+    - per-phase tracing spans and optional cross-thread profiling
+    - asynchronous console logging (text or JSON lines, sampled, never blocking)
+    - remote mode: all job state through a lease server instead of store.db
     - graceful shutdown
     """
 
@@ -27,11 +54,53 @@ class WorkerManager:
     STATUS_FILE = "worker_threads.json"
     STOP_SIGNAL_FILE = "stop_signal.json"
 
-    def __init__(self, worker_count: int = 1, backoff_base: int = 2):
-        self.db = Database()
-        self.worker_count = worker_count
+    def __init__(self, worker_count: int = 1, backoff_base: int = 2, min_workers: int = None, max_workers: int = None,
+                 trace_path: str = None, profile_path: str = None, tags=None, server: str = None,
+                 token: str = None):
+        # Remote workers (worker-start --server) talk to a lease server; each thread opens its own connection.
+        self.server = server
+        self._connect = (lambda: RemoteDatabase(server, token)) if server else Database
+        self.db = self._connect()
         self.backoff_base = backoff_base
         self.config_mgr = ConfigManager()
+        self.log = self._load_log()
+        self.autoscaler = Autoscaler(
+            int(min_workers or self.config_mgr.get_value("min_workers") or worker_count),
+            int(max_workers or self.config_mgr.get_value("max_workers") or worker_count),
+            self.config_mgr.get_value("autoscale") or {},
+        )
+        self.worker_count = min(max(worker_count, self.autoscaler.min_workers), self.autoscaler.max_workers)
+        self.scale_history = deque(maxlen=20)
+        self.last_scale_sample = None
+        self.heartbeat_interval = float(self.config_mgr.get_value("heartbeat_interval") or 2)
+        self.kill_grace = float(self.config_mgr.get_value("kill_grace") or 5)
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        # Per-thread state, mutated in memory by workers and persisted by the heartbeat thread.
+        self.worker_state = {}
+        self._worker_seq = 0
+        self._retiring = set()
+        self._lock = threading.Lock()
+        # Finished-run usage rows and rollup counters, buffered until the next heartbeat flush.
+        self._run_buffer = []
+        self.rollups = RollupBuffer()
+        self.rate_limiter = self._load_rate_limiter()
+        self.tags, self.accepts = self._load_tags(tags)
+        self.aging = self._load_aging()
+        self.aging_stats = {"promoted_total": 0, "last_promoted": 0, "last_run": None}
+        self.scheduler = Scheduler(refresh=float(self.config_mgr.get_value("schedule_refresh") or 30))
+        self.retry_policies = self._load_retry_policies()
+        self.result_cache = self._load_result_cache()
+        self.executor = WarmExecutorPool(
+            size=int(self.config_mgr.get_value("executor_pool_size") or worker_count),
+            max_tasks=int(self.config_mgr.get_value("executor_max_tasks") or 100),
+            max_rss_mb=int(self.config_mgr.get_value("executor_max_rss_mb") or 512),
+        )
+        # Tracing is on when a trace file is requested or the 'tracing' config key is set.
+        self.trace_path = trace_path
+        if trace_path or self.config_mgr.get_value("tracing"):
+            tracer.enable(int(self.config_mgr.get_value("trace_buffer") or 10000))
+        self.profiler = Profiler(profile_path) if profile_path else None
 
     # ----------------------------------------------------------------------
     # Worker Lifecycle
@@ -41,26 +110,68 @@ class WorkerManager:
         WorkerManager.stop_flag = False
         self._remove_stale_stop_file()
 
-        # Revert processing jobs
-        try:
-            self.db.reset_processing_jobs()
-        except Exception as e:
-            self._console("warning", f"Could not reset processing jobs: {e}")
+        # Revert processing jobs (a lease server requeues its disconnected workers' jobs itself)
+        if not self.server:
+            try:
+                self.db.reset_processing_jobs()
+            except Exception as e:
+                self._console("warning", f"Could not reset processing jobs: {e}")
 
         WorkerManager.workers.clear()
-        for i in range(self.worker_count):
-            thread = threading.Thread(
-                target=self.worker_loop,
-                name=f"Worker-{i+1}",
-                daemon=True
-            )
-            WorkerManager.workers.append(thread)
-            thread.start()
+        # Start executors up front so the first callable jobs do not wait for them.
+        self.executor.warm()
+        if self.profiler:
+            self.profiler.start()
+        for _ in range(self.worker_count):
+            self._spawn_worker()
 
         self._console("info", f"Started {self.worker_count} worker(s).")
-        self._update_status_file()
+        threading.Thread(target=self._heartbeat_loop, name="Heartbeat", daemon=True).start()
+        if self.config_mgr.get_value("scheduler") is not False:
+            threading.Thread(target=self._scheduler_loop, name="Scheduler", daemon=True).start()
+        if self.autoscaler.enabled:
+            threading.Thread(target=self._autoscale_loop, name="Autoscaler", daemon=True).start()
+            self._console(
+                "info", f"Autoscaling between {self.autoscaler.min_workers} and {self.autoscaler.max_workers} workers."
+            )
         self.setup_signal_handlers()
 
+    def _spawn_worker(self):
+        """Start one additional worker thread."""
+        with self._lock:
+            self._worker_seq += 1
+            name = f"Worker-{self._worker_seq}"
+        target = self._profiled_worker_loop if self.profiler else self.worker_loop
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        self.worker_state[name] = {
+            "thread": thread,
+            "status": "idle",
+            "current_job": None,
+            "job_started_at": None,
+            "jobs_done": 0,
+            "started_at": self._utc_now(),
+        }
+        WorkerManager.workers.append(thread)
+        thread.start()
+
+    def _retire_worker(self):
+        """Ask one worker (preferably an idle, recently added one) to exit after its current job."""
+        with self._lock:
+            candidates = sorted(
+                self._live_workers(),
+                key=lambda t: (self._is_busy(t.name), -int(t.name.split("-")[1])),
+            )
+            if candidates:
+                self._retiring.add(candidates[0].name)
+
+    def _live_workers(self):
+        """Worker threads that are running and not scheduled for retirement."""
+        return [t for t in WorkerManager.workers if t.is_alive() and t.name not in self._retiring]
+
+    def _is_busy(self, name: str) -> bool:
+        state = self.worker_state.get(name)
+        return bool(state and state["status"] == "busy")
+
     @staticmethod
     def stop_all():
         """Signal all workers to stop gracefully."""
@@ -77,104 +188,499 @@ class WorkerManager:
     # ----------------------------------------------------------------------
     def worker_loop(self):
         """Main worker loop that continuously fetches and executes jobs."""
-        db = Database()
+        db = self._connect()
         config = ConfigManager()
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
 
+        name = threading.current_thread().name
+        state = self.worker_state[name]
+
         while not WorkerManager.stop_flag:
-            self._update_status_file()
-            job = db.fetch_next_pending_job()
+            if name in self._retiring:
+                self._console("info", f"{name} retired by autoscaler.")
+                self._retiring.discard(name)
+                return
+
+            claim_start = tracer.now()
+            job = self._claim_job(db)
 
             if not job:
                 time.sleep(1)
                 continue
+            tracer.record("claim", claim_start, {"job": job["id"]})
 
-            job_id = job["id"]
-            cmd = job["command"]
-            attempts = job["attempts"]
-            max_retries = job["max_retries"]
             try:
-                job_timeout = int(config.get_value("job_timeout") or 30)
-            except Exception:
-                job_timeout = 30
+                self._process_job(db, job, config, log_dir, state)
+            except LeaseError as e:
+                # The lease server requeues the job once this connection is gone.
+                self._console("warning", f"Abandoned {job['id']}: {e}", job=job["id"])
+
+            if WorkerManager.stop_flag:
+                self._console("info", f"{threading.current_thread().name} received stop signal.")
+                break
+
+            time.sleep(0.2)
+
+        self._console("info", f"{threading.current_thread().name} stopped gracefully.")
+
+    def _process_job(self, db: Database, job, config: ConfigManager, log_dir: Path, state: dict):
+        """Run one claimed job and record its outcome."""
+        job_id = job["id"]
+        cmd = job["command"]
+        attempts = job["attempts"]
+        try:
+            job_timeout = int(config.get_value("job_timeout") or 30)
+        except Exception:
+            job_timeout = 30
 
 
+        log_path = log_dir / f"{job_id}.log"
+        if job["kind"] == "map":
+            with tracer.span("expand", job=job_id):
+                self._expand_map(db, job, log_path)
+            return
+
+        cache_key = ResultCache.key_for(job) if job["cache_ttl"] else None
+        if cache_key and self._complete_from_cache(db, job, cache_key, log_path):
+            state["jobs_done"] += 1
+            return
+
+        with tracer.span("persist", job=job_id):
             db.update_job_status(job_id, "processing")
-            log_path = log_dir / f"{job_id}.log"
+        with tracer.span("log", job=job_id):
             self._write_log_header(log_path, job_id, cmd, job_timeout)
 
-            start_time = time.time()
-            result = None
+        start_time = time.time()
+        result = None
+        outcome, exit_code, usage = "error", None, None
+        state.update(status="busy", current_job=job_id, job_started_at=self._utc_now())
 
-            try:
-                result = subprocess.run(
-                    cmd,
-                    shell=True,
-                    text=True,
-                    timeout=job_timeout
-                )
+        try:
+            with tracer.span("run", job=job_id, kind=job["kind"]):
+                result = self._execute(job, job_timeout)
+            exit_code, usage = result.returncode, getattr(result, "usage", None)
+            outcome = "completed" if exit_code == 0 else "failed"
+            with tracer.span("log", job=job_id):
                 self._write_job_output(log_path, result, start_time)
 
-                if result.stdout:
-                    border = "─" * 65
-                    typer.secho("\n" + border, fg=typer.colors.BRIGHT_BLACK)
-                    typer.secho(f"[ Job Output | ID: {job_id} ]", fg=typer.colors.CYAN, bold=True)
-                    typer.secho(border, fg=typer.colors.BRIGHT_BLACK)
-                    typer.secho(result.stdout.strip(), fg=typer.colors.GREEN, bold=True)
-                    typer.secho(border + "\n", fg=typer.colors.BRIGHT_BLACK)
-                
-                if result.returncode == 0:
+            if result.stdout:
+                self.log.output(job_id, result.stdout)
+
+            if result.returncode == 0:
+                with tracer.span("persist", job=job_id):
                     db.update_job_status(job_id, "completed")
-                    self._console("success", f"Job {job_id} completed successfully.")
-                else:
-                    raise subprocess.SubprocessError(f"Non-zero exit code: {result.returncode}")
+                    if cache_key:
+                        self._store_result(db, job, cache_key, result)
+                self._console("success", f"Job {job_id} completed successfully.", job=job_id)
+            else:
+                raise subprocess.SubprocessError(f"Non-zero exit code: {result.returncode}")
+
+        except LeaseError:
+            raise
+
+        except subprocess.TimeoutExpired as e:
+            outcome, usage = "timeout", getattr(e, "usage", None)
+            self._console("warning", f"{job_id} timed out after {job_timeout}s.", job=job_id)
+            self._append_to_log(log_path, f"TIMEOUT: exceeded {job_timeout}s limit.")
+            with tracer.span("persist", job=job_id):
+                self._handle_failure(db, job, exit_code)
+
+        except Exception as e:
+            self._console("error", f"{job_id} failed: {e}", job=job_id)
+            self._append_to_log(log_path, f"ERROR: {e}")
+            with tracer.span("persist", job=job_id):
+                self._handle_failure(db, job, exit_code)
+
+        finally:
+            self._record_run(job, attempts + 1, outcome, exit_code, usage)
+            state.update(status="idle", current_job=None, job_started_at=None, jobs_done=state["jobs_done"] + 1)
+
+    def _profiled_worker_loop(self):
+        """worker_loop under this thread's profiler (worker-start --profile)."""
+        with self.profiler.thread():
+            self.worker_loop()
+
+    def _execute(self, job, timeout: int):
+        """Run a job with the executor matching its kind."""
+        if job["kind"] == "callable":
+            spec = json.loads(job["spec"] or "{}")
+            return self.executor.run(spec["callable"], spec.get("args"), spec.get("kwargs"), timeout=timeout)
+        if job["kind"] == "argv":
+            spec = json.loads(job["spec"] or "{}")
+            return spawn.run_argv(
+                spec["argv"], timeout, env=spec.get("env"), cwd=spec.get("cwd"), kill_grace=self.kill_grace
+            )
+        return spawn.run_shell(job["command"], timeout, kill_grace=self.kill_grace)
+
+    # ----------------------------------------------------------------------
+    # Fan-out (map jobs)
+    # ----------------------------------------------------------------------
+    def _expand_map(self, db: Database, job, log_path: Path):
+        """
+        Create the next chunk of a claimed map job's children, as far as its
+        window of unfinished children allows. The parent is then re-queued,
+        parked until children finish, or finished (see Database.expand_map).
+        """
+        job_id = job["id"]
+        try:
+            progress = db.get_map_progress(job_id)
+            spec = json.loads(job["spec"])
+            in_flight = progress["created"] - progress["completed"] - progress["dead"]
+            count = min(progress["chunk_size"], progress["window"] - in_flight)
+            if progress["exhausted"] or count <= 0:
+                items, new_cursor, exhausted = [], progress["cursor"], bool(progress["exhausted"])
+            else:
+                spill_path = str(log_path.with_suffix(".items"))
+                items, new_cursor, exhausted = fanout.read_items(spec["source"], progress["cursor"], count, spill_path)
+            children = [
+                (fanout.child_id(job_id, index), fanout.render(spec["command"], item, index, job_id))
+                for index, item in enumerate(items, start=progress["created"])
+            ]
+            if not db.expand_map(job, progress["cursor"], new_cursor, children, exhausted):
+                return
+        except LeaseError:
+            # Transport failure, not a bad map job: leave it to be requeued.
+            raise
+        except Exception as e:
+            self._console("error", f"Map job {job_id} failed to expand: {e}")
+            self._append_to_log(log_path, f"ERROR: could not create children: {e}")
+            db.update_job_status(job_id, "dead")
+            return
+
+        if children:
+            total = progress["created"] + len(children)
+            self._append_to_log(
+                log_path,
+                f"[{datetime.now(timezone.utc).isoformat()}] CREATED {children[0][0]} .. {children[-1][0]} "
+                f"({total} children so far{', source exhausted' if exhausted else ''})",
+            )
+            self._console("info", f"Map job {job_id}: created {len(children)} children ({total} so far).")
 
-            except subprocess.TimeoutExpired:
-                self._console("warning", f"{job_id} timed out after {job_timeout}s.")
-                self._append_to_log(log_path, f"TIMEOUT: exceeded {job_timeout}s limit.")
-                self._handle_failure(db, job_id, attempts, max_retries)
+    # ----------------------------------------------------------------------
+    # Result Cache
+    # ----------------------------------------------------------------------
+    def _load_result_cache(self) -> ResultCache:
+        """Build the result cache limits from the 'result_cache' config key."""
+        try:
+            return ResultCache(self.config_mgr.get_value("result_cache") or {})
+        except (ValueError, TypeError) as e:
+            self._console("warning", f"Ignoring invalid result_cache config: {e}")
+            return ResultCache()
+
+    def _complete_from_cache(self, db: Database, job, key: str, log_path: Path) -> bool:
+        """Complete a claimed job from a fresh cached result; returns False on a miss."""
+        with tracer.span("cache", job=job["id"]):
+            hit = db.cache_lookup(key, job["cache_ttl"])
+        if hit is None:
+            self.result_cache.count("misses")
+            return False
+
+        self.result_cache.count("hits")
+        with tracer.span("persist", job=job["id"]):
+            db.complete_from_cache(job["id"], key)
+        self.rollups.count("completed")
+        content = [
+            f"[{datetime.now(timezone.utc).isoformat()}] CACHE HIT {job['id']}",
+            f"COMMAND: {job['command']}",
+            f"REUSED RESULT OF JOB: {hit['source_job']} (cached at {hit['created_at']} UTC)",
+            f"OUTPUT: {log_path.parent / (hit['source_job'] + '.log')}",
+        ]
+        if hit["stdout"] or hit["stderr"]:
+            content += ["\n=== STDOUT ===", hit["stdout"] or "(no output)",
+                        "\n=== STDERR ===", hit["stderr"] or "(no errors)"]
+        content.append(f"\nEXIT CODE: {hit['exit_code']}")
+        self._append_to_log(log_path, "\n".join(content))
+        self._console("success", f"Job {job['id']} completed from cache (result of {hit['source_job']}).",
+                      job=job["id"])
+        return True
 
+    def _store_result(self, db: Database, job, key: str, result):
+        """Cache a successful run's output; a failure here never fails the job."""
+        try:
+            db.cache_store(
+                key, job["id"], result.returncode, result.stdout, result.stderr,
+                self.result_cache.max_entries, self.result_cache.max_bytes,
+            )
+        except Exception as e:
+            self._console("warning", f"Could not cache result of {job['id']}: {e}")
+
+    def _record_run(self, job, attempt: int, outcome: str, exit_code, usage):
+        """Buffer one run's resource usage; the heartbeat thread writes it."""
+        usage = usage or {}
+        row = (
+            job["id"], job["command"], attempt, outcome, exit_code,
+            usage.get("wall_time"), usage.get("cpu_user"), usage.get("cpu_sys"), usage.get("max_rss_kb"),
+            self._utc_now(),
+        )
+        with self._lock:
+            self._run_buffer.append(row)
+        self.rollups.observe("completed" if outcome == "completed" else "failed", usage.get("wall_time"))
+
+    def shutdown(self):
+        """Release resources held after all worker threads have exited."""
+        self.executor.shutdown()
+        try:
+            self._flush_heartbeats(self.db, final=True)
+        except Exception as e:
+            self._console("warning", f"Could not record worker shutdown: {e}")
+
+        if self.trace_path:
+            try:
+                count = tracer.export(self.trace_path)
+                self._console("info", f"Trace with {count} spans written to {self.trace_path}.")
             except Exception as e:
-                self._console("error", f"{job_id} failed: {e}")
-                self._append_to_log(log_path, f"ERROR: {e}")
-                self._handle_failure(db, job_id, attempts, max_retries)
+                self._console("warning", f"Could not write trace: {e}")
+        if self.profiler:
+            try:
+                stats = self.profiler.dump()
+                if stats is None:
+                    self._console("warning", "No profile data collected (no worker thread finished).")
+                else:
+                    self._console("info", f"{self.profiler.backend} stats written to {self.profiler.output}.")
+                    stats.sort_stats("cumulative").print_stats(15)
+            except Exception as e:
+                self._console("warning", f"Could not write profile: {e}")
+        self.log.close()
 
-            if WorkerManager.stop_flag:
-                self._console("info", f"{threading.current_thread().name} received stop signal.")
-                break
+    # ----------------------------------------------------------------------
+    # Autoscaling
+    # ----------------------------------------------------------------------
+    def _autoscale_loop(self):
+        """Periodically resize the worker pool (runs in its own thread)."""
+        db = self._connect()
+        while not WorkerManager.stop_flag:
+            time.sleep(self.autoscaler.interval)
+            try:
+                self._autoscale_once(db)
+            except Exception as e:
+                self._console("warning", f"Autoscaler error: {e}")
+
+    def _autoscale_once(self, db: Database):
+        """Sample backlog and load, then grow or shrink the pool."""
+        live = self._live_workers()
+        depth, oldest_age = db.ready_stats()
+        idle = sum(1 for t in live if not self._is_busy(t.name))
+        load = Autoscaler.host_load()
+        decision = self.autoscaler.decide(len(live), depth, oldest_age, idle, load)
+
+        self.last_scale_sample = {
+            "workers": len(live),
+            "ready": depth,
+            "oldest_ready_age": round(oldest_age, 1),
+            "idle": idle,
+            "load_per_cpu": round(load, 2) if load is not None else None,
+            **decision.to_dict(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
 
-            time.sleep(0.2)
+        if decision.action == "up":
+            for _ in range(decision.target - len(live)):
+                self._spawn_worker()
+        elif decision.action == "down":
+            for _ in range(len(live) - decision.target):
+                self._retire_worker()
 
-        self._console("info", f"{threading.current_thread().name} stopped gracefully.")
+        if decision.action != "hold":
+            self.scale_history.append(self.last_scale_sample)
+            self._console("info", f"Autoscale {decision.action}: {len(live)} -> {decision.target} ({decision.reason})")
+
+        WorkerManager.workers[:] = [t for t in WorkerManager.workers if t.is_alive()]
+
+    # ----------------------------------------------------------------------
+    # Heartbeats
+    # ----------------------------------------------------------------------
+    # Rollup rows older than this are deleted (day rows are kept unless configured).
+    ROLLUP_RETENTION = {"minute": "2d", "hour": "90d"}
+    # Events are trimmed once every consumer has read them, or after this age regardless.
+    EVENT_RETENTION = "7d"
+
+    def _heartbeat_loop(self):
+        """Single writer that persists worker state every `heartbeat_interval` seconds."""
+        db = self._connect()
+        last_prune = last_aging = None
+        while not WorkerManager.stop_flag:
+            if last_prune is None or time.monotonic() - last_prune >= 3600:
+                last_prune = time.monotonic()
+                self._prune_history(db)
+            if self.aging.enabled and (last_aging is None or time.monotonic() - last_aging >= self.aging.check_every):
+                last_aging = time.monotonic()
+                self._age_priorities(db)
+            try:
+                self._flush_heartbeats(db)
+            except Exception as e:
+                self._console("warning", f"Heartbeat write failed: {e}")
+            time.sleep(self.heartbeat_interval)
+
+    def _scheduler_loop(self):
+        """
+        Materialize recurring jobs as their schedules come due. Every worker
+        process runs one; tick jobs have deterministic ids, so concurrent
+        schedulers never create a tick twice.
+        """
+        db = self._connect()
+        while not WorkerManager.stop_flag:
+            try:
+                self.scheduler.run_due(db)
+            except Exception as e:
+                self._console("warning", f"Scheduler failed: {e}")
+            time.sleep(min(self.scheduler.seconds_until_next(), 1.0))
+
+    def _load_aging(self) -> AgingPolicy:
+        """Build the priority aging policy from the 'aging' config key."""
+        try:
+            return AgingPolicy(self.config_mgr.get_value("aging"))
+        except (ValueError, TypeError) as e:
+            self._console("warning", f"Ignoring invalid aging config: {e}")
+            return AgingPolicy()
+
+    def _age_priorities(self, db: Database):
+        """One batch promotion pass (see core.aging)."""
+        try:
+            promoted = db.promote_waiting_jobs(self.aging.interval, self.aging.step, self.aging.max_priority)
+        except Exception as e:
+            self._console("warning", f"Priority aging failed: {e}")
+            return
+        self.aging_stats["promoted_total"] += promoted
+        self.aging_stats["last_promoted"] = promoted
+        self.aging_stats["last_run"] = self._utc_now()
+
+    def _prune_history(self, db: Database):
+        """Hourly cleanup of stale worker rows, expired rollups and consumed events."""
+        try:
+            db.purge_workers(older_than=3600)
+            retention = {**self.ROLLUP_RETENTION, **(self.config_mgr.get_value("rollup_retention") or {})}
+            db.prune_rollups({res: parse_duration(age) for res, age in retention.items() if age})
+            db.trim_events(parse_duration(self.config_mgr.get_value("event_retention") or self.EVENT_RETENTION))
+        except Exception as e:
+            self._console("warning", f"History cleanup failed: {e}")
+
+    def _flush_heartbeats(self, db: Database, final: bool = False):
+        """
+        Upsert one row per worker thread, write buffered run usage, rollups and
+        cache counters, then refresh the status file.
+        """
+        now = self._utc_now()
+        rows = []
+        for name, state in list(self.worker_state.items()):
+            alive = state["thread"].is_alive() and not final
+            rows.append((
+                f"{self.host}:{self.pid}:{name}", name, self.host, self.pid,
+                state["status"] if alive else "stopped",
+                state["current_job"], state["job_started_at"], state["jobs_done"],
+                state["started_at"], now,
+            ))
+            if not alive:
+                # Recorded as stopped once; nothing left to report afterwards.
+                self.worker_state.pop(name, None)
+        with self._lock:
+            runs, self._run_buffer = self._run_buffer, []
+        minutes = self.rollups.drain()
+        lookups = self.result_cache.drain()
+        with self._batched(db):
+            if rows:
+                db.upsert_workers(rows)
+            if runs:
+                db.record_runs(runs)
+            if minutes:
+                db.merge_rollups(minutes)
+            if any(lookups.values()):
+                db.record_cache_lookups(**lookups)
         self._update_status_file()
 
+    @staticmethod
+    def _batched(db):
+        """Send a remote worker's heartbeat writes in one round trip (no-op on a local database)."""
+        return db.batch() if isinstance(db, RemoteDatabase) else nullcontext()
+
+    @staticmethod
+    def _utc_now() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    # ----------------------------------------------------------------------
+    # Claiming / Rate Limiting
+    # ----------------------------------------------------------------------
+    def _load_rate_limiter(self) -> RateLimiter:
+        """Build token buckets from the 'rate_limits' config key."""
+        try:
+            return RateLimiter(self.config_mgr.get_value("rate_limits") or {})
+        except (ValueError, KeyError, TypeError) as e:
+            self._console("warning", f"Ignoring invalid rate_limits config: {e}")
+            return RateLimiter()
+
+    def _load_tags(self, tags):
+        """
+        Worker capability tags (--tags, else the 'worker_tags' config key) and
+        the requirement keys they satisfy, computed once for every claim.
+        """
+        if tags is None:
+            tags = self.config_mgr.get_value("worker_tags")
+        try:
+            tags = capabilities.parse_tags(tags)
+            return tags, capabilities.satisfied_keys(tags)
+        except ValueError as e:
+            self._console("warning", f"Ignoring invalid worker tags: {e}")
+            return [], capabilities.satisfied_keys([])
+
+    def _claim_job(self, db: Database):
+        """
+        Claim the next runnable job this worker's tags satisfy, skipping
+        queues/tags that are out of tokens.
+        """
+        return self.rate_limiter.acquire(
+            lambda queues, tags: db.fetch_next_pending_job(exclude_queues=queues, exclude_tags=tags,
+                                                           accepts=self.accepts)
+        )
+
     # ----------------------------------------------------------------------
     # Retry / Failure Handling
     # ----------------------------------------------------------------------
-    def _handle_failure(self, db: Database, job_id: str, attempts: int, max_retries: int):
-        """Handle job retry or mark as dead after exceeding max retries."""
+    def _load_retry_policies(self) -> dict:
+        """
+        Build per-queue retry policies from the 'retry_policies' config key, e.g.
+            {"default": {"kind": "decorrelated_jitter", "max_delay": 300}, "reports": "fixed"}
+        Queues without an entry use "default", else exponential with backoff_base.
+        """
+        policies = {}
+        for queue, spec in (self.config_mgr.get_value("retry_policies") or {}).items():
+            try:
+                policies[queue] = RetryPolicy.from_spec(spec, base=self.backoff_base)
+            except (ValueError, TypeError) as e:
+                self._console("warning", f"Ignoring invalid retry policy for queue '{queue}': {e}")
+        policies.setdefault("default", RetryPolicy(base=self.backoff_base))
+        return policies
+
+    def _retry_policy_for(self, job) -> RetryPolicy:
+        """The job's own policy if it has one, otherwise its queue's."""
+        if job["retry_policy"]:
+            try:
+                return RetryPolicy.from_spec(job["retry_policy"], base=self.backoff_base)
+            except (ValueError, TypeError) as e:
+                self._console("warning", f"{job['id']} has an invalid retry policy ({e}); using queue policy.")
+        return self.retry_policies.get(job["queue"]) or self.retry_policies["default"]
+
+    def _handle_failure(self, db: Database, job, exit_code=None):
+        """
+        Schedule the next attempt or move the job to the DLQ.
+        Everything is decided from the claimed row, so this is a single UPDATE.
+        """
+        job_id = job["id"]
         try:
-            db.increment_attempts(job_id)
-            job = db.get_job(job_id)
-            current_attempts = job["attempts"] if job else (attempts + 1)
+            attempt = job["attempts"] + 1
+            max_retries = job["max_retries"]
+            policy = self._retry_policy_for(job)
 
-            if current_attempts >= max_retries:
-                db.update_job_status(job_id, "dead")
-                self._console("error", f"{job_id} moved to DLQ (max retries exceeded).")
+            if attempt >= max_retries or not policy.should_retry(exit_code):
+                db.fail_job(job_id, exit_code=exit_code)
+                self.rollups.count("dead")
+                reason = "max retries exceeded" if attempt >= max_retries else f"exit code {exit_code} not retryable"
+                self._console("error", f"{job_id} moved to DLQ ({reason}).", job=job_id)
             else:
-                delay = self.backoff_base ** current_attempts
+                delay = policy.next_delay(attempt, job["last_delay"])
                 next_run = datetime.now(timezone.utc) + timedelta(seconds=delay)
-                with db.con:
-                    db.con.execute(
-                        "UPDATE jobs SET status='pending', run_at=?, updated_at=? WHERE id=?",
-                        (
-                            next_run.strftime("%Y-%m-%d %H:%M:%S"),
-                            datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
-                            job_id,
-                        ),
-                    )
-                self._console("info", f"{job_id} will retry in {delay}s (attempt {current_attempts}/{max_retries}).")
+                db.fail_job(job_id, next_run.strftime("%Y-%m-%d %H:%M:%S"), exit_code, delay)
+                self._console("info", f"{job_id} will retry in {delay:g}s (attempt {attempt}/{max_retries}).",
+                              job=job_id)
 
         except Exception as e:
             db.update_job_status(job_id, "dead")
@@ -201,8 +707,13 @@ class WorkerManager:
             result.stderr or "(no errors)",
             f"\nEXIT CODE: {result.returncode}",
             f"DURATION: {duration}s",
-            f"[{datetime.now(timezone.utc).isoformat()}] END JOB\n"
         ]
+        usage = getattr(result, "usage", None) or {}
+        if "cpu_user" in usage:
+            content.append(f"CPU: user {usage['cpu_user']}s, sys {usage['cpu_sys']}s")
+        if "max_rss_kb" in usage:
+            content.append(f"MAX RSS: {usage['max_rss_kb']} KiB")
+        content.append(f"[{datetime.now(timezone.utc).isoformat()}] END JOB\n")
         self._append_to_log(log_path, "\n".join(content))
 
     def _append_to_log(self, log_path: Path, text: str):
@@ -225,18 +736,33 @@ class WorkerManager:
         except Exception:
             pass
 
-    @staticmethod
-    def _update_status_file():
-        """Write JSON file tracking active worker threads."""
+    def _update_status_file(self):
+        """
+        Write the process-level status summary (rate limits, autoscaling).
+        Called only from the heartbeat thread; written atomically via rename.
+        """
         try:
-            active = [t.name for t in threading.enumerate() if t.name.startswith("Worker-")]
+            active = [name for name, state in self.worker_state.items() if state["thread"].is_alive()]
             data = {
                 "active_workers": len(active),
                 "threads": active,
+                "rate_limits": self.rate_limiter.snapshot(),
+                "autoscale": {
+                    "enabled": self.autoscaler.enabled,
+                    "min_workers": self.autoscaler.min_workers,
+                    "max_workers": self.autoscaler.max_workers,
+                    "last_sample": self.last_scale_sample,
+                    "history": list(self.scale_history),
+                },
+                "aging": {"enabled": self.aging.enabled, **self.aging_stats},
+                "logging": self.log.stats(),
+                "phases": tracer.summary() if tracer.enabled else {},
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
-            with open(WorkerManager.STATUS_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            tmp_path = f"{WorkerManager.STATUS_FILE}.{self.pid}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, WorkerManager.STATUS_FILE)
         except Exception:
             pass
 
@@ -255,16 +781,17 @@ class WorkerManager:
             pass
 
     # ----------------------------------------------------------------------
-    # Console Output Formatting
+    # Console Logging
     # ----------------------------------------------------------------------
-    @staticmethod
-    def _console(level: str, message: str):
-        """Print structured messages with level-based prefixes."""
-        ts = datetime.now().strftime("%H:%M:%S")
-        prefixes = {
-            "info": "[INFO]",
-            "success": "[ OK ]",
-            "warning": "[WARN]",
-            "error": "[FAIL]"
-        }
-        print(f"{ts} {prefixes.get(level, '[LOG]')} {message}")
+    def _load_log(self) -> WorkerLog:
+        """Build the console log pipeline from the 'logging' config key."""
+        try:
+            return WorkerLog(self.config_mgr.get_value("logging"))
+        except (ValueError, TypeError) as e:
+            log = WorkerLog()
+            log.emit("warning", f"Ignoring invalid logging config: {e}")
+            return log
+
+    def _console(self, level: str, message: str, **fields):
+        """Queue a console message; the log writer thread prints it (see core.worker_log)."""
+        self.log.emit(level, message, **fields)
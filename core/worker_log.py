@@ -0,0 +1,183 @@
+import json
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import typer
+
+LEVELS = {"debug": 10, "info": 20, "success": 25, "warning": 30, "error": 40}
+PREFIXES = {"debug": "[DBG ]", "info": "[INFO]", "success": "[ OK ]", "warning": "[WARN]", "error": "[FAIL]"}
+FORMATS = ("text", "json")
+_STOP = object()
+
+
+class WorkerLog:
+    """
+    Asynchronous console log for worker processes, configured by the
+    "logging" config key, e.g.
+        {"level": "info", "format": "json", "queue_size": 10000, "success_per_second": 50}
+
+    Worker threads only enqueue a tuple; formatting happens in one
+    background writer that drains the queue and writes whole batches at once,
+    so stdout and terminal rendering never stall job processing. The queue
+    is bounded: when the writer falls behind, records are dropped and
+    counted instead of blocking workers. "success" records above
+    `success_per_second` (0 = unlimited) are suppressed; the writer reports
+    how many at most once per second (and at close) as an "info" record.
+    Text output keeps the classic "HH:MM:SS [INFO] ..." lines;
+    "json" writes one object per line with the record's fields.
+    """
+
+    DEFAULTS = {"level": "info", "format": "text", "queue_size": 10000, "success_per_second": 50}
+    BATCH = 500
+    SUMMARY_INTERVAL = 1.0
+
+    def __init__(self, settings: dict = None, stream=None):
+        opts = {**self.DEFAULTS, **(settings or {})}
+        if opts["level"] not in LEVELS:
+            raise ValueError(f"level must be one of {', '.join(LEVELS)}")
+        if opts["format"] not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.level = opts["level"]
+        self.format = opts["format"]
+        self.success_limit = int(opts["success_per_second"])
+        queue_size = int(opts["queue_size"])
+        if queue_size <= 0 or self.success_limit < 0:
+            raise ValueError("queue_size must be positive and success_per_second not negative")
+        self.stream = stream
+        self.written = self.dropped = self.suppressed = 0
+        self._threshold = LEVELS[self.level]
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._window = None
+        self._window_count = self._pending_suppressed = 0
+        self._summarized_at = time.monotonic()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Producers (any thread)
+    # ------------------------------------------------------------------
+    def emit(self, level: str, message: str, **fields):
+        """Queue one record; never blocks."""
+        if LEVELS.get(level, 20) < self._threshold:
+            return
+        if level == "success" and self.success_limit and not self._sample():
+            return
+        self._put((time.time(), level, threading.current_thread().name, message, fields))
+
+    def output(self, job_id: str, text: str):
+        """Queue a job's captured stdout, shown as a framed block (or an 'output' record in JSON)."""
+        if LEVELS["info"] >= self._threshold:
+            self._put((time.time(), "output", threading.current_thread().name, text, {"job": job_id}))
+
+    def _sample(self) -> bool:
+        """Admit at most `success_limit` success records per wall-clock second."""
+        second = int(time.time())
+        with self._lock:
+            if second != self._window:
+                self._window, self._window_count = second, 0
+            admitted = self._window_count < self.success_limit
+            if admitted:
+                self._window_count += 1
+            else:
+                self._pending_suppressed += 1
+                self.suppressed += 1
+        return admitted
+
+    def _put(self, record):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="LogWriter", daemon=True)
+                self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _writer(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.SUMMARY_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < self.BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in batch
+            records = [r for r in batch if r is not _STOP]
+            summary = self._suppression_summary(force=stop)
+            if summary:
+                records.append(summary)
+            if stop and self.dropped:
+                records.append((time.time(), "warning", "LogWriter",
+                                f"{self.dropped} log record(s) dropped (queue full)", {"dropped": self.dropped}))
+            if records:
+                try:
+                    typer.echo("".join(self._format(r) for r in records), file=self.stream or sys.stdout, nl=False)
+                except Exception:
+                    pass
+                self.written += len(records)
+            if stop:
+                return
+
+    def _suppression_summary(self, force: bool = False):
+        """An "info" record counting successes suppressed since the last one, due once per interval."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending_suppressed or (not force and now - self._summarized_at < self.SUMMARY_INTERVAL):
+                return None
+            count, self._pending_suppressed = self._pending_suppressed, 0
+            self._summarized_at = now
+        if LEVELS["info"] < self._threshold:
+            return None
+        return (time.time(), "info", "LogWriter",
+                f"{count} success message(s) suppressed (over {self.success_limit}/s)", {"suppressed": count})
+
+    def _format(self, record) -> str:
+        ts, level, thread, message, fields = record
+        if self.format == "json":
+            at = datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds")
+            return json.dumps({"ts": at, "level": level, "thread": thread, "msg": message, **fields},
+                              default=str) + "\n"
+        if level == "output":
+            border = typer.style("─" * 65, fg=typer.colors.BRIGHT_BLACK)
+            header = typer.style(f"[ Job Output | ID: {fields['job']} ]", fg=typer.colors.CYAN, bold=True)
+            body = typer.style(message.strip(), fg=typer.colors.GREEN, bold=True)
+            return f"\n{border}\n{header}\n{border}\n{body}\n{border}\n\n"
+        return f"{datetime.fromtimestamp(ts).strftime('%H:%M:%S')} {PREFIXES.get(level, '[LOG]')} {message}\n"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self, timeout: float = 5.0):
+        """Write everything queued so far and stop the writer."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "level": self.level,
+            "format": self.format,
+            "written": self.written,
+            "dropped": self.dropped,
+            "suppressed": self.suppressed,
+            "queued": self._queue.qsize(),
+        }
@@ -5,10 +5,15 @@ import subprocess
 # Import each command directly
 from cli.enqueue import enqueue
 from cli.list_jobs import list_jobs
+from cli.search import search
+from cli.events import events
+from cli.schedules import schedule_add, schedule_list, schedule_pause, schedule_resume, schedule_remove
 from cli.worker import start as worker_start, stop as worker_stop
-from cli.dlq import list_dlq, retry_job, purge_dlq
+from cli.lease_server import lease_server
+from cli.dlq import list_dlq, retry_job, purge_dlq, export_dlq
 from cli.config_cli import set as config_set, get as config_get, show as config_show, reset as config_reset
 from cli.status_cli import status
+from cli.backup import snapshot, export_jobs, import_jobs
 
 app = typer.Typer(
     help="QueueCTL - Background Job Queue System",
@@ -26,14 +31,31 @@ app.command("enqueue")(enqueue)
 # --- List Jobs ---
 app.command("list")(list_jobs)
 
+# --- Search Jobs ---
+app.command("search")(search)
+
+# --- Event Stream ---
+app.command("events")(events)
+
+# --- Recurring Schedules ---
+app.command("schedule-add")(schedule_add)
+app.command("schedule-list")(schedule_list)
+app.command("schedule-pause")(schedule_pause)
+app.command("schedule-resume")(schedule_resume)
+app.command("schedule-remove")(schedule_remove)
+
 # --- Worker Management ---
 app.command("worker-start")(worker_start)
 app.command("worker-stop")(worker_stop)
 
+# --- Remote Workers ---
+app.command("lease-server")(lease_server)
+
 # --- Dead Letter Queue ---
 app.command("dlq-list")(list_dlq)
 app.command("dlq-retry")(retry_job)
 app.command("dlq-purge")(purge_dlq)
+app.command("dlq-export")(export_dlq)
 
 # --- Configuration Management ---
 app.command("config-set")(config_set)
@@ -44,6 +66,11 @@ app.command("config-reset")(config_reset)
 # --- System Status ---
 app.command("status")(status)
 
+# --- Backup and Migration ---
+app.command("snapshot")(snapshot)
+app.command("export")(export_jobs)
+app.command("import")(import_jobs)
+
 
 # --- Dashboard Launch ---
 @app.command("dashboard")
@@ -61,7 +61,8 @@ info "Retrying DLQ job ID: $job_id"
 # 5. Retry job from DLQ and verify it’s pending again
 # ------------------------------------------------------------
 queuectl dlq-retry "$job_id" >/dev/null || fail "DLQ retry command failed"
-if queuectl list --status pending | grep -q "$job_id"; then
+pending_out=$(queuectl list --status pending)
+if echo "$pending_out" | grep -q "$job_id"; then
     pass "DLQ retry successfully moved job to pending"
 else
     fail "DLQ retry did not move job to pending"
@@ -41,7 +41,8 @@ fi
 # ------------------------------------------------------------
 # 5. Cross-check persistence via queuectl status
 # ------------------------------------------------------------
-if queuectl status | grep -Eiq "Completed|completed"; then
+status_out=$(queuectl status)
+if echo "$status_out" | grep -Eiq "Completed|completed"; then
     pass "Queue status reflects completed job (persistent state verified)"
 else
     echo "--------------------------------------------------"
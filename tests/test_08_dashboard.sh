@@ -15,7 +15,8 @@ sleep 4  # give Flask enough time to start
 # ------------------------------------------------------------
 # Health check
 # ------------------------------------------------------------
-if curl -fs http://127.0.0.1:5000 | grep -q "QueueCTL Dashboard"; then
+page=$(curl -fs http://127.0.0.1:5000 || true)
+if echo "$page" | grep -q "QueueCTL Dashboard"; then
     pass "Dashboard started successfully and rendered expected HTML"
 else
     echo "--------------------------------------------------"
@@ -0,0 +1,52 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Per-Queue Rate Limiting at Claim Time"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Enqueue rate-limited and unrestricted jobs
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "slow-1", "command": "echo slow 1", "queue": "slow", "priority": 9}' >/dev/null
+queuectl enqueue '{"id": "slow-2", "command": "echo slow 2", "queue": "slow", "priority": 9}' >/dev/null
+queuectl enqueue '{"id": "fast-1", "command": "echo fast", "priority": 1}' >/dev/null
+pass "Enqueued jobs across two queues"
+
+# ------------------------------------------------------------
+# 2. Claim with a 1-token bucket on the 'slow' queue
+# ------------------------------------------------------------
+claimed=$(python - <<'PYCODE'
+from core.storage import Database
+from core.rate_limit import RateLimiter
+
+db = Database()
+limiter = RateLimiter({"queue:slow": {"rate": 0.001, "burst": 1}})
+claim = lambda queues, tags: db.fetch_next_pending_job(exclude_queues=queues, exclude_tags=tags)
+order = []
+for _ in range(3):
+    job = limiter.acquire(claim)
+    order.append(job["id"] if job else "none")
+print(",".join(order), limiter.snapshot()["queue:slow"]["tokens"] < 1)
+PYCODE
+)
+
+if [[ "$claimed" == "slow-1,fast-1,none True" ]]; then
+    pass "Exhausted queue skipped; other queues still claimed"
+else
+    fail "Unexpected claim order under rate limit: $claimed"
+fi
+
+python - <<'PYCODE' || fail "Rate limiter held its lock across the claim"
+from core.rate_limit import RateLimiter
+
+limiter = RateLimiter({"queue:slow": {"rate": 0.001, "burst": 1}})
+def claim(queues, tags):
+    assert not limiter.lock.locked(), "claim ran under the bucket lock"
+    return {"id": "x", "queue": "slow", "tag": None}
+assert limiter.acquire(claim)["id"] == "x"
+assert limiter.snapshot()["queue:slow"]["tokens"] < 1
+PYCODE
+pass "Bucket lock covers the token decision, not the claim query"
+
+pass "Rate limiting test completed successfully"
@@ -0,0 +1,80 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Enqueue Deduplication (dedup_key / id reuse)"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Duplicate enqueues collapse into one job (coalesce)
+# ------------------------------------------------------------
+queuectl enqueue '{"command": "echo report", "dedup_key": "report-2025-01-01"}' >/dev/null
+output=$(queuectl enqueue '{"command": "echo report", "dedup_key": "report-2025-01-01"}')
+echo "$output" | grep -qi "Duplicate job ignored" || fail "Duplicate enqueue was not coalesced"
+pass "Duplicate dedup_key coalesced into existing job"
+
+queuectl enqueue '{"id": "fixed-id", "command": "echo once"}' >/dev/null
+queuectl enqueue '{"id": "fixed-id", "command": "echo once"}' >/dev/null || fail "Reused id should be a no-op"
+pass "Reused job id is an idempotent no-op"
+
+# ------------------------------------------------------------
+# 2. Reject and replace modes
+# ------------------------------------------------------------
+output=$(queuectl enqueue '{"command": "echo report", "dedup_key": "report-2025-01-01", "dedup_mode": "reject"}' 2>&1 || true)
+echo "$output" | grep -qi "rejected" || fail "Reject mode did not reject duplicate"
+pass "Reject mode refuses duplicates"
+
+queuectl enqueue '{"command": "echo report v2", "dedup_key": "report-2025-01-01", "dedup_mode": "replace"}' >/dev/null
+
+# ------------------------------------------------------------
+# 3. Verify database state
+# ------------------------------------------------------------
+state=$(python - <<'PYCODE'
+import sqlite3
+con = sqlite3.connect("store.db")
+rows = con.execute("SELECT command FROM jobs WHERE dedup_key = 'report-2025-01-01'").fetchall()
+print(len(rows), rows[0][0] if rows else "")
+total = con.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+print(total)
+PYCODE
+)
+expected=$'1 echo report v2\n2'
+if [[ "$state" == "$expected" ]]; then
+    pass "Replace mode updated the single pending job in place"
+else
+    fail "Unexpected job table state: $state"
+fi
+
+# ------------------------------------------------------------
+# 4. TTL window covers finished jobs
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "TTL dedup window check failed"
+from core.storage import Database
+db = Database()
+db.update_job_status("fixed-id", "completed")
+db.con.execute("UPDATE jobs SET dedup_key = 'once' WHERE id = 'fixed-id'")
+db.con.commit()
+_, outcome = db.add_job("other", "echo once", 3, dedup_key="once", dedup_ttl=3600)
+assert outcome == "coalesced", outcome
+_, outcome = db.add_job("other", "echo once", 3, dedup_key="once", dedup_ttl=0)
+assert outcome == "created", outcome
+
+# Without a TTL, a job finished in the same second does not block a new one.
+db.add_job("fresh-1", "echo fresh", 3, dedup_key="fresh")
+db.update_job_status("fresh-1", "completed")
+_, outcome = db.add_job("fresh-2", "echo fresh", 3, dedup_key="fresh", dedup_ttl=0)
+assert outcome == "created", outcome
+PYCODE
+pass "Completed jobs deduplicate only inside the TTL window"
+
+queuectl enqueue '{"id": "ttl-1", "command": "echo ttl", "dedup_key": "ttl", "dedup_ttl": "1h"}' >/dev/null \
+    || fail "Duration dedup_ttl rejected"
+python -c "from core.storage import Database; Database().update_job_status('ttl-1', 'completed')"
+output=$(queuectl enqueue '{"id": "ttl-2", "command": "echo ttl", "dedup_key": "ttl", "dedup_ttl": "1h"}')
+echo "$output" | grep -qi "Duplicate job ignored" || fail "dedup_ttl '1h' did not cover the finished job"
+output=$(queuectl enqueue '{"command": "echo ttl", "dedup_key": "ttl", "dedup_ttl": "soon"}' 2>&1) \
+    && fail "Invalid dedup_ttl accepted"
+echo "$output" | grep -q "Error: Invalid 'dedup_ttl'" || fail "Invalid dedup_ttl not reported cleanly: $output"
+pass "dedup_ttl accepts durations and reports invalid ones"
+
+pass "Deduplication test completed successfully"
@@ -0,0 +1,88 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Job Dependencies (DAG readiness and failure propagation)"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Build a small DAG: A -> B, (A, B) -> C
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "A", "command": "echo A"}' >/dev/null
+queuectl enqueue '{"id": "B", "command": "echo B", "depends_on": "A", "priority": 9}' >/dev/null
+queuectl enqueue '{"id": "C", "command": "echo C", "depends_on": ["A", "B"], "priority": 9}' >/dev/null
+output=$(queuectl enqueue '{"id": "X", "command": "echo X", "depends_on": ["missing"]}' 2>&1 || true)
+echo "$output" | grep -qi "Unknown dependency" || fail "Unknown dependency was accepted"
+pass "DAG enqueued; unknown parents rejected"
+
+# ------------------------------------------------------------
+# 2. Claim order follows dependencies, not priority
+# ------------------------------------------------------------
+order=$(python - <<'PYCODE'
+from core.storage import Database
+db = Database()
+order = []
+while True:
+    job = db.fetch_next_pending_job()
+    if not job:
+        break
+    order.append(job["id"])
+    db.update_job_status(job["id"], "completed")
+print(",".join(order))
+PYCODE
+)
+[[ "$order" == "A,B,C" ]] || fail "Unexpected execution order: $order"
+pass "Children become claimable only after parents complete"
+
+# ------------------------------------------------------------
+# 3. Dead parents propagate to all descendants
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "P", "command": "false"}' >/dev/null
+queuectl enqueue '{"id": "Q", "command": "echo Q", "depends_on": "P"}' >/dev/null
+queuectl enqueue '{"id": "R", "command": "echo R", "depends_on": "Q"}' >/dev/null
+python -c "from core.storage import Database; Database().update_job_status('P', 'dead')"
+queuectl enqueue '{"id": "S", "command": "echo S", "depends_on": "P"}' >/dev/null
+
+dead=$(queuectl list --status dead | grep -cE "^(P|Q|R|S) " || true)
+[[ "$dead" -eq 4 ]] || fail "Failure did not propagate to descendants (dead=$dead)"
+pass "Failure propagated to descendants"
+
+# ------------------------------------------------------------
+# 4. Retrying a dead parent re-arms the jobs it took down
+# ------------------------------------------------------------
+output=$(queuectl dlq-retry Q 2>&1) && fail "Job behind a dead parent was retried"
+echo "$output" | grep -q "depends on dead job(s) P" || fail "Dead-parent skip not explained: $output"
+queuectl dlq-retry P >/dev/null || fail "DLQ retry of P failed"
+order=$(python - <<'PYCODE'
+from core.storage import Database
+db = Database()
+rows = db.con.execute("SELECT id, status, deps_remaining FROM jobs WHERE id IN ('P', 'Q', 'R', 'S') ORDER BY id")
+assert [tuple(r) for r in rows] == [("P", "pending", 0), ("Q", "pending", 1), ("R", "pending", 1), ("S", "pending", 1)]
+order = []
+while True:
+    job = db.fetch_next_pending_job()
+    if not job:
+        break
+    order.append(job["id"])
+    db.update_job_status(job["id"], "completed")
+print(",".join(order))
+PYCODE
+) || fail "Dependents of a retried parent were not re-armed"
+[[ "$order" == "P,Q,R,S" || "$order" == "P,Q,S,R" || "$order" == "P,S,Q,R" ]] \
+    || fail "Unexpected order after DLQ retry: $order"
+
+# A dependent retried on its own once its parent completed is not stuck waiting on it.
+queuectl enqueue '{"id": "T", "command": "echo T"}' >/dev/null
+queuectl enqueue '{"id": "U", "command": "echo U", "depends_on": "T"}' >/dev/null
+python - <<'PYCODE' || fail "Retried dependent kept a stale dependency count"
+from core.storage import Database
+db = Database()
+db.update_job_status("T", "dead")
+db.con.execute("UPDATE jobs SET status = 'completed' WHERE id = 'T'")  # e.g. finished by hand
+db.con.commit()
+assert list(db.bulk_dead_jobs("retry", job_id="U")) == [1]
+assert db.fetch_next_pending_job()["id"] == "U"
+PYCODE
+pass "DLQ retry recounts dependencies and re-arms propagated descendants"
+
+pass "Dependency test completed successfully"
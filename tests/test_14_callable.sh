@@ -0,0 +1,82 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Python Callable Jobs on Warm Executors"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Executor reuse, recycling and timeouts
+# ------------------------------------------------------------
+# Executors start from a forkserver, which imports the main module by path,
+# so the checks run from a guarded script file rather than stdin.
+cat > executor_check.py <<'PYCODE'
+import subprocess
+import threading
+from core.executor import WarmExecutorPool
+
+
+def check():
+    pool = WarmExecutorPool(size=1, max_tasks=2)
+    # Executors are never forked from the (multithreaded) worker process itself.
+    assert pool.ctx.get_start_method() in ("forkserver", "spawn"), pool.ctx.get_start_method()
+    pids = [pool.run("os:getpid").stdout for _ in range(3)]
+    assert pids[0] == pids[1] != pids[2], pids          # reused, then recycled after 2 tasks
+
+    assert pool.run("math:factorial", [5]).stdout == "120"
+    failed = pool.run("math:sqrt", [-1])
+    assert failed.returncode == 1 and "ValueError" in failed.stderr
+
+    try:
+        pool.run("time:sleep", [5], timeout=0.5)
+        raise AssertionError("timeout not enforced")
+    except subprocess.TimeoutExpired:
+        pass
+    assert pool.run("math:factorial", [3]).stdout == "6"  # replacement executor works
+    pool.shutdown()
+
+    # Recycled executors are replaced; executors started while all were busy are not kept.
+    pool = WarmExecutorPool(size=2, max_tasks=1)
+    pool.warm()
+    assert pool.idle.qsize() == 2
+    pool.run("os:getpid")
+    assert pool.idle.qsize() == 2, "recycled executor not replaced"
+    threads = [threading.Thread(target=pool.run, args=("time:sleep", [0.5])) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pool.idle.qsize() == 2, pool.idle.qsize()
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    check()
+PYCODE
+python executor_check.py || fail "Warm executor pool checks failed"
+rm -f executor_check.py
+pass "Executors are reused, recycled, replaced and killed on timeout"
+
+# ------------------------------------------------------------
+# 2. End-to-end callable job through a worker
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "py-job", "callable": "math:factorial", "args": [6]}' >/dev/null || fail "Failed to enqueue callable job"
+
+stdbuf -oL -eL queuectl worker-start --count 1 > callable.log 2>&1 &
+PID=$!
+sleep 4
+queuectl worker-stop >/dev/null 2>&1
+sleep 1
+
+if grep -q "Job py-job completed successfully" callable.log && grep -q "720" logs/py-job.log; then
+    pass "Callable job executed by worker"
+else
+    tail -n 25 callable.log || true
+    fail "Callable job was not executed"
+fi
+
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+pass "Callable job test completed successfully"
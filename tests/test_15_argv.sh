@@ -0,0 +1,59 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Direct argv Execution (no shell)"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Enqueue an argv job with shell metacharacters, env and cwd
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "argv-job", "argv": ["python", "-c", "import os, sys; print(os.environ[\"GREETING\"], sys.argv[1], os.getcwd())", "$HOME; echo injected"], "env": {"GREETING": "hello"}, "cwd": "/tmp"}' >/dev/null \
+    || fail "Failed to enqueue argv job"
+output=$(queuectl enqueue '{"argv": "echo not-a-list"}' 2>&1 || true)
+echo "$output" | grep -qi "must be a list" || fail "Invalid argv accepted"
+pass "argv job enqueued; invalid argv rejected"
+
+# ------------------------------------------------------------
+# 2. Run it through a worker
+# ------------------------------------------------------------
+stdbuf -oL -eL queuectl worker-start --count 1 > argv.log 2>&1 &
+PID=$!
+sleep 4
+queuectl worker-stop >/dev/null 2>&1
+sleep 1
+
+if grep -q 'hello $HOME; echo injected /tmp' argv.log && ! grep -q "^injected" argv.log; then
+    pass "Arguments passed verbatim with per-job env and cwd"
+else
+    tail -n 25 argv.log || true
+    fail "argv job output not as expected"
+fi
+grep -q "Job argv-job completed successfully" argv.log || fail "argv job did not complete"
+
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+# ------------------------------------------------------------
+# 3. A missing program is found once it is installed
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Executable lookup cached a miss"
+import os, tempfile
+from core.spawn import resolve_executable
+bindir = tempfile.mkdtemp()
+env = {"PATH": bindir}
+try:
+    resolve_executable(["queuectl-late-tool"], env)
+    raise AssertionError("missing program resolved")
+except FileNotFoundError:
+    pass
+tool = os.path.join(bindir, "queuectl-late-tool")
+with open(tool, "w") as f:
+    f.write("#!/bin/sh\n")
+os.chmod(tool, 0o755)
+assert resolve_executable(["queuectl-late-tool"], env) == tool
+PYCODE
+pass "Executable lookups cache hits only"
+
+pass "argv execution test completed successfully"
@@ -0,0 +1,55 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Worker Pool Autoscaling"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Decision logic: hysteresis, cooldowns and load guard
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Autoscaler decision checks failed"
+from core.autoscaler import Autoscaler
+
+a = Autoscaler(1, 4, {"up_streak": 2, "down_streak": 2, "up_cooldown": 10, "down_cooldown": 30})
+assert a.decide(1, depth=20, oldest_age=0, idle=0, now=0).action == "hold"      # first sample only
+d = a.decide(1, depth=20, oldest_age=0, idle=0, now=1)
+assert (d.action, d.target) == ("up", 4), d.to_dict()                            # capped at max
+assert a.decide(4, depth=0, oldest_age=0, idle=4, now=2).action == "hold"
+assert a.decide(4, depth=0, oldest_age=0, idle=4, now=3).reason == "scale-down cooldown"
+assert a.decide(4, depth=0, oldest_age=0, idle=4, now=40).target == 3
+
+b = Autoscaler(1, 4, {"up_streak": 1})
+assert "host load" in b.decide(1, depth=50, oldest_age=0, idle=0, load=5.0, now=0).reason
+assert b.decide(2, depth=50, oldest_age=0, idle=0, load=0.1, now=100).action == "up"
+PYCODE
+pass "Autoscaler honours streaks, cooldowns and host load"
+
+# ------------------------------------------------------------
+# 2. Pool grows under backlog
+# ------------------------------------------------------------
+queuectl config-set autoscale '{"interval": 1, "up_streak": 1, "up_cooldown": 0, "max_load": 1000}' >/dev/null
+for i in {1..8}; do
+  queuectl enqueue "{\"command\": \"sleep 1\"}" >/dev/null
+done
+
+stdbuf -oL -eL queuectl worker-start --count 1 --min 1 --max 3 > autoscale.log 2>&1 &
+PID=$!
+sleep 4
+status_out=$(queuectl status)
+queuectl worker-stop >/dev/null 2>&1
+sleep 1
+
+if grep -q "Autoscale up: 1 -> 3" autoscale.log && echo "$status_out" | grep -q "Autoscaling    : 1-3"; then
+    pass "Pool scaled up and decision exposed in status"
+else
+    tail -n 25 autoscale.log || true
+    echo "$status_out"
+    fail "Autoscaler did not grow the pool"
+fi
+
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+pass "Autoscaling test completed successfully"
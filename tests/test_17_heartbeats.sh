@@ -0,0 +1,47 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Worker Heartbeat Table"
+clean_env
+
+queuectl config-set heartbeat_interval 1 >/dev/null
+queuectl enqueue '{"id": "hb-job", "command": "sleep 3"}' >/dev/null
+
+stdbuf -oL -eL queuectl worker-start --count 2 > heartbeat.log 2>&1 &
+PID=$!
+sleep 2
+
+# ------------------------------------------------------------
+# 1. Live workers and their current job are visible in status
+# ------------------------------------------------------------
+status_out=$(queuectl status)
+if echo "$status_out" | grep -q "Active Workers : 2" && echo "$status_out" | grep -q "job=hb-job"; then
+    pass "Status reports live workers and the running job"
+else
+    echo "$status_out"
+    fail "Heartbeat rows missing from status"
+fi
+
+# ------------------------------------------------------------
+# 2. A single writer updates the table (heartbeats advance)
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Heartbeats did not advance"
+import time
+from core.storage import Database
+db = Database()
+before = {w["id"]: w["last_heartbeat"] for w in db.list_workers()}
+time.sleep(2.2)
+after = {w["id"]: w["last_heartbeat"] for w in db.list_workers()}
+assert len(after) == 2 and all(after[k] > before[k] for k in before), (before, after)
+PYCODE
+pass "Heartbeats refreshed periodically"
+
+queuectl worker-stop >/dev/null 2>&1
+sleep 2
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+grep -q "Job hb-job completed successfully" heartbeat.log || fail "Job did not complete"
+pass "Worker heartbeat test completed successfully"
@@ -0,0 +1,51 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Process-Group Supervision and Resource Accounting"
+clean_env
+
+queuectl config-set job_timeout 2 >/dev/null
+queuectl config-set kill_grace 1 >/dev/null
+queuectl config-set heartbeat_interval 1 >/dev/null
+queuectl enqueue '{"id": "pg-orphan", "command": "sleep 4173 & sleep 4173", "max_retries": 1}' >/dev/null
+queuectl enqueue '{"id": "pg-cpu", "command": "python3 -c \"sum(range(3000000))\""}' >/dev/null
+
+stdbuf -oL -eL queuectl worker-start --count 2 > process_groups.log 2>&1 &
+PID=$!
+sleep 6
+
+queuectl worker-stop >/dev/null 2>&1
+sleep 2
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+# ------------------------------------------------------------
+# 1. Timeout kills the whole group, including background children
+# ------------------------------------------------------------
+grep -q "pg-orphan timed out" process_groups.log || fail "Job did not time out"
+procs=$(ps -eo args)
+if echo "$procs" | grep -q "^sleep 4173"; then
+    fail "Grandchild process survived the timeout"
+fi
+pass "Timed-out job's process group was killed"
+
+# ------------------------------------------------------------
+# 2. Per-run usage is recorded and aggregated by command
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Resource usage not recorded"
+from core.storage import Database
+db = Database()
+cpu = db.list_job_runs("pg-cpu")
+assert len(cpu) == 1 and cpu[0]["outcome"] == "completed", [dict(r) for r in cpu]
+assert cpu[0]["cpu_user"] > 0 and cpu[0]["max_rss_kb"] > 0 and cpu[0]["wall_time"] > 0, dict(cpu[0])
+orphan = db.list_job_runs("pg-orphan")
+assert orphan and orphan[0]["outcome"] == "timeout", [dict(r) for r in orphan]
+PYCODE
+pass "CPU, max RSS and wall time recorded per run"
+
+status_out=$(queuectl status)
+echo "$status_out" | grep -q "Top Commands by CPU" || { echo "$status_out"; fail "Status missing resource aggregates"; }
+grep -q "MAX RSS:" logs/pg-cpu.log || fail "Job log missing resource usage"
+pass "Process-group supervision test completed successfully"
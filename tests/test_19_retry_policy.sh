@@ -0,0 +1,62 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Retry Policies"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Delay computation, caps and exit-code filters
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Retry policy calculations incorrect"
+from core.retry_policy import RetryPolicy
+exp = RetryPolicy.from_spec({"kind": "exponential", "max_delay": 60}, base=2)
+assert [exp.next_delay(n) for n in (1, 2, 3)] == [2, 4, 8]
+assert exp.next_delay(50) == 60 and exp.next_delay(5000) == 60
+assert RetryPolicy.from_spec({"kind": "linear", "delay": 5}).next_delay(3) == 15
+assert RetryPolicy.from_spec("fixed").next_delay(9) == 1
+jitter = RetryPolicy.from_spec({"kind": "decorrelated_jitter", "delay": 1, "max_delay": 20})
+delays = [jitter.next_delay(3, last_delay=10) for _ in range(200)]
+assert all(1 <= d <= 20 for d in delays) and len(set(delays)) > 50
+filt = RetryPolicy.from_spec({"kind": "fixed", "retry_on": [1, 75], "no_retry_on": [75]})
+assert filt.should_retry(1) and not filt.should_retry(2) and not filt.should_retry(75) and filt.should_retry(None)
+for bad in ({"kind": "cubic"}, {"kind": "fixed", "jitter": 2}, {"kind": "fixed", "bogus": 1}):
+    try:
+        RetryPolicy.from_spec(bad)
+        raise SystemExit(f"accepted invalid policy {bad}")
+    except ValueError:
+        pass
+PYCODE
+pass "Policies compute capped, jittered delays and honour exit-code filters"
+
+# ------------------------------------------------------------
+# 2. Per-job and per-queue policies drive the worker
+# ------------------------------------------------------------
+if queuectl enqueue '{"command": "true", "retry_policy": {"kind": "cubic"}}' >/dev/null 2>&1; then
+    fail "Invalid retry policy accepted"
+fi
+
+queuectl config-set retry_policies '{"flaky": {"kind": "fixed", "delay": 1}}' >/dev/null
+queuectl enqueue '{"id": "rp-fatal", "command": "exit 3", "max_retries": 5, "retry_policy": {"kind": "fixed", "no_retry_on": [3]}}' >/dev/null
+queuectl enqueue '{"id": "rp-flaky", "command": "exit 1", "max_retries": 3, "queue": "flaky"}' >/dev/null
+
+stdbuf -oL -eL queuectl worker-start --count 2 > retry_policy.log 2>&1 &
+PID=$!
+sleep 6
+queuectl worker-stop >/dev/null 2>&1
+sleep 1
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+grep -q "rp-fatal moved to DLQ (exit code 3 not retryable)" retry_policy.log || fail "Non-retryable exit code was retried"
+[ "$(grep -c "rp-flaky will retry in 1s" retry_policy.log)" -eq 2 ] || fail "Queue retry policy not applied"
+
+python - <<'PYCODE' || fail "Failure bookkeeping incorrect"
+from core.storage import Database
+db = Database()
+fatal, flaky = db.get_job("rp-fatal"), db.get_job("rp-flaky")
+assert fatal["status"] == "dead" and fatal["attempts"] == 1 and fatal["last_exit_code"] == 3, dict(fatal)
+assert flaky["status"] == "dead" and flaky["attempts"] == 3 and flaky["last_delay"] == 1, dict(flaky)
+PYCODE
+pass "Retry policy test completed successfully"
@@ -0,0 +1,85 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Bulk DLQ Operations"
+clean_env
+
+python - <<'PYCODE' || fail "Could not seed DLQ"
+from core.storage import Database
+db = Database()
+for i in range(1200):
+    db.add_job(f"api-{i}", f"curl -f https://api/{i}", 3)
+    db.fail_job(f"api-{i}", exit_code=22)
+for i in range(30):
+    db.add_job(f"etl-{i}", f"python etl.py {i}", 3)
+    db.fail_job(f"etl-{i}", exit_code=1)
+with db.con:
+    db.con.execute("UPDATE jobs SET updated_at = '2000-01-01 00:00:00' WHERE id LIKE 'etl-%';")
+PYCODE
+
+# ------------------------------------------------------------
+# 1. Export streams every dead job as JSON lines
+# ------------------------------------------------------------
+queuectl dlq-export dlq.jsonl --chunk-size 100 >/dev/null || fail "dlq-export failed"
+[ "$(wc -l < dlq.jsonl)" -eq 1230 ] || fail "dlq-export wrote the wrong number of lines"
+python -c "import json; [json.loads(l) for l in open('dlq.jsonl')]" || fail "dlq-export wrote invalid JSON"
+rm -f dlq.jsonl
+pass "DLQ exported to JSONL"
+
+# ------------------------------------------------------------
+# 2. Bulk retry needs a target and honours filters, in chunks
+# ------------------------------------------------------------
+if queuectl dlq-retry >/dev/null 2>&1; then
+    fail "dlq-retry without id or --all should fail"
+fi
+output=$(queuectl dlq-retry --command 'curl *' --exit-code 22 --chunk-size 500 --pause 0)
+echo "$output" | grep -q "500/1200" || fail "No chunked progress reported"
+echo "$output" | grep -q "Retried 1200 DLQ job(s)." || fail "Filtered bulk retry incomplete"
+
+python - <<'PYCODE' || fail "Bulk retry touched the wrong jobs"
+from core.storage import Database
+db = Database()
+assert db.count_dead_jobs() == 30
+summary = db.get_job_summary()
+assert summary["pending"] == 1200, summary
+PYCODE
+pass "Filtered bulk retry processed in chunks"
+
+# ------------------------------------------------------------
+# 3. Purge by age
+# ------------------------------------------------------------
+if queuectl dlq-purge --older-than 7d >/dev/null 2>&1; then
+    fail "dlq-purge ran without --confirm"
+fi
+output=$(queuectl dlq-purge --confirm --older-than 1d --chunk-size 7 --pause 0)
+echo "$output" | grep -q "Purged 30 DLQ job(s)." || fail "Age-filtered purge failed"
+[ "$(python -c 'from core.storage import Database; print(Database().count_dead_jobs())')" -eq 0 ] \
+    || fail "Dead jobs remain after purge"
+pass "Bulk DLQ operations test completed successfully"
+
+# ------------------------------------------------------------
+# 4. Retry leaves jobs whose dedup key is already active in the DLQ
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Could not seed dedup DLQ jobs"
+from core.storage import Database
+db = Database()
+for job_id in ("dd-1", "dd-2", "dd-3"):
+    db.add_job(job_id, f"echo {job_id}", 1)
+    db.fail_job(job_id, exit_code=1)
+db.add_job("dd-live", "echo live", 1)
+with db.con:
+    db.con.execute("UPDATE jobs SET dedup_key = 'report' WHERE id IN ('dd-1', 'dd-2');")
+    db.con.execute("UPDATE jobs SET dedup_key = 'sync' WHERE id IN ('dd-3', 'dd-live');")
+PYCODE
+queuectl dlq-retry dd-3 >/dev/null 2>&1 && fail "Single retry ignored an active dedup key"
+output=$(queuectl dlq-retry --all --pause 0) || fail "Bulk retry failed on duplicate dedup keys"
+echo "$output" | grep -q "Retried 1 DLQ job(s)." || fail "Dedup-safe bulk retry count wrong"
+echo "$output" | grep -q "Skipped 2 DLQ job(s) .*dd-2, dd-3" || fail "Skipped jobs not reported: $output"
+python - <<'PYCODE' || fail "Dedup-safe retry left the wrong jobs"
+from core.storage import Database
+db = Database()
+status = dict(db.con.execute("SELECT id, status FROM jobs WHERE id LIKE 'dd-%'"))
+assert status == {"dd-1": "pending", "dd-2": "dead", "dd-3": "dead", "dd-live": "pending"}, status
+PYCODE
+pass "Bulk retry skips dead jobs whose dedup key is active"
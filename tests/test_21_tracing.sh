@@ -0,0 +1,51 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Tracing Spans and Worker Profiling"
+clean_env
+
+queuectl config-set heartbeat_interval 1 >/dev/null
+for i in 1 2 3; do
+    queuectl enqueue "{\"id\": \"trace-$i\", \"command\": \"sleep 0.2\"}" >/dev/null
+done
+
+stdbuf -oL -eL queuectl worker-start --count 2 --trace trace.json --profile --profile-output worker.prof > tracing.log 2>&1 &
+PID=$!
+sleep 4
+
+# ------------------------------------------------------------
+# 1. Per-phase timings are reported while workers run
+# ------------------------------------------------------------
+status_out=$(queuectl status)
+echo "$status_out" | grep -q "Phase Timing" || { echo "$status_out"; fail "Status missing phase timings"; }
+pass "Status reports per-phase timings"
+
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+# ------------------------------------------------------------
+# 2. Chrome trace JSON contains every phase
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Trace file incomplete"
+import json
+events = json.load(open("trace.json"))["traceEvents"]
+spans = [e for e in events if e["ph"] == "X"]
+names = {e["name"] for e in spans}
+assert {"claim", "spawn", "run", "persist", "log", "db.claim", "db.update"} <= names, names
+assert all(e["dur"] >= 0 and "tid" in e for e in spans)
+runs = [e for e in spans if e["name"] == "run"]
+assert len(runs) == 3 and all(e["dur"] >= 200000 for e in runs), runs
+PYCODE
+pass "Chrome trace written with claim/spawn/run/persist/log spans"
+
+# ------------------------------------------------------------
+# 3. Merged profile across worker threads
+# ------------------------------------------------------------
+python -c "import pstats; s = pstats.Stats('worker.prof'); assert any(f[2] == 'worker_loop' for f in s.stats)" \
+    || fail "Profile missing worker thread stats"
+rm -f trace.json worker.prof
+pass "Tracing and profiling test completed successfully"
@@ -0,0 +1,66 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Command Search Index"
+clean_env
+
+python - <<'PYCODE' || fail "Could not seed jobs"
+from core.storage import Database
+db = Database()
+with db.con:
+    db.con.executemany(
+        "INSERT INTO jobs (id, command, status, created_at, updated_at) VALUES (?, ?, 'completed', ?, ?);",
+        [(f"noise-{i}", f"echo noise {i}", "2025-01-01 00:00:00", "2025-01-01 00:00:00") for i in range(20000)],
+    )
+for i in range(3):
+    db.add_job(f"backup-{i}", f"/opt/scripts/nightly_backup.sh --db shard{i}", 3)
+db.fail_job("backup-2", exit_code=1)
+PYCODE
+
+# ------------------------------------------------------------
+# 1. Substring search through the index, newest first
+# ------------------------------------------------------------
+output=$(queuectl search backup.sh)
+echo "$output" | grep -q "Matches Displayed: 3" || fail "search did not find all matching jobs"
+[ "$(echo "$output" | grep -m1 -o 'backup-[0-9]')" = "backup-2" ] || fail "search results not newest first"
+queuectl search "backup.sh shard1" | grep -q "Matches Displayed: 1" || fail "terms are not AND-ed"
+if queuectl search "sh" >/dev/null 2>&1; then
+    fail "search with a too-short term should fail"
+fi
+pass "queuectl search finds commands by substring"
+
+# ------------------------------------------------------------
+# 2. list / dlq-list filters, and the index follows updates
+# ------------------------------------------------------------
+queuectl list --status pending --search nightly | grep -q "Total Jobs Displayed: 2" || fail "list --search wrong"
+queuectl dlq-list --search nightly | grep -q "backup-2" || fail "dlq-list --search wrong"
+
+python - <<'PYCODE' || fail "Index out of sync with jobs"
+from core.storage import Database
+db = Database()
+db.add_job("backup-0", "rsync /srv /mnt/archive", 3, dedup_mode="replace")
+assert [j["id"] for j in db.search_jobs("nightly_backup")] == ["backup-2", "backup-1"]
+assert [j["id"] for j in db.search_jobs("archive")] == ["backup-0"]
+with db.con:
+    db.con.execute("DELETE FROM jobs WHERE id = 'backup-1';")
+assert [j["id"] for j in db.search_jobs("nightly_backup")] == ["backup-2"]
+plan = " ".join(r[3] for r in db.con.execute(
+    "EXPLAIN QUERY PLAN SELECT j.* FROM jobs_fts f JOIN jobs j ON j.rowid = f.rowid "
+    "WHERE jobs_fts MATCH 'x' ORDER BY f.rowid DESC LIMIT 5;"
+))
+assert "VIRTUAL TABLE" in plan and "SCAN j" not in plan, plan
+PYCODE
+pass "Index stays in sync on replace and delete"
+
+# ------------------------------------------------------------
+# 3. Dashboard search box
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Dashboard search failed"
+from web.dashboard import app
+client = app.test_client()
+page = client.get("/?q=nightly_backup&status=dead").get_data(as_text=True)
+assert 'Jobs matching "nightly_backup" (1)' in page and "backup-2" in page, page
+assert "at least 3 characters" in client.get("/?q=ab").get_data(as_text=True)
+PYCODE
+pass "Search test completed successfully"
@@ -0,0 +1,67 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Result Cache"
+clean_env
+rm -f cache_runs.txt cache_input.txt
+echo "v1" > cache_input.txt
+
+queuectl config-set heartbeat_interval 1 >/dev/null
+cmd='echo ran >> cache_runs.txt; echo report for $(cat cache_input.txt)'
+for i in 1 2 3; do
+    queuectl enqueue "{\"id\": \"cached-$i\", \"command\": \"$cmd\", \"cache_ttl\": \"1h\", \"cache_inputs\": [\"cache_input.txt\"]}" >/dev/null
+done
+queuectl enqueue "{\"id\": \"uncached\", \"command\": \"$cmd\"}" >/dev/null
+
+stdbuf -oL -eL queuectl worker-start --count 1 > result_cache.log 2>&1 &
+PID=$!
+sleep 5
+
+# ------------------------------------------------------------
+# 1. Identical cacheable jobs run once; the others reuse the result
+# ------------------------------------------------------------
+[ "$(wc -l < cache_runs.txt)" -eq 2 ] || fail "Expected 2 real runs (1 cached job + 1 uncached), got $(wc -l < cache_runs.txt)"
+[ "$(grep -c 'completed from cache' result_cache.log)" -eq 2 ] || fail "Cache hits not reported"
+grep -q "REUSED RESULT OF JOB: cached-1" logs/cached-3.log || fail "Cache hit not recorded in the job log"
+pass "Repeated job served from cache without spawning"
+
+# ------------------------------------------------------------
+# 2. Changing a declared input invalidates the key
+# ------------------------------------------------------------
+echo "v2" > cache_input.txt
+queuectl enqueue "{\"id\": \"cached-4\", \"command\": \"$cmd\", \"cache_ttl\": 3600, \"cache_inputs\": [\"cache_input.txt\"]}" >/dev/null
+sleep 3
+queuectl worker-stop >/dev/null 2>&1
+sleep 4
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+[ "$(wc -l < cache_runs.txt)" -eq 3 ] || fail "Changed input did not cause a re-run"
+grep -q "START JOB cached-4" logs/cached-4.log || fail "Changed input was served from cache"
+status_out=$(queuectl status)
+echo "$status_out" | grep -q "Hits / Misses  : 2 / 2" || fail "Hit/miss metrics not recorded"
+pass "Declared inputs are part of the cache key"
+
+# ------------------------------------------------------------
+# 3. LRU eviction by entry count and size
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Cache eviction incorrect"
+from core.storage import Database
+db = Database()
+with db.con:
+    db.con.execute("DELETE FROM result_cache;")
+for i in range(5):
+    db.cache_store(f"k{i}", f"job-{i}", 0, "x" * 100, "", max_entries=3, max_bytes=10_000)
+db.con.execute("UPDATE result_cache SET last_used = '2000-01-01 00:00:00' WHERE key = 'k3';")
+db.con.commit()
+assert sorted(r["key"] for r in db.con.execute("SELECT key FROM result_cache")) == ["k2", "k3", "k4"]
+db.cache_store("k5", "job-5", 0, "x" * 150, "", max_entries=3, max_bytes=300)
+keys = sorted(r["key"] for r in db.con.execute("SELECT key FROM result_cache"))
+assert keys == ["k4", "k5"], keys
+stats = db.cache_stats()
+assert (stats["entries"], stats["bytes"]) == (2, 250) and stats["evictions"] >= 4, dict(stats)
+assert db.cache_lookup("k5", max_age=60) and not db.cache_lookup("k5", max_age=-60)
+PYCODE
+rm -f cache_runs.txt cache_input.txt
+pass "Result cache test completed successfully"
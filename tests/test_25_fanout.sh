@@ -0,0 +1,62 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Fan-out (map) Jobs"
+clean_env
+rm -rf fanout_in fanout_out.txt fanout_reduced.txt
+mkdir -p fanout_in
+for i in $(seq 1 25); do echo "$i" > "fanout_in/item $i.txt"; done
+
+queuectl enqueue '{"id": "fan", "map": {"glob": "fanout_in/*.txt", "command": "cat {item} >> fanout_out.txt", "chunk_size": 4, "window": 8, "reduce": "echo reduced {parent} $(wc -l < fanout_out.txt) > fanout_reduced.txt"}}' >/dev/null \
+    || fail "Could not enqueue map job"
+queuectl enqueue '{"id": "fan-bad", "map": {"items": ["ok", "bad"], "command": "test {item} = ok", "reduce": "echo never"}, "max_retries": 1}' >/dev/null \
+    || fail "Could not enqueue second map job"
+
+# ------------------------------------------------------------
+# 1. Children are created lazily, not at enqueue time
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Map job not created correctly"
+from core.storage import Database
+db = Database()
+progress = db.get_map_progress("fan")
+assert (progress["created"], progress["total"], progress["window"]) == (0, None, 8), dict(progress)
+assert db.get_map_progress("fan-bad")["total"] == 2
+assert db.get_job("fan.reduce")["deps_remaining"] == 1
+PYCODE
+
+stdbuf -oL -eL queuectl worker-start --count 3 > fanout.log 2>&1 &
+PID=$!
+for _ in $(seq 1 40); do
+    [ -f fanout_reduced.txt ] && break
+    sleep 0.5
+done
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+[ -f fanout_reduced.txt ] || fail "Reducer did not run"
+grep -q "reduced fan 25" fanout_reduced.txt || fail "Reducer ran before all children finished"
+[ "$(sort -n fanout_out.txt | uniq | wc -l)" -eq 25 ] || fail "Not every item was processed exactly once"
+[ "$(wc -l < fanout_out.txt)" -eq 25 ] || fail "Some items were processed twice"
+pass "Glob fan-out processed every item once, then ran the reducer"
+
+# ------------------------------------------------------------
+# 2. Counters and failure propagation
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Fan-out counters incorrect"
+from core.storage import Database
+db = Database()
+progress = db.get_map_progress("fan")
+assert (progress["created"], progress["completed"], progress["dead"], progress["total"]) == (25, 25, 0, 25), dict(progress)
+assert db.get_job("fan")["status"] == "completed"
+assert db.con.execute("SELECT COUNT(*) FROM jobs WHERE parent_id = 'fan'").fetchone()[0] == 25
+bad = db.get_map_progress("fan-bad")
+assert (bad["completed"], bad["dead"]) == (1, 1), dict(bad)
+assert db.get_job("fan-bad")["status"] == "dead" and db.get_job("fan-bad.reduce")["status"] == "dead"
+PYCODE
+grep -q "created 4 children" fanout.log || fail "Children were not created in chunks"
+rm -rf fanout_in fanout_out.txt fanout_reduced.txt
+pass "Fan-out test completed successfully"
@@ -0,0 +1,78 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Job Event Stream"
+clean_env
+rm -f events_trim.db
+
+queuectl enqueue '{"id": "ev-ok", "command": "echo ok"}' >/dev/null
+queuectl enqueue '{"id": "ev-bad", "command": "exit 3", "max_retries": 2}' >/dev/null
+
+queuectl events --follow --json --consumer tail > events_follow.jsonl 2>&1 &
+FOLLOW=$!
+stdbuf -oL -eL queuectl worker-start --count 1 > events.log 2>&1 &
+PID=$!
+sleep 6
+queuectl worker-stop >/dev/null 2>&1
+sleep 2
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+queuectl enqueue '{"id": "ev-late", "command": "echo late"}' >/dev/null
+sleep 1.5
+kill "$FOLLOW" >/dev/null 2>&1 || true
+
+# ------------------------------------------------------------
+# 1. Every transition is recorded in order
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Event sequence incorrect"
+import json
+events = [json.loads(line) for line in open("events_follow.jsonl")]
+seqs = [e["seq"] for e in events]
+assert seqs == sorted(seqs) and len(set(seqs)) == len(seqs), seqs
+by_job = {}
+for e in events:
+    by_job.setdefault(e["job_id"], []).append((e["status"], e["attempts"]))
+assert by_job["ev-ok"] == [("pending", 0), ("processing", 0), ("completed", 0)], by_job["ev-ok"]
+assert by_job["ev-bad"] == [("pending", 0), ("processing", 0), ("pending", 1), ("processing", 1), ("dead", 2)], by_job["ev-bad"]
+assert by_job["ev-late"] == [("pending", 0)], "follow did not pick up new events"
+PYCODE
+pass "events --follow streamed every transition in order"
+
+# ------------------------------------------------------------
+# 2. Cursors: --since, consumer resume, SSE with Last-Event-ID
+# ------------------------------------------------------------
+[ "$(queuectl events --since 8 | wc -l)" -eq 1 ] || fail "--since did not skip earlier events"
+[ "$(queuectl events --consumer tail | wc -l)" -eq 0 ] || fail "Consumer did not resume from its position"
+python - <<'PYCODE' || fail "SSE endpoint incorrect"
+from web.dashboard import app
+client = app.test_client()
+body = client.get("/api/events?follow=0", headers={"Last-Event-ID": "7"}).get_data(as_text=True)
+assert body.startswith("id: 8\nevent: job\ndata: ") and body.count("data: ") == 2, body
+assert client.get("/api/events?since=9&follow=0").get_data(as_text=True) == ""
+PYCODE
+pass "Cursor-based consumers resume where they left off"
+
+# ------------------------------------------------------------
+# 3. Retention trims consumed events in chunks
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Event trimming incorrect"
+from core.storage import Database
+db = Database("events_trim.db")
+for i in range(9):
+    db.add_job(f"trim-{i}", "true", 1)
+db.ack_events("slow", 4)
+assert db.trim_events(max_age=86400, chunk_size=2, pause=0) == 4
+assert db.read_events(0, 1)[0]["seq"] == 5
+with db.con:
+    db.con.execute("UPDATE job_events SET at = '2000-01-01 00:00:00' WHERE seq <= 6;")
+assert db.trim_events(max_age=86400, chunk_size=2, pause=0) == 2
+db.remove_consumer("slow")
+assert db.trim_events(max_age=86400, chunk_size=2, pause=0) == 0, "unconsumed events trimmed before max_age"
+assert db.trim_events(max_age=-60, chunk_size=2, pause=0) == 3
+db.add_job("after-trim", "true", 1)
+assert db.last_event_seq() == 10, "seq reused after trimming"
+PYCODE
+rm -f events_follow.jsonl events_trim.db
+pass "Event stream test completed successfully"
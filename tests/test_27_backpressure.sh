@@ -0,0 +1,129 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Backpressure and Admission Control"
+clean_env
+
+sql() {
+    python -c 'import sqlite3, sys
+con = sqlite3.connect("store.db")
+for row in con.execute(sys.argv[1]):
+    print(row[0])
+con.commit()' "$1"
+}
+
+# ------------------------------------------------------------
+# 1. Reject mode with high/low hysteresis
+# ------------------------------------------------------------
+queuectl config-set backpressure '{"high": 3, "low": 1, "mode": "reject"}' >/dev/null
+for i in 1 2 3; do
+    queuectl enqueue "{\"id\": \"bp-$i\", \"command\": \"echo $i\"}" >/dev/null
+done
+if queuectl enqueue '{"id": "bp-4", "command": "echo 4"}' > bp.out 2>&1; then
+    fail "Job admitted above the high watermark"
+fi
+grep -q "is full (3 pending, high watermark 3)" bp.out || fail "Rejection message missing"
+
+sql "DELETE FROM jobs WHERE id = 'bp-1'"
+if queuectl enqueue '{"id": "bp-5", "command": "echo 5"}' >/dev/null 2>&1; then
+    fail "Saturated backlog admitted a job above its low watermark"
+fi
+sql "DELETE FROM jobs WHERE id = 'bp-2'"
+queuectl enqueue '{"id": "bp-6", "command": "echo 6"}' >/dev/null || fail "Drained backlog still rejecting"
+pass "Reject mode keeps refusing until the backlog drains to 'low'"
+
+# ------------------------------------------------------------
+# 2. Shed mode drops the lowest-priority pending job of the queue
+# ------------------------------------------------------------
+queuectl config-set backpressure '{"queues": {"bulk": {"high": 2, "mode": "shed"}}}' >/dev/null
+queuectl enqueue '{"id": "sh-low", "command": "echo low", "queue": "bulk", "priority": 0}' >/dev/null
+queuectl enqueue '{"id": "sh-mid", "command": "echo mid", "queue": "bulk", "priority": 1}' >/dev/null
+queuectl enqueue '{"id": "sh-high", "command": "echo high", "queue": "bulk", "priority": 5}' >/dev/null \
+    || fail "High-priority job not admitted by shedding"
+[ "$(sql "SELECT status FROM jobs WHERE id = 'sh-low'")" = "dead" ] || fail "Lowest-priority job not shed"
+if queuectl enqueue '{"id": "sh-none", "command": "echo none", "queue": "bulk", "priority": 0}' >/dev/null 2>&1; then
+    fail "Job admitted although nothing ranks below it"
+fi
+OUT=$(queuectl status)
+echo "$OUT" | grep -q "bulk" || fail "Status does not show backpressure state"
+echo "$OUT" | grep -q "SATURATED  throttled=1 shed=1" || fail "Status counters incorrect: $OUT"
+pass "Shed mode moves the lowest-priority job to the DLQ"
+
+# ------------------------------------------------------------
+# 3. Block mode waits for workers to drain, or times out
+# ------------------------------------------------------------
+queuectl config-set backpressure '{"high": 5, "low": 2, "mode": "block", "timeout": 1}' >/dev/null
+queuectl enqueue '{"id": "bl-0", "command": "echo 0"}' >/dev/null
+START=$(date +%s)
+if queuectl enqueue '{"id": "bl-1", "command": "echo 1"}' > bp.out 2>&1; then
+    fail "Block mode admitted a job above the high watermark"
+fi
+[ $(( $(date +%s) - START )) -ge 1 ] || fail "Block mode did not wait"
+grep -q "after waiting 1s" bp.out || fail "Block timeout message missing"
+
+queuectl config-set backpressure '{"high": 5, "low": 2, "mode": "block", "timeout": 30}' >/dev/null
+queuectl config-set heartbeat_interval 1 >/dev/null
+stdbuf -oL -eL queuectl worker-start --count 1 > backpressure.log 2>&1 &
+PID=$!
+queuectl enqueue '{"id": "bl-2", "command": "echo 2"}' >/dev/null || fail "Blocked enqueue never admitted"
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+pass "Block mode waits until workers drain the backlog"
+
+# ------------------------------------------------------------
+# 4. Trigger-maintained counters match the jobs table
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "queue_depth counters drifted"
+import sqlite3
+con = sqlite3.connect("store.db")
+actual = dict(con.execute("""
+    SELECT queue, COUNT(*) FROM jobs WHERE status = 'pending' AND deps_remaining = 0 GROUP BY queue
+"""))
+actual["*"] = sum(actual.values())
+depth = {q: n for q, n in con.execute("SELECT queue, pending FROM queue_depth") if n or q in actual}
+assert depth == actual, (depth, actual)
+PYCODE
+pass "queue_depth counters stay exact"
+
+# ------------------------------------------------------------
+# 5. Only the ready backlog counts: dependency-blocked jobs do not throttle
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Blocked jobs counted towards the watermarks"
+from core.storage import Database, QueueFullError
+from core.admission import AdmissionPolicy
+db = Database()
+db.con.execute("DELETE FROM jobs")
+db.con.execute("DELETE FROM queue_depth")
+db.con.commit()
+policy = AdmissionPolicy({"high": 3, "low": 1, "mode": "reject"})
+db.add_job("dag-root", "echo root", 1, run_at="2099-01-01T00:00:00Z", admission=policy)
+for i in range(5):
+    db.add_job(f"dag-{i}", "echo child", 1, depends_on=["dag-root"], admission=policy)
+depth = lambda: {r["queue"]: r["pending"] for r in db.queue_depths()}
+assert depth()["*"] == 1, depth()
+db.update_job_status("dag-root", "processing")
+db.update_job_status("dag-root", "completed")
+assert depth()["*"] == 5, depth()
+try:
+    db.add_job("dag-late", "echo late", 1, admission=policy)
+    raise AssertionError("ready backlog above high admitted")
+except QueueFullError:
+    pass
+
+# Counters written by the old triggers (blocked jobs included) are rebuilt on upgrade.
+db.add_job("dag-blocked", "echo blocked", 1, depends_on=["dag-0"])
+db.con.execute("DROP TRIGGER queue_depth_update")
+db.con.execute("CREATE TRIGGER queue_depth_update AFTER UPDATE OF status ON jobs BEGIN SELECT 1; END")
+db.con.execute("UPDATE queue_depth SET pending = 99")
+db.con.commit()
+db = Database()
+assert depth()["*"] == 5 and depth()["default"] == 5, depth()
+assert "deps_remaining" in db.con.execute("SELECT sql FROM sqlite_master WHERE name = 'queue_depth_update'").fetchone()[0]
+PYCODE
+pass "Watermarks count only jobs whose dependencies are met"
+
+rm -f bp.out
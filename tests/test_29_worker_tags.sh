@@ -0,0 +1,72 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Worker Tags and Job Requirements"
+clean_env
+
+job_status() {
+    python -c "from core.storage import Database; print(Database().get_job('$1')['status'])"
+}
+
+# ------------------------------------------------------------
+# 1. Jobs only go to workers whose tags cover their requirements
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "tg-gpu", "command": "echo gpu", "requires": "gpu"}' >/dev/null
+queuectl enqueue '{"id": "tg-both", "command": "echo both", "requires": ["highmem", "gpu"]}' >/dev/null
+queuectl enqueue '{"id": "tg-plain", "command": "echo plain"}' >/dev/null
+queuectl enqueue '{"id": "tg-bad", "command": "echo bad", "requires": "gpu,has space"}' >/dev/null 2>&1 \
+    && fail "Invalid requirement accepted"
+queuectl worker-start --tags "bad tag" >/dev/null 2>&1 && fail "Invalid worker tag accepted"
+
+stdbuf -oL -eL queuectl worker-start --count 2 --tags gpu,cuda > tags.log 2>&1 &
+PID=$!
+sleep 4
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+grep -q "Worker Tags *: cuda, gpu" tags.log || fail "Worker tags not reported"
+[ "$(job_status tg-gpu)" = "completed" ] || fail "Matching job not claimed"
+[ "$(job_status tg-plain)" = "completed" ] || fail "Unrestricted job not claimed by a tagged worker"
+[ "$(job_status tg-both)" = "pending" ] || fail "Job claimed by a worker missing one of its tags"
+pass "Tagged worker ran matching and unrestricted jobs only"
+
+# ------------------------------------------------------------
+# 2. Untagged workers leave tagged jobs alone; a full match runs them
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Requirement matching incorrect"
+from core.storage import Database
+from core.capabilities import satisfied_keys
+db = Database()
+assert db.fetch_next_pending_job() is None, "untagged claim took a job with requirements"
+job = db.fetch_next_pending_job(accepts=satisfied_keys("gpu,highmem,ssd"))
+assert job["id"] == "tg-both" and job["requires"] == "gpu,highmem", dict(job)
+PYCODE
+pass "Requirements must be a subset of the worker's tags"
+
+# ------------------------------------------------------------
+# 3. A tagged claim merges one index seek per key, in claim order
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Tagged claim order or plan incorrect"
+from core.storage import Database
+from core.capabilities import satisfied_keys
+db = Database()
+db.add_job("tg-low", "echo low", 1, priority=1, requires="gpu")
+db.add_job("tg-high", "echo high", 1, priority=5, requires="cuda,gpu")
+db.add_job("tg-any", "echo any", 1, priority=3)
+keys = satisfied_keys("gpu,cuda")
+statements = []
+db.con.set_trace_callback(statements.append)
+claimed = [db.fetch_next_pending_job(accepts=keys)["id"] for _ in range(3)]
+db.con.set_trace_callback(None)
+assert claimed == ["tg-high", "tg-any", "tg-low"], claimed
+claim = next(s for s in statements if "UPDATE jobs" in s)
+plan = [row[3] for row in db.con.execute("EXPLAIN QUERY PLAN " + claim)]
+seeks = [step for step in plan if step == "SEARCH jobs USING INDEX idx_jobs_ready (requires=?)"]
+assert len(seeks) == len(keys), plan
+assert [step for step in plan if "TEMP B-TREE" in step] == ["USE TEMP B-TREE FOR ORDER BY"] == plan[-1:], plan
+PYCODE
+pass "Tagged workers merge per-key seeks instead of sorting the matched backlog"
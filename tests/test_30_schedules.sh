@@ -0,0 +1,95 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Recurring Schedules"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Validation
+# ------------------------------------------------------------
+queuectl schedule-add bad '{"command": "echo x"}' --cron "61 * * * *" >/dev/null 2>&1 && fail "Invalid cron accepted"
+queuectl schedule-add bad '{"command": "echo x"}' --cron "@daily" --every 5m >/dev/null 2>&1 \
+    && fail "Both cron and interval accepted"
+queuectl schedule-add bad '{"id": "x", "command": "echo x"}' --every 5m >/dev/null 2>&1 && fail "Template id accepted"
+queuectl schedule-add nightly '{"command": "echo nightly"}' --cron "0 2 * * *" >/dev/null || fail "Cron schedule rejected"
+queuectl schedule-add nightly '{"command": "echo again"}' --cron "0 3 * * *" >/dev/null 2>&1 \
+    && fail "Duplicate schedule name accepted"
+pass "Schedules are validated on creation"
+
+# ------------------------------------------------------------
+# 2. Two worker processes fire every tick exactly once, with catch-up
+# ------------------------------------------------------------
+START=$(python -c "from datetime import datetime, timezone, timedelta; print((datetime.now(timezone.utc) - timedelta(seconds=9)).strftime('%Y-%m-%d %H:%M:%S+00:00'))")
+queuectl schedule-add tick '{"command": "echo tick", "queue": "ticks"}' --every 2s --catchup all --start "$START" >/dev/null
+queuectl config-set heartbeat_interval 1 >/dev/null
+
+stdbuf -oL -eL queuectl worker-start --count 1 > schedules_a.log 2>&1 &
+PID_A=$!
+stdbuf -oL -eL queuectl worker-start --count 1 > schedules_b.log 2>&1 &
+PID_B=$!
+sleep 7
+queuectl schedule-pause tick >/dev/null
+sleep 1
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+for pid in "$PID_A" "$PID_B"; do
+    if ps -p "$pid" >/dev/null 2>&1; then
+        kill "$pid" >/dev/null 2>&1 || true
+    fi
+done
+
+python - <<'PYCODE' || fail "Ticks were not materialized exactly once"
+from datetime import datetime
+from core.storage import Database
+db = Database()
+jobs = db.con.execute("SELECT id, status FROM jobs WHERE queue = 'ticks' ORDER BY id").fetchall()
+ticks = [datetime.strptime(j["id"].split("@")[1], "%Y%m%dT%H%M%S") for j in jobs]
+gaps = {(b - a).total_seconds() for a, b in zip(ticks, ticks[1:])}
+row = db.get_schedule("tick")
+assert len(jobs) >= 8, [j["id"] for j in jobs]
+assert gaps == {2.0}, gaps
+assert row["fired"] == len(jobs), (row["fired"], len(jobs))
+assert all(j["status"] == "completed" for j in jobs), [tuple(j) for j in jobs]
+PYCODE
+OUT=$(queuectl schedule-list)
+echo "$OUT" | grep -q "tick .*every 2s .*paused" || fail "schedule-list does not show the paused schedule"
+pass "Missed and live ticks fired once each across two worker processes"
+
+# ------------------------------------------------------------
+# 3. Catch-up policies after an outage
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Catch-up policy incorrect"
+from datetime import datetime, timezone, timedelta
+from core.storage import Database
+from core.schedules import fire, format_timestamp
+db = Database()
+now = datetime.now(timezone.utc).replace(minute=30, second=0, microsecond=0)
+missed = format_timestamp(now.replace(minute=0) - timedelta(hours=5))
+for name, catchup in (("c-latest", "latest"), ("c-skip", "skip"), ("c-all", "all")):
+    db.add_schedule(name, {"command": "echo c", "max_retries": 1}, missed, cron="0 * * * *", catchup=catchup)
+    following = fire(db, name, now)
+    assert following > now and following.minute == 0, following
+made = {name: db.con.execute("SELECT COUNT(*) FROM jobs WHERE id LIKE ?", (name + "@%",)).fetchone()[0]
+        for name in ("c-latest", "c-skip", "c-all")}
+assert made == {"c-latest": 1, "c-skip": 0, "c-all": 6}, made
+PYCODE
+queuectl schedule-remove c-all >/dev/null || fail "schedule-remove failed"
+queuectl schedule-remove c-all >/dev/null 2>&1 && fail "Removing a missing schedule succeeded"
+pass "all / latest / skip catch-up policies"
+
+# ------------------------------------------------------------
+# 4. Tick jobs run at the tick in UTC whatever the host time zone
+# ------------------------------------------------------------
+TZ=America/New_York python - <<'PYCODE' || fail "Tick run_at shifted by the local UTC offset"
+import time
+from datetime import datetime, timezone
+from core.storage import Database
+from core.schedules import fire
+time.tzset()
+db = Database()
+db.add_schedule("tz-noon", {"command": "echo noon", "max_retries": 1}, "2026-01-01 12:00:00", cron="0 12 * * *", catchup="latest")
+fire(db, "tz-noon", datetime(2026, 1, 1, 12, 0, 30, tzinfo=timezone.utc))
+assert db.get_job("tz-noon@20260101T120000")["run_at"] == "2026-01-01 12:00:00", dict(db.get_job("tz-noon@20260101T120000"))
+PYCODE
+pass "Tick jobs keep their UTC run_at under a non-UTC TZ"
@@ -0,0 +1,105 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Priority Aging"
+clean_env
+rm -f aging.trace aging_status.json
+
+# ------------------------------------------------------------
+# 1. Batch promotion by wait time, capped and idempotent
+# ------------------------------------------------------------
+python - <<'PYCODE' || fail "Promotion incorrect"
+from datetime import datetime, timezone, timedelta
+from core.storage import Database
+db = Database()
+ago = lambda s: (datetime.now(timezone.utc) - timedelta(seconds=s)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+db.add_job("ag-old", "echo old", 1, priority=0, run_at=ago(350))
+db.add_job("ag-mid", "echo mid", 1, priority=2, run_at=ago(130))
+db.add_job("ag-new", "echo new", 1, priority=0)
+db.add_job("ag-hot", "echo hot", 1, priority=4)
+assert db.promote_waiting_jobs(60, 1, 5) == 2
+assert db.promote_waiting_jobs(60, 1, 5) == 0, "second pass promoted again"
+prio = dict(db.con.execute("SELECT id, priority FROM jobs"))
+assert prio == {"ag-old": 5, "ag-mid": 4, "ag-new": 0, "ag-hot": 4}, prio
+assert db.fetch_next_pending_job()["id"] == "ag-old", "aged job not claimed first"
+stats = db.starvation_stats(100)
+assert stats["ready"] == 3 and stats["starving"] == 1 and stats["aged"] == 1, stats
+db.con.execute("DELETE FROM jobs")
+db.con.commit()
+PYCODE
+pass "Waiting jobs gain priority per interval up to the cap"
+
+queuectl enqueue '{"id": "ag-map", "map": {"items": ["a", "b"], "command": "echo {item}"}, "priority": 2}' >/dev/null
+python - <<'PYCODE' || fail "Map children aged incorrectly"
+from datetime import datetime, timezone, timedelta
+from core.storage import Database
+db = Database()
+parent = db.fetch_next_pending_job()
+assert parent["id"] == "ag-map", parent["id"]
+assert db.expand_map(parent, 0, 2, [("ag-map-0", "echo a"), ("ag-map-1", "echo b")], True)
+db.add_job("ag-plain", "echo plain", 1, priority=2)
+for passes in range(1, 5):
+    waited = (datetime.now(timezone.utc) - timedelta(seconds=61 * passes)).strftime("%Y-%m-%d %H:%M:%S")
+    db.con.execute("UPDATE jobs SET run_at = ? WHERE status = 'pending'", (waited,))
+    db.con.commit()
+    db.promote_waiting_jobs(60, 1, 9)
+    prio = dict(db.con.execute("SELECT id, priority FROM jobs WHERE status = 'pending'"))
+    assert set(prio.values()) == {2 + passes}, (passes, prio)
+assert db.starvation_stats(100)["aged"] == 3
+db.con.execute("DELETE FROM jobs")
+db.con.commit()
+PYCODE
+pass "Map children age from their parent's priority like any other job"
+
+python - <<'PYCODE' || fail "Claim is not an index seek"
+from core.storage import Database
+db = Database()
+db.add_job("ag-plan", "echo plan", 1)
+statements = []
+db.con.set_trace_callback(statements.append)
+assert db.fetch_next_pending_job()["id"] == "ag-plan"
+db.con.set_trace_callback(None)
+claim = next(s for s in statements if "UPDATE jobs" in s)
+plan = [row[3] for row in db.con.execute("EXPLAIN QUERY PLAN " + claim)]
+assert any("idx_jobs_ready" in step for step in plan) and not any("TEMP B-TREE" in step for step in plan), plan
+db.con.execute("DELETE FROM jobs")
+db.con.commit()
+PYCODE
+pass "Claims seek idx_jobs_ready in priority/run_at order without sorting"
+
+# ------------------------------------------------------------
+# 2. Workers age a starved job past a stream of urgent ones
+# ------------------------------------------------------------
+queuectl config-set aging '{"interval": "5s", "step": 1, "max_priority": 9, "starve_after": "10s"}' >/dev/null
+queuectl config-set heartbeat_interval 1 >/dev/null
+LOW_AT=$(python -c "from datetime import datetime, timezone, timedelta; print((datetime.now(timezone.utc) - timedelta(seconds=30)).strftime('%Y-%m-%dT%H:%M:%S+00:00'))")
+queuectl enqueue "{\"id\": \"low\", \"command\": \"echo low >> aging.trace\", \"run_at\": \"$LOW_AT\"}" >/dev/null
+for i in 1 2 3 4; do
+    queuectl enqueue "{\"id\": \"hot-$i\", \"command\": \"sleep 0.5; echo hot >> aging.trace\", \"priority\": 4}" >/dev/null
+done
+OUT=$(queuectl status)
+echo "$OUT" | grep -q "Starving       : 1 ready for over 10s" || fail "Starvation metrics missing from status: $OUT"
+
+stdbuf -oL -eL queuectl worker-start --count 1 > aging.log 2>&1 &
+PID=$!
+sleep 6
+cp worker_threads.json aging_status.json
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+head -2 aging.trace | grep -q low || fail "Starved job still waited behind urgent ones: $(tr '\n' ' ' < aging.trace)"
+python - <<'PYCODE' || fail "Aging metrics not exported"
+import json
+from web.dashboard import app
+status = json.load(open("aging_status.json"))
+assert status["aging"]["enabled"] and status["aging"]["promoted_total"] >= 1, status["aging"]
+data = app.test_client().get("/api/starvation").get_json()
+assert data["aging"]["interval"] == 5 and data["ready"] == 0, data
+PYCODE
+pass "Aging lets a starved job run and is reported in metrics"
+
+rm -f aging.trace aging_status.json
@@ -0,0 +1,212 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Remote Workers via the Lease Server"
+clean_env
+
+ADDR="127.0.0.1:7391"
+
+job_status() {
+    python -c "from core.storage import Database; print(Database().get_job('$1')['status'])"
+}
+
+queuectl config-set lease_server '{"token": "s3cret"}' >/dev/null
+stdbuf -oL -eL queuectl lease-server --listen "$ADDR" > lease.log 2>&1 &
+SERVER=$!
+trap 'kill $SERVER >/dev/null 2>&1 || true' EXIT
+sleep 2
+
+# ------------------------------------------------------------
+# 1. Protocol: auth, errors, batching and lease release on disconnect
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "ls-held", "command": "echo held"}' >/dev/null
+python - "$ADDR" <<'PYCODE'
+import sys
+from core.lease import RemoteDatabase, LeaseError
+from core.storage import Database, DuplicateJobError
+
+addr = sys.argv[1]
+try:
+    RemoteDatabase(addr, "wrong").ready_stats()
+    raise AssertionError("bad token accepted")
+except LeaseError:
+    pass
+
+remote = RemoteDatabase(addr, "s3cret")
+try:
+    remote.get_job("ls-held")
+    raise AssertionError("non-lease method allowed")
+except AttributeError:
+    pass
+try:
+    remote.call("reset_processing_jobs")
+    raise AssertionError("non-lease method served")
+except LeaseError:
+    pass
+try:
+    remote.add_job("ls-held", "echo again", 3, dedup_mode="reject")
+    raise AssertionError("duplicate accepted")
+except DuplicateJobError as e:
+    assert e.job_id == "ls-held" and e.status == "pending", vars(e)
+
+with remote.batch():
+    assert remote.upsert_workers([("h:1:W", "W", "h", 1, "idle", None, None, 0,
+                                   "2026-01-01 00:00:00", "2026-01-01 00:00:00")]) is None
+assert any(w["id"] == "h:1:W" for w in Database().con.execute("SELECT id FROM workers")), "batched write missing"
+
+job = remote.fetch_next_pending_job()
+assert job["id"] == "ls-held", job
+assert Database().get_job("ls-held")["status"] == "processing"
+remote.close()
+PYCODE
+sleep 1
+[ "$(job_status ls-held)" = "pending" ] || fail "Job leased to a disconnected client was not released"
+pass "Lease protocol authenticates, maps errors, batches writes and releases abandoned leases"
+
+# ------------------------------------------------------------
+# 1b. A lost connection never finishes a job twice
+# ------------------------------------------------------------
+python - "$ADDR" <<'PYCODE'
+import socket, sys, threading, time
+from core.lease import LeaseServer, RemoteDatabase, LeaseLostError
+from core.storage import Database
+
+remote = RemoteDatabase(sys.argv[1], "s3cret")
+job = remote.fetch_next_pending_job()
+assert job["id"] == "ls-held", job
+remote.close()  # connection drops: the server requeues the job
+time.sleep(0.5)
+try:
+    remote.update_job_status("ls-held", "completed")
+    raise AssertionError("finished a job leased to a dropped connection")
+except LeaseLostError:
+    pass
+assert Database().get_job("ls-held")["status"] == "pending"
+remote.close()
+
+# A server that drops every connection after reading one request.
+listener = socket.socket()
+listener.bind(("127.0.0.1", 0))
+listener.listen(8)
+received = []
+def serve():
+    while True:
+        conn, _ = listener.accept()
+        received.append(conn.makefile("rb").readline())
+        conn.close()
+threading.Thread(target=serve, daemon=True).start()
+flaky = RemoteDatabase(f"127.0.0.1:{listener.getsockname()[1]}", timeout=2)
+try:
+    flaky.update_job_status("x", "completed")
+    raise AssertionError("call succeeded on a dropped connection")
+except LeaseLostError:
+    pass
+time.sleep(0.2)
+assert len(received) == 1, "non-idempotent call was resent"
+try:
+    flaky.ready_stats()
+except LeaseLostError:
+    raise AssertionError("read-only call was not retried")
+except Exception:
+    pass
+time.sleep(0.2)
+assert len(received) == 3, received
+
+for address in ("0.0.0.0:0", "10.1.2.3:7070", "queue-host:7070"):
+    try:
+        LeaseServer(address)
+        raise AssertionError(f"{address} served without a token")
+    except ValueError:
+        pass
+PYCODE
+pass "Lost connections abandon jobs instead of resending their updates"
+
+# ------------------------------------------------------------
+# 1c. Leases expire unless a heartbeat renews them
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "ls-stale", "command": "echo stale", "priority": 9}' >/dev/null
+python - <<'PYCODE' || fail "Silent worker kept its lease"
+import time
+from core.lease import LeaseServer, RemoteDatabase, LeaseLostError
+from core.storage import Database
+
+server = LeaseServer("127.0.0.1:0", lease_ttl=1)
+server.start()
+addr = f"127.0.0.1:{server.server.server_address[1]}"
+worker, heartbeat = RemoteDatabase(addr), RemoteDatabase(addr)
+job = worker.fetch_next_pending_job()
+assert job["id"] == "ls-stale", job
+row = ("h:2:W", "W", "h", 2, "busy", "ls-stale", None, 0, "2026-01-01 00:00:00", "2026-01-01 00:00:00")
+for _ in range(4):  # renewed past its ttl while heartbeats arrive
+    time.sleep(0.5)
+    heartbeat.upsert_workers([row])
+assert Database().get_job("ls-stale")["status"] == "processing"
+time.sleep(2)  # heartbeats stop; the worker's connection stays open but silent
+assert Database().get_job("ls-stale")["status"] == "pending", "expired lease not requeued"
+try:
+    worker.update_job_status("ls-stale", "completed")
+    raise AssertionError("finished a job whose lease expired")
+except LeaseLostError:
+    pass
+heartbeat.close()
+server.shutdown()
+PYCODE
+pass "Leases not renewed by a heartbeat expire and are requeued"
+
+python - <<'PYCODE' || fail "Map job killed by a lost lease"
+from pathlib import Path
+from core.lease import LeaseLostError
+from core.worker_engine import WorkerManager
+
+class DroppedConnection:
+    calls = []
+    def get_map_progress(self, job_id):
+        raise LeaseLostError("connection to lease server lost mid-call")
+    def update_job_status(self, job_id, status):
+        self.calls.append(status)
+
+manager = WorkerManager.__new__(WorkerManager)
+try:
+    manager._expand_map(DroppedConnection(), {"id": "ls-map", "spec": "{}"}, Path("logs/ls-map.log"))
+    raise AssertionError("lease loss swallowed during map expansion")
+except LeaseLostError:
+    pass
+assert DroppedConnection.calls == [], DroppedConnection.calls
+PYCODE
+pass "Map expansion abandons the job on a lost lease instead of killing it"
+
+# ------------------------------------------------------------
+# 2. A remote worker processes jobs through the server
+# ------------------------------------------------------------
+queuectl enqueue '{"id": "ls-ok", "command": "echo remote-ok"}' >/dev/null
+queuectl enqueue '{"id": "ls-bad", "command": "exit 3", "max_retries": 1}' >/dev/null
+queuectl worker-start --server 127.0.0.1:1 >/dev/null 2>&1 && fail "Unreachable lease server accepted"
+
+stdbuf -oL -eL queuectl worker-start --count 2 --server "$ADDR" > remote_worker.log 2>&1 &
+PID=$!
+for _ in $(seq 1 20); do
+    [ "$(job_status ls-ok)" = "completed" ] && [ "$(job_status ls-bad)" = "dead" ] \
+        && [ "$(job_status ls-held)" = "completed" ] && [ "$(job_status ls-stale)" = "completed" ] && break
+    sleep 0.5
+done
+sleep 3
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+grep -q "Lease Server" remote_worker.log || fail "Worker did not report remote mode"
+[ "$(job_status ls-ok)" = "completed" ] || fail "Remote worker did not complete ls-ok"
+[ "$(job_status ls-held)" = "completed" ] || fail "Released job was not picked up again"
+[ "$(job_status ls-stale)" = "completed" ] || fail "Expired lease was not picked up again"
+[ "$(job_status ls-bad)" = "dead" ] || fail "Remote failure was not moved to the DLQ"
+OUT=$(python -c "
+from core.storage import Database
+print(Database().con.execute(\"SELECT COUNT(*) FROM job_runs WHERE job_id IN ('ls-ok', 'ls-bad')\").fetchone()[0])
+")
+[ "$OUT" -ge 2 ] || fail "Heartbeat writes (run usage) did not reach the server"
+pass "Remote worker claims, completes and fails jobs via the lease server"
+
+rm -f lease.log remote_worker.log
@@ -0,0 +1,104 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Asynchronous Structured Worker Logging"
+clean_env
+
+# ------------------------------------------------------------
+# 1. Pipeline: bounded queue drops instead of blocking, success sampling, JSON lines
+# ------------------------------------------------------------
+python - <<'PYCODE'
+import io, json, threading, time
+from core.worker_log import WorkerLog
+
+class SlowStream(io.StringIO):
+    """Blocks the writer thread until released."""
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+    def write(self, text):
+        self.gate.wait()
+        return super().write(text)
+
+stream = SlowStream()
+log = WorkerLog({"queue_size": 10, "success_per_second": 0}, stream=stream)
+start = time.perf_counter()
+for i in range(200):
+    log.emit("info", f"message {i}")
+assert time.perf_counter() - start < 1.0, "producers blocked on a stalled writer"
+assert log.dropped >= 150, log.stats()
+stream.gate.set()
+log.close()
+text = stream.getvalue()
+assert "[INFO] message 0" in text and f"{log.dropped} log record(s) dropped" in text, text[-300:]
+
+stream = io.StringIO()
+log = WorkerLog({"success_per_second": 5, "level": "success"}, stream=stream)
+for i in range(50):
+    log.emit("success", f"done {i}")
+log.emit("info", "below threshold")
+log.close()
+assert log.suppressed >= 40, log.stats()
+assert "below threshold" not in stream.getvalue()
+assert "suppressed" not in stream.getvalue(), "suppression summary ignored the level threshold"
+
+stream = io.StringIO()
+log = WorkerLog({"success_per_second": 5}, stream=stream)
+for i in range(50):
+    log.emit("success", f"done {i}")
+time.sleep(log.SUMMARY_INTERVAL + 1)  # no later success: the writer reports on its own
+summaries = [r for r in stream.getvalue().splitlines() if "success message(s) suppressed" in r]
+assert summaries and sum(int(r.split()[2]) for r in summaries) == log.suppressed, (summaries, log.stats())
+for i in range(20):
+    log.emit("success", f"again {i}")
+log.close()  # pending summary written at close
+summaries = [r for r in stream.getvalue().splitlines() if "success message(s) suppressed" in r]
+assert sum(int(r.split()[2]) for r in summaries) == log.suppressed, (summaries, log.stats())
+
+stream = io.StringIO()
+log = WorkerLog({"format": "json"}, stream=stream)
+log.emit("error", "boom", job="j-1")
+log.output("j-1", "hello\n")
+log.close()
+records = [json.loads(line) for line in stream.getvalue().splitlines()]
+assert records[0]["level"] == "error" and records[0]["job"] == "j-1" and records[0]["msg"] == "boom", records
+assert records[1]["level"] == "output" and records[1]["msg"] == "hello\n", records
+
+for bad in ({"level": "loud"}, {"format": "xml"}, {"queue_size": 0}):
+    try:
+        WorkerLog(bad)
+        raise AssertionError(f"accepted {bad}")
+    except ValueError:
+        pass
+PYCODE
+pass "Log pipeline drops and counts on overflow, samples successes and writes JSON lines"
+
+# ------------------------------------------------------------
+# 2. Workers log through the pipeline (JSON lines from config)
+# ------------------------------------------------------------
+queuectl config-set logging '{"format": "json"}' >/dev/null
+queuectl enqueue '{"id": "lg-ok", "command": "echo logged-output"}' >/dev/null
+queuectl enqueue '{"id": "lg-bad", "command": "exit 2", "max_retries": 1}' >/dev/null
+
+stdbuf -oL -eL queuectl worker-start --count 2 > logging.log 2>&1 &
+PID=$!
+sleep 4
+queuectl worker-stop >/dev/null 2>&1
+sleep 3
+if ps -p "$PID" >/dev/null 2>&1; then
+    kill "$PID" >/dev/null 2>&1 || true
+fi
+
+python - <<'PYCODE'
+import json
+records = [json.loads(line) for line in open("logging.log", encoding="utf-8") if line.startswith("{")]
+by_job = {(r.get("job"), r["level"]) for r in records}
+assert ("lg-ok", "success") in by_job, records
+assert ("lg-bad", "error") in by_job, records
+assert all({"ts", "level", "thread", "msg"} <= set(r) for r in records), records
+assert any(r["msg"].endswith("stopped gracefully.") for r in records), "log not flushed at shutdown"
+PYCODE
+pass "Worker messages are written as JSON lines with job fields"
+
+rm -f logging.log
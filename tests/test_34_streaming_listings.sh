@@ -0,0 +1,65 @@
+#!/bin/bash
+set -euo pipefail
+source "$(dirname "$0")/utils.sh"
+
+info "Testing Compact Job Records and Streaming Listings"
+clean_env
+
+python - <<'PYCODE'
+from core.storage import Database
+db = Database()
+with db.con:
+    db.con.executemany(
+        "INSERT INTO jobs (id, command, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+        [(f"st-{i:05d}", f"echo stream {i}", "dead" if i % 100 == 0 else "pending",
+          f"2026-01-01 {i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}", "2026-01-01 00:00:00")
+         for i in range(3000)],
+    )
+PYCODE
+
+# ------------------------------------------------------------
+# 1. Records hold only the projected columns; pages cover every row once
+# ------------------------------------------------------------
+python - <<'PYCODE'
+from core.storage import Database
+from core.records import JobRecord
+
+db = Database()
+jobs = db.iter_jobs(columns=("id", "status"), chunk_size=7)
+first = next(jobs)
+assert isinstance(first, JobRecord) and not hasattr(first, "__dict__"), type(first)
+assert first.id == "st-02999" and first["status"] == "pending" and dict(first) == first.to_dict(), first
+assert not hasattr(first, "command"), "unprojected column present"
+ids = [first.id] + [job.id for job in jobs]
+assert ids == [f"st-{i:05d}" for i in reversed(range(3000))], ids[:5]
+
+dead = [job.id for job in db.iter_jobs("dead", chunk_size=4)]
+assert dead == [f"st-{i:05d}" for i in reversed(range(0, 3000, 100))], dead
+assert len(list(db.iter_search_jobs("stream", status="dead", columns=("id",), chunk_size=3))) == 30
+assert len(db.search_jobs("stream", limit=None)) == 3000
+full = db.list_job_bystatus("pending")[0]
+assert full.keys() == db.job_columns, full.keys()
+try:
+    db.iter_jobs(columns=("id", "secret"))
+    raise AssertionError("unknown column accepted")
+except ValueError:
+    pass
+try:
+    first.status = "completed"
+    raise AssertionError("record is writable")
+except AttributeError:
+    pass
+PYCODE
+pass "JobRecords are slot-based projections streamed in keyset pages"
+
+# ------------------------------------------------------------
+# 2. CLI listings stream the same rows
+# ------------------------------------------------------------
+OUT=$(queuectl list --status pending)
+echo "$OUT" | grep -q "Total Jobs Displayed: 2970" || fail "list did not stream all pending jobs"
+[ "$(echo "$OUT" | grep -m1 '^st-' | awk '{print $1}')" = "st-02999" ] || fail "list is not newest first"
+OUT=$(queuectl dlq-list)
+[ "$(echo "$OUT" | grep -c '^ID  ')" -eq 30 ] || fail "dlq-list did not show every dead job"
+OUT=$(queuectl list --search "stream 2999")
+echo "$OUT" | grep -q "Total Jobs Displayed: 1" || fail "list --search did not stream matches"
+pass "list / dlq-list stream projected records"
@@ -1,6 +1,15 @@
-from flask import Flask, render_template_string
+import json
+import time
+from itertools import islice
+from flask import Flask, Response, render_template_string, request, jsonify, stream_with_context
+from markupsafe import Markup, escape
 from core.storage import Database
-from datetime import datetime
+from core.config import ConfigManager
+from core.rollups import series, bucket_start, RESOLUTION_SECONDS
+from core.aging import AgingPolicy
+from core.lease import LeaseServer
+from core.timeutil import parse_duration
+from datetime import datetime, timezone, timedelta
 
 app = Flask(__name__)
 db = Database()
@@ -199,6 +208,64 @@ HTML_TEMPLATE = """
         .fade-in {
             animation: fadeIn 0.4s ease;
         }
+
+        .section-title {
+            font-size: 1.1rem;
+            font-weight: 600;
+            margin: 25px 0 10px;
+        }
+
+        .search-form {
+            display: flex;
+            gap: 8px;
+            margin-bottom: 10px;
+        }
+
+        .search-form input[type="text"] {
+            flex: 1;
+            max-width: 420px;
+            padding: 6px 10px;
+            border: 1px solid #d1d5db;
+            border-radius: 6px;
+            font-size: 0.85rem;
+        }
+
+        .search-form select {
+            padding: 6px;
+            border: 1px solid #d1d5db;
+            border-radius: 6px;
+            font-size: 0.85rem;
+        }
+
+        .search-error {
+            color: #e74c3c;
+            font-size: 0.85rem;
+            margin-bottom: 10px;
+        }
+
+        .charts {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(420px, 1fr));
+            gap: 15px;
+        }
+
+        .chart {
+            background: var(--card-bg);
+            border-radius: 12px;
+            box-shadow: 0 2px 6px var(--shadow);
+            padding: 12px 15px;
+        }
+
+        .chart-title {
+            font-size: 0.85rem;
+            color: #6b7280;
+            margin-bottom: 6px;
+        }
+
+        .chart svg {
+            width: 100%;
+            height: 150px;
+        }
     </style>
 </head>
 <body>
@@ -227,6 +294,96 @@ HTML_TEMPLATE = """
         <div class="legend-item"><span class="dot dot-dead"></span> Dead</div>
     </div>
 
+    <h2 class="section-title">Throughput &amp; Latency</h2>
+    <div class="legend">
+        <div class="legend-item"><span class="dot dot-completed"></span> Completed</div>
+        <div class="legend-item"><span class="dot dot-failed"></span> Failed attempts</div>
+        <div class="legend-item"><span class="dot dot-dead"></span> Moved to DLQ</div>
+        <div class="legend-item"><span class="dot dot-processing"></span> p95 duration</div>
+    </div>
+    <div class="charts fade-in">
+        {% for chart in charts %}
+        <div class="chart">
+            <div class="chart-title">{{ chart.title }} — {{ chart.completed }} completed, {{ chart.enqueued }} enqueued{% if chart.p95 is not none %}, p95 up to {{ chart.p95 }}s{% endif %}</div>
+            {{ chart.svg }}
+        </div>
+        {% endfor %}
+    </div>
+
+    <h2 class="section-title">Workers ({{ workers|length }} active)</h2>
+    <div class="table-wrapper fade-in">
+        <table>
+            <thead>
+                <tr>
+                    <th>Worker</th>
+                    <th>Host / PID</th>
+                    <th>Status</th>
+                    <th>Current Job</th>
+                    <th>Job Started</th>
+                    <th>Jobs Done</th>
+                    <th>Last Heartbeat</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for w in workers %}
+                <tr>
+                    <td>{{ w['name'] }}</td>
+                    <td>{{ w['host'] }} / {{ w['pid'] }}</td>
+                    <td>{{ w['status'] }}</td>
+                    <td>{{ w['current_job'] or '-' }}</td>
+                    <td>{{ w['job_started_at'] or '-' }}</td>
+                    <td>{{ w['jobs_done'] }}</td>
+                    <td>{{ w['last_heartbeat'] }}</td>
+                </tr>
+                {% else %}
+                <tr><td colspan="7">No active workers.</td></tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+
+    <h2 class="section-title">Resource Usage by Command</h2>
+    <div class="table-wrapper fade-in">
+        <table>
+            <thead>
+                <tr>
+                    <th>Command</th>
+                    <th>Runs</th>
+                    <th>Timeouts</th>
+                    <th>CPU Total (s)</th>
+                    <th>Avg Wall (s)</th>
+                    <th>Max RSS (KiB)</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for row in run_stats %}
+                <tr>
+                    <td>{{ row['command'] }}</td>
+                    <td>{{ row['runs'] }}</td>
+                    <td>{{ row['timeouts'] }}</td>
+                    <td>{{ row['cpu_total'] }}</td>
+                    <td>{{ row['wall_avg'] }}</td>
+                    <td>{{ row['max_rss_kb'] or '-' }}</td>
+                </tr>
+                {% else %}
+                <tr><td colspan="6">No finished runs yet.</td></tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+
+    <h2 class="section-title">{% if query %}Jobs matching "{{ query }}" ({{ jobs|length }}{% if jobs|length == search_limit %}+{% endif %}){% else %}Recent Jobs{% endif %}</h2>
+    <form class="search-form" method="get" action="/">
+        <input type="text" name="q" value="{{ query }}" placeholder="Search commands, e.g. backup.sh">
+        <select name="status">
+            {% for option in ["all", "pending", "processing", "completed", "failed", "dead"] %}
+            <option value="{{ option }}" {% if option == search_status %}selected{% endif %}>{{ option.capitalize() }}</option>
+            {% endfor %}
+        </select>
+        <button class="refresh-btn" type="submit">Search</button>
+        {% if query %}<a class="refresh-btn" href="/" style="text-decoration: none;">Clear</a>{% endif %}
+    </form>
+    {% if search_error %}<div class="search-error">{{ search_error }}</div>{% endif %}
     <div class="table-wrapper fade-in">
         <table>
             <thead>
@@ -263,18 +420,162 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Charts: (resolution, number of buckets, title)
+CHARTS = (
+    ("minute", 60, "Last 60 minutes (per minute)"),
+    ("hour", 24, "Last 24 hours (per hour)"),
+    ("day", 30, "Last 30 days (per day)"),
+)
+
+
+def _load_series(resolution, points):
+    """Read at most `points` rollup rows and expand them into a gap-free series."""
+    now = datetime.now(timezone.utc)
+    since = bucket_start(now - timedelta(seconds=RESOLUTION_SECONDS[resolution] * (points - 1)), resolution)
+    return series(db.list_rollups(resolution, since), resolution, points, now)
+
+
+def _svg_chart(points, width=600, height=150):
+    """Inline SVG: stacked bars (completed/failed/dead) per bucket and a p95 duration line."""
+    top = 8
+    peak = max((p["completed"] + p["failed"] + p["dead"] for p in points), default=0) or 1
+    slowest = max((p["p95"] or 0 for p in points), default=0) or 1
+    slot = width / len(points)
+    parts = []
+    line = []
+    for i, p in enumerate(points):
+        x, y = i * slot, height
+        for name, color in (("completed", "#2ecc71"), ("failed", "#e74c3c"), ("dead", "#8e44ad")):
+            h = p[name] / peak * (height - top)
+            if h:
+                y -= h
+                parts.append(
+                    f'<rect x="{x + 1:.1f}" y="{y:.1f}" width="{max(slot - 2, 1):.1f}" height="{h:.1f}" '
+                    f'fill="{color}"><title>{escape(p["bucket"])} {name}: {p[name]}</title></rect>'
+                )
+        if p["p95"] is not None:
+            line.append(f"{x + slot / 2:.1f},{height - p['p95'] / slowest * (height - top):.1f}")
+    if len(line) > 1:
+        parts.append(f'<polyline points="{" ".join(line)}" fill="none" stroke="#3498db" stroke-width="1.5"/>')
+    return Markup(
+        f'<svg viewBox="0 0 {width} {height}" preserveAspectRatio="none" role="img">'
+        f'<line x1="0" y1="{height}" x2="{width}" y2="{height}" stroke="#ddd"/>{"".join(parts)}</svg>'
+    )
+
+
+def _charts():
+    charts = []
+    for resolution, points, title in CHARTS:
+        data = _load_series(resolution, points)
+        p95s = [p["p95"] for p in data if p["p95"] is not None]
+        charts.append({
+            "title": title,
+            "svg": _svg_chart(data),
+            "completed": sum(p["completed"] for p in data),
+            "enqueued": sum(p["enqueued"] for p in data),
+            "p95": max(p95s) if p95s else None,
+        })
+    return charts
+
+
+@app.route("/api/rollups")
+def rollups_api():
+    """Rollup series as JSON, e.g. /api/rollups?resolution=hour&points=24."""
+    resolution = request.args.get("resolution", "minute")
+    if resolution not in RESOLUTION_SECONDS:
+        return jsonify({"error": f"unknown resolution '{resolution}'"}), 400
+    points = max(1, min(request.args.get("points", 60, type=int), 1440))
+    return jsonify(_load_series(resolution, points))
+
+
+@app.route("/api/starvation")
+def starvation_api():
+    """Wait-time metrics of ready jobs and the priority aging policy, as JSON."""
+    try:
+        aging = AgingPolicy(ConfigManager().get_value("aging"))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"invalid aging config: {e}"}), 500
+    stats = db.starvation_stats(aging.starve_after)
+    stats["aging"] = {"enabled": aging.enabled, "interval": aging.interval, "step": aging.step,
+                      "max_priority": aging.max_priority, "starve_after": aging.starve_after}
+    return jsonify(stats)
+
+
+@app.route("/api/events")
+def events_stream():
+    """
+    Server-Sent Events feed of job transitions, e.g. /api/events?since=120.
+    Resumes from the Last-Event-ID header on reconnect; `follow=0` sends
+    the backlog and closes the stream.
+    """
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", 0, type=int)
+    follow = request.args.get("follow", "1") != "0"
+
+    def generate(since):
+        stream_db = Database()
+        idle = 0.0
+        while True:
+            batch = stream_db.read_events(since, 500)
+            for event in batch:
+                yield f"id: {event['seq']}\nevent: job\ndata: {json.dumps(dict(event))}\n\n"
+            if batch:
+                since, idle = batch[-1]["seq"], 0.0
+                continue
+            if not follow:
+                return
+            time.sleep(0.5)
+            idle += 0.5
+            if idle >= 15:
+                # Comment line keeps proxies from closing an idle stream.
+                yield ": keep-alive\n\n"
+                idle = 0.0
+
+    return Response(stream_with_context(generate(since)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
+
+
+# Maximum number of search results rendered on the dashboard.
+SEARCH_LIMIT = 100
+# Columns shown in the jobs table; nothing else is read.
+TABLE_COLUMNS = ("id", "command", "status", "priority", "attempts", "created_at", "updated_at")
+
+
 @app.route("/")
 def dashboard():
     summary = db.get_job_summary()
-    cur = db.con.cursor()
-    cur.execute("""
-        SELECT * FROM jobs
-        ORDER BY datetime(created_at) DESC
-        LIMIT 20;
-    """)
-    jobs = cur.fetchall()
-    return render_template_string(HTML_TEMPLATE, summary=summary, jobs=jobs, now=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"))
+    query = request.args.get("q", "").strip()
+    search_status = request.args.get("status", "all")
+    search_error = None
+    jobs = []
+    if query:
+        try:
+            jobs = db.search_jobs(query, status=search_status, limit=SEARCH_LIMIT, columns=TABLE_COLUMNS)
+        except ValueError as e:
+            search_error = str(e)
+    else:
+        jobs = list(islice(db.iter_jobs(columns=TABLE_COLUMNS, chunk_size=20), 20))
+    heartbeat = float(ConfigManager().get_value("heartbeat_interval") or 2)
+    workers = db.list_workers(live_within=max(10.0, heartbeat * 3))
+    return render_template_string(
+        HTML_TEMPLATE, summary=summary, jobs=jobs, workers=workers,
+        run_stats=db.run_stats_by_command(limit=10), charts=_charts(),
+        query=query, search_status=search_status, search_error=search_error, search_limit=SEARCH_LIMIT,
+        now=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+    )
 
 
 if __name__ == "__main__":
+    # Embedded job-lease server for remote workers, when configured.
+    lease_settings = ConfigManager().get_value("lease_server") or {}
+    if lease_settings.get("listen") and lease_settings.get("embed", True):
+        try:
+            LeaseServer(
+                lease_settings["listen"], token=lease_settings.get("token"),
+                lease_ttl=parse_duration(lease_settings.get("lease_ttl") or 60),
+            ).start()
+            print(f"Lease server listening on {lease_settings['listen']}")
+        except (ValueError, OSError) as e:
+            print(f"Lease server not started: {e}")
     app.run(host="127.0.0.1", port=5000, debug=False)